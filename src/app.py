@@ -1,182 +1,85 @@
-from flask import Flask, render_template, request, jsonify
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, render_template, request, jsonify, g
 from database import DatabaseManager
-from league_config import LEAGUES
-import time
+from league_config import LEAGUES, SEASON_NAMES
 from datetime import datetime, date
+import logging
 import pytz
 import os
-from pathlib import Path
+import time
+import uuid
 
 # gcloud builds submit --tag us-west1-docker.pkg.dev/kijhl-app/kijhl-app-repo/kijhl-img:v4.2
 # gcloud config set project zebrazone  
 
 # Import new API-based functions
-from getgames import get_game_ids_by_date, fetch_game_api
+from getgames import fetch_game_api
+from scraper import get_season_id_by_date, build_game_record, scrape_games
+from ingestion import is_final_status, dates_to_scrape, queue_pending, resolve_pending, due_pending
+from metrics import HTTP_REQUEST_SECONDS, render_metrics, trace_id_var, install_trace_logging
+import firestore_usage
+from official_search import SearchIndexCache
+from officials_index import SeasonIndexCache, SORT_FIELDS
+from team_stats import TEAM_SORT_FIELDS, team_rows
+from responses import api_response
+from snapshots import SnapshotStore, send_snapshot, write_game_days, SNAPSHOT_CACHE_CONTROL
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 db_manager = DatabaseManager()
 
-def get_logo_path(league: str, team_abbrev: str) -> str:
-    """
-    Get the path to a cached team logo.
-    
-    Args:
-        league: League identifier (e.g., 'kijhl', 'whl')
-        team_abbrev: Team abbreviation (e.g., 'CGY', 'EDM')
-        
-    Returns:
-        Path to the logo file (e.g., 'static/logos/kijhl/CGY.png')
-        Returns an empty string if logo file doesn't exist
-    """
-    logo_path = Path(__file__).parent / "static" / "logos" / league / f"{team_abbrev}.png"
-    if logo_path.exists():
-        return f"static/logos/{league}/{team_abbrev}.png"
-    return ''
+# LOG_TRACE_IDS=1 prefixes log lines with the request's trace ID
+if os.environ.get('LOG_TRACE_IDS'):
+    install_trace_logging()
 
-def get_season_id_by_date(date_str):
-    """
-    Determine the season ID based on the provided date.
-    This is a placeholder function and should be implemented
-    based on actual season date ranges.
-    """
-    season_start_dates = {
-        '2025-2026 (Playoffs)'  : ['2026-02-19', 66],
-        '2025-2026 (Reg Season)': ['2025-09-19', 65],
-        '2024-2025 (Playoffs)'  : ['2025-02-28', 63],
-        '2024-2025 (Reg Season)': ['2024-09-20', 61],
-        '2023-2024 (Playoffs)'  : ['2024-02-23', 59],
-        '2023-2024 (Reg Season)': ['2023-09-22', 56],
-        '2022-2023 (Playoffs)'  : ['2023-02-17', 54],
-        '2022-2023 (Reg Season)': ['2022-09-23', 52],
-        '2021-2022 (Playoffs)'  : ['2022-02-22', 51],
-        '2021-2022 (Reg Season)': ['2021-10-01', 49]
-    }
-    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-    for season, (start_date, season_id) in season_start_dates.items():
-        if date_obj >= datetime.strptime(start_date, '%Y-%m-%d'):
-            return season_id
-    return 0
+def officials_version():
+    """Changes when a rebuild swaps in new aggregates or merge_officials.py adds aliases.
+    Both lookups are cached by DatabaseManager, so this rarely reads Firestore."""
+    return tuple((db_manager.aggregate_path(league), sorted(db_manager.get_official_directory(league).aliases.items()))
+                 for league in LEAGUES)
 
-def scrape_games(date, league='kijhl'):
-    """Retrieve game data for a given date using the API.
-    
-    Args:
-        date: Date string in YYYY-MM-DD format
-        league: League identifier (e.g., 'kijhl', 'whl')
-    """
-    # Validate league
-    if league not in LEAGUES:
-        return {
-            'games': [],
-            'errors': [f"Unknown league: {league}"],
-            'total_games': 0,
-            'elapsed_time': 0,
-            'success': False,
-            'jungle_score': 0,
-            'dirty_team': ""
-        }
-    
-    results = {
-        'games': [],
-        'errors': [],
-        'total_games': 0,
-        'elapsed_time': 0,
-        'success': False,
-        'jungle_score': 0,
-        'dirty_team': ""
-    }
-    
-    start_time = time.time()
-    
-    try:
-        # 1. Fetch Game IDs directly from API
-        season_id = get_season_id_by_date(date)
-        if not season_id:
-            results['errors'].append("No season found for the given date")
-            results['elapsed_time'] = time.time() - start_time
-            return results
+# Official name search index over every league, kept current by ingestion and rebuilt when it goes stale
+search_indexes = SearchIndexCache(lambda: [(league, db_manager.get_all_officials(league)) for league in LEAGUES],
+                                  version=officials_version)
+db_manager.officials_listeners.append(search_indexes.add_many)
 
-        game_numbers = get_game_ids_by_date(date, league=league, season_id=season_id)
-        results['total_games'] = len(game_numbers)
-        
-        if not game_numbers:
-            results['errors'].append("No games found for this date")
-            results['elapsed_time'] = time.time() - start_time
-            return results
+# Per-season officials indexes behind /api/officials, dropped when ingestion updates a season
+season_indexes = SeasonIndexCache(lambda league, season_id: db_manager.get_all_officials_for_season(league, season_id))
+db_manager.officials_listeners.append(season_indexes.invalidate)
 
-        # 2. Fetch Game Details (Concurrently)
-        max_workers = min(15, len(game_numbers))  # Reasonable limit for concurrent requests
-        dirtiest_team_name = ""
-        dirtiest_team_pims = 0
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_game = {executor.submit(fetch_game_api, game_num, league): game_num 
-                              for game_num in game_numbers}
-            
-            for future in as_completed(future_to_game):
-                game_num, data, error = future.result()
-                
-                if error:
-                    results['errors'].append({
-                        'game_number': game_num,
-                        'error': error
-                    })
-                elif data:
-                    visitor_abbrv = data['teams']['visitor_abbrv']
-                    home_abbrv = data['teams']['home_abbrv']
-                    visitor_pims = int(data['pims']['visitor'])
-                    home_pims = int(data['pims']['home'])
+# Pre-rendered snapshots (snapshots.py) answer closed seasons and past game days from disk
+snapshot_store = SnapshotStore()
 
-                    game_obj = {
-                        'game_number': game_num,
-                        'venue': data['game_details']['venue'],
-                        'attendance': data['game_details']['attendance'],
-                        'status': data['game_details']['status'],
-                        'visitor_city': data['teams']['visitor_city'],
-                        'home_city': data['teams']['home_city'],
-                        'visitor_nickname': data['teams']['visitor_nickname'],
-                        'home_nickname': data['teams']['home_nickname'],
-                        'visitor_abbrv': visitor_abbrv,
-                        'home_abbrv': home_abbrv,
-                        'visitor_goals': data['goals']['visitor'],
-                        'home_goals': data['goals']['home'],
-                        'visitor_pims': visitor_pims,
-                        'home_pims': home_pims,
-                        'total_pims': visitor_pims + home_pims,
-                        'fight_count': data['pims'].get('fight_count', 0),
-                        'major_penalty_count': data['pims'].get('major_penalty_count', 0),
-                        'notable_penalties': data['pims'].get('notable_penalties', []),
-                        'referees': data['officials']['referees'],
-                        'linesmen': data['officials']['linesmen'],
-                        'visitor_logo': get_logo_path(league, visitor_abbrv),
-                        'home_logo': get_logo_path(league, home_abbrv),
-                        'date': date,
-                        'league': league
-                    }
+# FIRESTORE_DEBUG_HEADER=1 reports each request's Firestore reads/writes/RPCs in X-Firestore-Ops
+FIRESTORE_DEBUG_HEADER = bool(os.environ.get('FIRESTORE_DEBUG_HEADER'))
 
-                    results['games'].append(game_obj)
+@app.before_request
+def start_request_trace():
+    """Adopt the caller's trace ID (Cloud Run / load balancer) or mint one, and start the request timer."""
+    trace_header = request.headers.get('X-Cloud-Trace-Context', '') or request.headers.get('X-Request-ID', '')
+    g.trace_id = trace_header.split('/')[0] or uuid.uuid4().hex[:16]
+    g.request_start = time.perf_counter()
+    trace_id_var.set(g.trace_id)
+    firestore_usage.start_request(request.endpoint)
 
-                    results['jungle_score'] += game_obj['total_pims']
+@app.after_request
+def record_request_metrics(response):
+    """Record request latency and echo the trace ID back to the caller."""
+    if 'request_start' in g:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - g.request_start,
+                                     endpoint=request.endpoint or 'unknown',
+                                     method=request.method, status=response.status_code)
+        response.headers['X-Request-ID'] = g.trace_id
+    usage = firestore_usage.request_usage()
+    if FIRESTORE_DEBUG_HEADER and usage is not None:
+        response.headers['X-Firestore-Ops'] = f"reads={usage['reads']}; writes={usage['writes']}; rpcs={usage['rpcs']}"
+    return response
 
-                    # Calculate dirtiest team
-                    max_pims_in_game = max(visitor_pims, home_pims)
-                    if max_pims_in_game > dirtiest_team_pims:
-                        dirtiest_team_name = visitor_abbrv if visitor_pims > home_pims else home_abbrv
-                        dirtiest_team_pims = max_pims_in_game
-        
-        # 4. Final Calculations
-        if results['total_games'] > 0:
-            results['jungle_score'] = round(results['jungle_score'] / results['total_games'], 1)
-        
-        results['dirty_team'] = dirtiest_team_name
-        results['success'] = True
-        
-    except Exception as e:
-        results['errors'].append(f"An application error occurred: {str(e)}")
-    
-    results['elapsed_time'] = time.time() - start_time
-    return results
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint for stage latencies, upstream statuses, queue depth, cache hits
+    and Firestore operation counts."""
+    return render_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 @app.route('/')
 def index():
@@ -217,7 +120,8 @@ def rosters():
 @app.route('/statistics')
 def statistics():
     """Renders the statistics page. No filtering/sorting done server-side.
-    All officials data is fetched client-side via /api/officials endpoint.
+    All officials data is fetched client-side via /api/officials endpoint, unless the season
+    is closed and has a pre-rendered snapshot page with the officials embedded.
     
     Query parameters:
         league: League identifier (e.g., 'kijhl', 'whl'). Defaults to 'kijhl'
@@ -230,18 +134,33 @@ def statistics():
     if league not in LEAGUES:
         return f"Invalid league: {league}", 400
     
+    if season.isdigit() and snapshot_store.is_complete(league, int(season)):
+        snapshot = send_snapshot(snapshot_store.season_path(league, int(season), 'statistics.html'),
+                                 SNAPSHOT_CACHE_CONTROL)
+        if snapshot:
+            return snapshot
+    
     return render_template('leaderboard.html',
                            current_league=league,
                            current_season=season)
 
 @app.route('/api/officials')
 def get_officials():
-    """API endpoint that returns all officials for a given season and league as JSON.
-    Filtering and sorting is done client-side to minimize database reads.
+    """API endpoint that returns officials for a given season and league as JSON.
+    With no options it returns every official, unsorted, for client-side filtering.
+    Any of role, min_games, sort, order, page, limit or fields switches to server-side
+    filtering, sorting, pagination and field projection from a cached per-season index.
     
     Query parameters:
         league: League identifier (e.g., 'kijhl', 'whl'). Defaults to 'kijhl'
         season: Season ID. Defaults to '65'
+        role: 'all', 'referee' or 'linesman'. Defaults to 'all'
+        min_games: Minimum games called. Defaults to 0
+        sort: 'games', 'pims', 'avg' or 'name' (or the field names). Defaults to 'pims'
+        order: 'desc' or 'asc'. Defaults to 'desc'
+        page: 1-based page number. Defaults to 1
+        limit: Page size. Defaults to all rows
+        fields: Comma-separated fields to return (e.g., 'name,role,avg_pims')
     """
     league = request.args.get('league', 'kijhl')
     season = request.args.get('season', '65')
@@ -250,13 +169,137 @@ def get_officials():
     if league not in LEAGUES:
         return jsonify({'error': 'Invalid league', 'officials': []}), 400
     
-    # Fetch all officials for this season (no filtering/sorting)
-    officials = db_manager.get_all_officials_for_season(league=league, season_id=int(season))
+    options = ('role', 'min_games', 'sort', 'order', 'page', 'limit', 'fields')
+    if not any(option in request.args for option in options):
+        # Default: all officials for this season (no filtering/sorting), from its snapshot once closed
+        if snapshot_store.is_complete(league, int(season)):
+            snapshot = send_snapshot(snapshot_store.season_path(league, int(season), 'officials.json'),
+                                     SNAPSHOT_CACHE_CONTROL)
+            if snapshot:
+                return snapshot
+        index = season_indexes.get(league, int(season))
+        return api_response({
+            'officials': index.records,
+            'season': season,
+            'league': league,
+            'count': len(index.records)
+        })
+    
+    sort = request.args.get('sort', 'pims')
+    order = request.args.get('order', 'desc')
+    if sort not in SORT_FIELDS or order not in ('asc', 'desc'):
+        return jsonify({'error': f"Invalid sort/order. Sort by one of: {', '.join(SORT_FIELDS)}", 'officials': []}), 400
     
-    return jsonify({
+    try:
+        min_games = int(request.args.get('min_games', 0))
+        page = int(request.args.get('page', 1))
+        limit = max(int(request.args['limit']), 1) if 'limit' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'min_games, page and limit must be integers', 'officials': []}), 400
+    
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or None
+    index = season_indexes.get(league, int(season))
+    officials, total = index.query(role=request.args.get('role', 'all'), min_games=min_games,
+                                   sort=sort, order=order, page=page, limit=limit, fields=fields)
+    
+    return api_response({
         'officials': officials,
         'season': season,
         'league': league,
+        'count': len(officials),
+        'total': total,
+        'page': page,
+        'pages': -(-total // limit) if limit else 1
+    })
+
+@app.route('/api/officials/search')
+def search_officials():
+    """API endpoint for official name search / autocomplete across all leagues and seasons.
+    
+    Query parameters:
+        q: Name prefix (first or last name, any case or accents)
+        league: Optional league identifier to restrict results
+        limit: Maximum results, 1 to 50. Defaults to 10
+    """
+    query = request.args.get('q', '').strip()
+    league = request.args.get('league')
+    limit = request.args.get('limit', type=int)
+    
+    if limit is None and 'limit' in request.args:
+        return jsonify({'error': 'limit must be an integer', 'results': []}), 400
+    if league and league not in LEAGUES:
+        return jsonify({'error': 'Invalid league', 'results': []}), 400
+    limit = min(max(limit if limit is not None else 10, 1), 50)
+    
+    index = search_indexes.get()
+    start = time.perf_counter()
+    results = index.search(query, league=league, limit=limit)
+    
+    return api_response({
+        'query': query,
+        'results': results,
+        'count': len(results),
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+    })
+
+@app.route('/api/officials/compare')
+def compare_officials():
+    """API endpoint comparing several officials' season and career stats in one response.
+    All season records are fetched in one batched read per league.
+    
+    Query parameters:
+        officials: Comma-separated official names; prefix a name with 'league:' to compare
+                   across leagues (e.g., 'Steve Smith,whl:Kevin Pollock'). Up to 20 officials.
+        league: League for names without a prefix. Defaults to 'kijhl'
+    """
+    default_league = request.args.get('league', 'kijhl')
+    requested = []
+    for item in request.args.get('officials', '').split(','):
+        league, _, name = item.strip().rpartition(':')
+        league = league.strip() or default_league
+        if name.strip():
+            requested.append((league, name.strip()))
+    
+    if not requested:
+        return jsonify({'error': 'officials is required'}), 400
+    if len(requested) > 20:
+        return jsonify({'error': 'Compare at most 20 officials at a time'}), 400
+    unknown = sorted({league for league, _ in requested if league not in LEAGUES})
+    if unknown:
+        return jsonify({'error': f"Invalid league: {', '.join(unknown)}"}), 400
+    
+    officials = db_manager.get_officials_career_stats_batch(requested)
+    
+    # Side-by-side rows for every season any of the officials worked
+    by_season = {}
+    for official in officials:
+        key = f"{official['league']}:{official['official_id']}"
+        official['key'] = key
+        for season in official['seasons']:
+            season_id = season.get('season_id', 0)
+            season['season_name'] = SEASON_NAMES.get(season_id, f'Season {season_id}')
+            row = by_season.setdefault((official['league'], season_id), {
+                'league': official['league'],
+                'season_id': season_id,
+                'season_name': season['season_name'],
+                'officials': {}
+            })
+            row['officials'][key] = {field: season.get(field, 0) for field in ('games_called', 'total_pims', 'avg_pims')}
+    
+    seasons = sorted(by_season.values(), key=lambda r: (r['league'], -r['season_id']))
+    worked = [o for o in officials if o['career']['total_games'] > 0]
+    leaders = {}
+    if worked:
+        leaders = {
+            'most_games': max(worked, key=lambda o: o['career']['total_games'])['key'],
+            'highest_avg': max(worked, key=lambda o: o['career']['total_pims'] / o['career']['total_games'])['key'],
+            'lowest_avg': min(worked, key=lambda o: o['career']['total_pims'] / o['career']['total_games'])['key'],
+        }
+    
+    return api_response({
+        'officials': officials,
+        'seasons': seasons,
+        'leaders': leaders,
         'count': len(officials)
     })
 
@@ -275,40 +318,103 @@ def get_official_stats(name):
     
     stats = db_manager.get_official_career_stats(league, name)
     
-    # Map season IDs to readable names (shared across leagues, specific mappings per league would go here)
-    season_names = {
-        # KIJHL seasons
-        66: '2025-26 Playoffs',
-        65: '2025-26 Regular Season',
-        63: '2024-25 Playoffs',
-        61: '2024-25 Regular Season',
-        59: '2023-24 Playoffs',
-        56: '2023-24 Regular Season',
-        54: '2022-23 Playoffs',
-        52: '2022-23 Regular Season',
-        51: '2021-22 Playoffs',
-        49: '2021-22 Regular Season',
-        # WHL seasons
-        292: '2025-26 Playoffs',
-        289: '2025-26 Regular Season',
-        288: '2024-25 Playoffs',
-        285: '2024-25 Regular Season',
-        284: '2023-24 Playoffs',
-        281: '2023-24 Regular Season',
-        268: '2022-23 Playoffs',
-        265: '2022-23 Regular Season',
-        264: '2021-22 Playoffs',
-        261: '2021-22 Regular Season',
-        260: '2020-21 Playoffs',
-        257: '2020-21 Regular Season',
-    }
-    
     # Add readable season names to each season record
     for season in stats.get('seasons', []):
         season_id = season.get('season_id', 0)
-        season['season_name'] = season_names.get(season_id, f'Season {season_id}')
+        season['season_name'] = SEASON_NAMES.get(season_id, f'Season {season_id}')
+    
+    return api_response(stats)
+
+@app.route('/api/official/<name>/trend')
+def get_official_trend(name):
+    """API endpoint for an official's per-game PIM series with rolling 5/10/20-game averages.
+    
+    Query parameters:
+        league: League identifier (e.g., 'kijhl', 'whl'). Defaults to 'kijhl'
+        season: Season ID (optional, defaults to every season)
+    """
+    league = request.args.get('league', 'kijhl')
+    season = request.args.get('season')
+    
+    # Validate league exists
+    if league not in LEAGUES:
+        return jsonify({'error': 'Invalid league'}), 400
+    try:
+        season_id = int(season) if season else None
+    except ValueError:
+        return jsonify({'error': 'season must be an integer'}), 400
+    
+    trend = db_manager.get_official_trend(league, name, season_id=season_id)
+    for series in trend.get('seasons', []):
+        season_id = series.get('season_id', 0)
+        series['season_name'] = SEASON_NAMES.get(season_id, f'Season {season_id}')
+    
+    return api_response(trend)
+
+@app.route('/api/penalties')
+def get_penalties():
+    """API endpoint that breaks penalties down by infraction for an official, team or infraction type.
+    
+    Query parameters:
+        league: League identifier (e.g., 'kijhl', 'whl'). Defaults to 'kijhl'
+        season: Season ID. Defaults to '65'
+        official: Official name (e.g., 'Steve Smith')
+        team: Team abbreviation (e.g., 'KAM')
+        infraction: Infraction code (e.g., 'roughing', 'fighting')
+    """
+    league = request.args.get('league', 'kijhl')
+    season = request.args.get('season', '65')
     
-    return jsonify(stats)
+    # Validate league exists
+    if league not in LEAGUES:
+        return jsonify({'error': 'Invalid league'}), 400
+    try:
+        season_id = int(season)
+    except ValueError:
+        return jsonify({'error': 'season must be an integer'}), 400
+    
+    breakdown = db_manager.get_penalty_breakdown(league, season_id=season_id,
+                                                 official=request.args.get('official'),
+                                                 team=request.args.get('team'),
+                                                 infraction=request.args.get('infraction'))
+    breakdown['league'] = league
+    return api_response(breakdown)
+
+@app.route('/api/teams')
+def get_teams():
+    """API endpoint for season team penalty standings, served from one aggregate document.
+    
+    Query parameters:
+        league: League identifier (e.g., 'kijhl', 'whl'). Defaults to 'kijhl'
+        season: Season ID. Defaults to '65'
+        sort: 'pims', 'pims_against', 'avg', 'fights', 'majors' or 'games'. Defaults to 'pims'
+        order: 'desc' or 'asc'. Defaults to 'desc'
+    """
+    league = request.args.get('league', 'kijhl')
+    season = request.args.get('season', '65')
+    sort = request.args.get('sort', 'pims')
+    order = request.args.get('order', 'desc')
+    
+    # Validate league exists
+    if league not in LEAGUES:
+        return jsonify({'error': 'Invalid league'}), 400
+    if sort not in TEAM_SORT_FIELDS:
+        return jsonify({'error': f"sort must be one of {', '.join(sorted(TEAM_SORT_FIELDS))}"}), 400
+    try:
+        season_id = int(season)
+    except ValueError:
+        return jsonify({'error': 'season must be an integer'}), 400
+    
+    field = TEAM_SORT_FIELDS[sort]
+    teams = sorted(team_rows(db_manager.get_team_stats(league, season_id=season_id)),
+                   key=lambda row: (row[field], row['team']), reverse=(order != 'asc'))
+    return api_response({
+        'league': league,
+        'season_id': season_id,
+        'sort': field,
+        'teams': teams,
+        'count': len(teams)
+    })
 
 @app.route('/api/scrape', methods=['GET', 'POST'])
 def api_scrape():
@@ -344,13 +450,19 @@ def api_scrape():
     except ValueError:
         return jsonify({'error': 'Invalid date format. Please use YYYY-MM-DD'}), 400
     
+    # Finished days are served from their snapshot without calling HockeyTech
+    snapshot = send_snapshot(snapshot_store.game_day_path(league, date), SNAPSHOT_CACHE_CONTROL)
+    if snapshot:
+        return snapshot
+    
     results = scrape_games(date, league=league)
-    return jsonify(results)
+    return api_response(results)
 
 @app.route('/tasks/update-daily', methods=['GET', 'POST'])
 def daily_update():
     """Route specifically for Cloud Scheduler.
-    Scrapes games for today's date for KIJHL (main league).
+    Scrapes every date since the league's ingestion watermark (catching up on missed days),
+    saves final games, and re-polls games that were not final yet on a backoff.
     
     Query parameter:
         league: League identifier (e.g., 'kijhl', 'whl'). Defaults to 'kijhl'
@@ -361,26 +473,80 @@ def daily_update():
     if league not in LEAGUES:
         return jsonify({'error': f'Unknown league: {league}'}), 400
     
-    today = datetime.now(pytz.timezone('America/Vancouver')).date()
-    date_str = today.strftime('%Y-%m-%d')
-    
-    print(f"Running automated update for {league}: {date_str}")
-    
-    results = scrape_games(date_str, league=league)
-
-    if results['success'] and results['games']:
-        print(f"   > Found {len(results['games'])} games. Saving...")
-        season_id_actual = get_season_id_by_date(date_str)
+    now = datetime.now(pytz.timezone('America/Vancouver'))
+    state = db_manager.get_ingestion_state(league)
+    dates = dates_to_scrape(state, now.date())
+    games_found = 0
+    games_saved = 0
+    # Dates this run scraped, snapshotted afterwards if they're finished
+    game_days = []
+    
+    logger.info(f"Running automated update for {league}: {', '.join(dates) or 'up to date'}")
+    
+    # 1. Scrape each date after the watermark, oldest first
+    for date_str in dates:
+        results = scrape_games(date_str, league=league)
+        # An off-day (or off-season) is not a failure; anything else is
+        off_day = results['errors'] in (["No games found for this date"], ["No season found for the given date"])
+        if not results['success'] and not off_day:
+            # Leave the watermark here so the date is retried on the next run
+            logger.warning(f"   > {date_str}: scrape failed ({results['errors']}). Stopping catch-up.")
+            break
+        
+        season_id = get_season_id_by_date(date_str)
+        games_found += results['total_games']
+        
         for game in results['games']:
-            db_manager.save_game_results(league, game, season_id=season_id_actual)
-    else:
-        print("   > No games or error.")
+            if is_final_status(game['status']):
+                if db_manager.save_game_results(league, game, season_id=season_id):
+                    games_saved += 1
+                resolve_pending(state, game['game_number'])
+            else:
+                queue_pending(state, game['game_number'], date_str, season_id, now)
+        
+        # Games that failed to fetch are re-polled individually rather than holding back the date
+        for error in results['errors']:
+            if isinstance(error, dict):
+                queue_pending(state, error['game_number'], date_str, season_id, now)
+        
+        game_days.append(results)
+        
+        state['watermark'] = date_str
+        logger.info(f"   > {date_str}: {len(results['games'])} games fetched")
+    
+    # 2. Re-poll earlier non-final games whose backoff has expired
+    journal = db_manager.get_journal(league)
+    for game_id, entry in due_pending(state, now):
+        if game_id in journal:
+            # Already applied (e.g. by a manual backfill); nothing to fetch
+            resolve_pending(state, game_id)
+            continue
+        game_num, data, error = fetch_game_api(game_id, league)
+        if data and is_final_status(data['game_details']['status']):
+            game = build_game_record(game_num, data, entry['date'], league)
+            if db_manager.save_game_results(league, game, season_id=entry['season_id']):
+                games_saved += 1
+            resolve_pending(state, game_id)
+        else:
+            queue_pending(state, game_id, entry['date'], entry['season_id'], now)
+    
+    db_manager.save_ingestion_state(league, state)
+    logger.info(f"   > Saved {games_saved} games. {len(state['pending'])} awaiting final.")
+    
+    # 3. Snapshot the days that are now finished; a failure here must not fail the ingest
+    try:
+        write_game_days(snapshot_store, league, game_days, now.date())
+    except Exception as e:
+        logger.warning(f"   > Game day snapshot failed: {e}")
     
     return jsonify({
         "status": "success", 
-        "date": date_str,
+        "dates": dates,
         "league": league,
-        "games_found": results['total_games']
+        "watermark": state['watermark'],
+        "games_found": games_found,
+        "games_saved": games_saved,
+        "games_pending": len(state['pending'])
     })
 
 if __name__ == '__main__':
@@ -0,0 +1,171 @@
+"""Offline benchmark suite for the parsers and scrape pipeline.
+
+Every benchmark replays the payloads in fixtures/, so results are comparable
+between runs and need no network access. Each run is appended to benchmarks/results.jsonl.
+
+Usage:
+    python benchmark.py                    # Run everything, save results
+    python benchmark.py -n 500 parse       # Only benchmarks whose name contains 'parse'
+    python benchmark.py --no-save
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from getgames import (ADAPTERS, _load_jsonp, parse_kijhl_game, parse_whl_game,
+                      get_game_ids_by_date_kijhl, get_game_ids_by_date_whl)
+from replay import load_fixture, replay_hockeytech
+from responses import dumps_json, encode_body, msgpack, brotli
+from scraper import scrape_games
+
+RESULTS_PATH = Path(__file__).parent / "benchmarks" / "results.jsonl"
+
+KIJHL_GAMES = ['kijhl_game_19059.jsonp', 'kijhl_game_19060.jsonp', 'kijhl_game_19061.jsonp']
+WHL_GAMES = ['whl_game_1022633.jsonp', 'whl_game_1022634.jsonp']
+FIXTURE_DATE = '2025-11-07'
+
+def collect_benchmarks() -> list:
+    """Return (name, callable) pairs. Each callable performs one unit of work."""
+    kijhl_raw = [load_fixture(name) for name in KIJHL_GAMES]
+    whl_raw = [load_fixture(name) for name in WHL_GAMES]
+    kijhl_data = [_load_jsonp(text) for text in kijhl_raw]
+    whl_data = [_load_jsonp(text) for text in whl_raw]
+
+    def load_jsonp_all():
+        for text in kijhl_raw + whl_raw:
+            _load_jsonp(text)
+
+    def parse_kijhl_all():
+        for data in kijhl_data:
+            parse_kijhl_game(data)
+
+    def parse_whl_all():
+        for data in whl_data:
+            parse_whl_game(data)
+
+    def cold_schedule(fn):
+        """Run fn with the KIJHL month cache emptied, so each call parses the schedule feed."""
+        def run():
+            ADAPTERS['kijhl']._months.clear()
+            return fn()
+        return run
+
+    scrape_payload = scrape_games(FIXTURE_DATE, league='kijhl')
+
+    benchmarks = [
+        ('load_jsonp', load_jsonp_all),
+        ('parse_kijhl_game', parse_kijhl_all),
+        ('parse_whl_game', parse_whl_all),
+        ('get_game_ids_by_date_kijhl', cold_schedule(lambda: get_game_ids_by_date_kijhl(FIXTURE_DATE, 65))),
+        ('get_game_ids_by_date_kijhl_cached', lambda: get_game_ids_by_date_kijhl(FIXTURE_DATE, 65)),
+        ('get_game_ids_by_date_whl', lambda: get_game_ids_by_date_whl(FIXTURE_DATE, 289)),
+        ('scrape_games_kijhl', cold_schedule(lambda: scrape_games(FIXTURE_DATE, league='kijhl'))),
+        ('scrape_games_kijhl_cached_schedule', lambda: scrape_games(FIXTURE_DATE, league='kijhl')),
+        ('scrape_games_whl', lambda: scrape_games(FIXTURE_DATE, league='whl')),
+        # /api/scrape serialisation: jsonify's stdlib encoder vs api_response's encodings
+        ('encode_scrape_stdlib_json', lambda: json.dumps(scrape_payload, sort_keys=True).encode()),
+        ('encode_scrape_fast_json', lambda: dumps_json(scrape_payload)),
+        ('encode_scrape_json_gzip', lambda: encode_body(scrape_payload, accept_encoding='gzip')),
+    ]
+    if brotli is not None:
+        benchmarks.append(('encode_scrape_json_brotli', lambda: encode_body(scrape_payload, accept_encoding='br')))
+    if msgpack is not None:
+        benchmarks.append(('encode_scrape_msgpack', lambda: encode_body(scrape_payload, accept='application/msgpack')))
+    return benchmarks
+
+def payload_sizes() -> dict:
+    """Bytes on the wire for the fixture /api/scrape payload under each encoding."""
+    payload = scrape_games(FIXTURE_DATE, league='kijhl')
+    sizes = {'stdlib_json': len(json.dumps(payload, sort_keys=True).encode())}
+    for name, accept, accept_encoding in (('json', '', ''), ('json_gzip', '', 'gzip'), ('json_brotli', '', 'br'),
+                                          ('msgpack', 'application/msgpack', ''),
+                                          ('msgpack_brotli', 'application/msgpack', 'br')):
+        body, content_type, encoding, _ = encode_body(payload, accept, accept_encoding)
+        if name.startswith('msgpack') and content_type != 'application/msgpack':
+            continue
+        if accept_encoding and not encoding:
+            continue
+        sizes[name] = len(body)
+    return sizes
+
+def time_callable(fn, iterations) -> dict:
+    """Time fn over a number of iterations (after one warm-up call). Times are in microseconds."""
+    fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return {
+        'iterations': iterations,
+        'mean_us': round(statistics.mean(samples), 2),
+        'median_us': round(statistics.median(samples), 2),
+        'min_us': round(min(samples), 2),
+    }
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, timeout=5).stdout.strip()
+    except Exception:
+        return ''
+
+def load_previous_run(path=RESULTS_PATH) -> dict:
+    """Return the most recent stored run, or an empty dict."""
+    if not path.exists():
+        return {}
+    lines = [line for line in path.read_text().splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else {}
+
+def run_benchmarks(iterations=200, name_filter='') -> dict:
+    results = {}
+    with replay_hockeytech():
+        for name, fn in collect_benchmarks():
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = time_callable(fn, iterations)
+        sizes = payload_sizes()
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'results': results,
+        'sizes': sizes,
+    }
+
+def print_run(run, previous=None):
+    previous_results = (previous or {}).get('results', {})
+    print(f"{'benchmark':<36}{'median (us)':>14}{'min (us)':>12}{'vs last':>10}")
+    for name, result in run['results'].items():
+        delta = ''
+        if name in previous_results and previous_results[name]['median_us']:
+            change = (result['median_us'] / previous_results[name]['median_us'] - 1) * 100
+            delta = f"{change:+.1f}%"
+        print(f"{name:<36}{result['median_us']:>14.1f}{result['min_us']:>12.1f}{delta:>10}")
+    if run.get('sizes'):
+        print(f"\n{'/api/scrape payload':<36}{'bytes':>14}")
+        for name, size in run['sizes'].items():
+            print(f"{name:<36}{size:>14}")
+
+def save_run(run, path=RESULTS_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('a') as f:
+        f.write(json.dumps(run) + '\n')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('filter', nargs='?', default='', help='Only run benchmarks whose name contains this')
+    parser.add_argument('-n', '--iterations', type=int, default=200)
+    parser.add_argument('--no-save', action='store_true', help="Don't append this run to the results file")
+    args = parser.parse_args()
+
+    run = run_benchmarks(args.iterations, args.filter)
+    print_run(run, load_previous_run())
+    if not args.no_save:
+        save_run(run)
+        print(f"\nSaved to {RESULTS_PATH}")
@@ -0,0 +1,18 @@
+import pytest
+
+@pytest.fixture
+def memory_manager(monkeypatch):
+    """A DatabaseManager over its own empty in-memory Firestore."""
+    from database import DatabaseManager
+    from fake_firestore import Client
+    monkeypatch.setenv('FIRESTORE_BACKEND', 'memory')
+    manager = DatabaseManager()
+    manager.db = Client()
+    return manager
+
+@pytest.fixture
+def webapp(monkeypatch):
+    """The app module, imported against the shared in-memory Firestore."""
+    monkeypatch.setenv('FIRESTORE_BACKEND', 'memory')
+    import app
+    return app
@@ -1,17 +1,118 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
 import logging
+import os
+import time
 from league_config import LEAGUES
+from google.api_core.exceptions import AlreadyExists
+from ingestion import is_final_status, new_ingestion_state, IngestionJournal, journal_path
+from metrics import STAGE_SECONDS
+import firestore_usage
+from officials_identity import OfficialDirectory
+from team_stats import COUNTER_FIELDS, game_team_deltas
+from trends import WINDOWS, append_game, trend_points
+
+# Alias/jersey tables change only when merge_officials.py runs, so cache them per instance
+IDENTITY_CACHE_SECONDS = 600
+
+# How often a running instance re-reads meta/aggregates to pick up a rebuild's swap
+AGGREGATE_POINTER_CACHE_SECONDS = 60
+
+# Firestore caps the number of values in an 'in' filter
+IN_QUERY_LIMIT = 30
+
+def career_totals(seasons):
+    """Career totals across a list of official season records."""
+    totals = {
+        'total_games': sum(s.get('games_called', 0) for s in seasons),
+        'total_pims': sum(s.get('total_pims', 0) for s in seasons),
+        'seasons_count': len(seasons)
+    }
+    
+    if totals['total_games'] > 0:
+        totals['career_avg'] = int(round(totals['total_pims'] / totals['total_games'], 1))
+    else:
+        totals['career_avg'] = 0
+    return totals
+
+def without_trend(record):
+    """An official season record without its per-game trend series (kept out of list payloads)."""
+    record.pop('trend', None)
+    return record
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DatabaseManager:
     def __init__(self):
-        if not firebase_admin._apps:
-            cred = credentials.Certificate('serviceAccountKey.json')
-            firebase_admin.initialize_app(cred)
-        self.db = firestore.client()
+        # FIRESTORE_BACKEND=memory swaps in the in-process stand-in (load tests, offline runs)
+        # (imported only then, so production never loads it)
+        if os.environ.get('FIRESTORE_BACKEND') == 'memory':
+            import fake_firestore
+            self.db = fake_firestore.shared_client()
+        else:
+            if not firebase_admin._apps:
+                cred = credentials.Certificate('serviceAccountKey.json')
+                firebase_admin.initialize_app(cred)
+            self.db = firestore.client()
+        self._directories = {}  # league -> (loaded_at, OfficialDirectory)
+        self._aggregate_paths = {}  # league -> (loaded_at, path)
+        self._journals = {}  # league -> IngestionJournal
+        # Callables (league, records) run after official season records are written,
+        # so in-memory indexes can update without re-reading Firestore
+        self.officials_listeners = []
+
+    def get_official_directory(self, league):
+        """Load (and cache) the alias and jersey tables used to resolve official IDs.
+        
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+        """
+        cached = self._directories.get(league)
+        if cached and time.monotonic() - cached[0] < IDENTITY_CACHE_SECONDS:
+            return cached[1]
+        
+        config = LEAGUES.get(league)
+        if not config:
+            logger.error(f"Unknown league: {league}")
+            return OfficialDirectory()
+        
+        firebase_path = config['firebase_path']
+        doc = self.db.collection(f"{firebase_path}/meta").document('official_identity').get()
+        firestore_usage.record('get_official_directory', reads=1)
+        data = doc.to_dict() if doc.exists else {}
+        directory = OfficialDirectory(data.get('aliases'), data.get('jerseys')) # type: ignore
+        self._directories[league] = (time.monotonic(), directory)
+        return directory
+
+    def aggregate_path(self, league):
+        """Path holding the league's officials and team_stats collections.
+        
+        rebuild_aggregates.py builds a fresh copy under <league path>/aggregates/<version> and
+        swaps it in by pointing meta/aggregates at it. Before the first rebuild the collections
+        live directly under the league path.
+        
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+        """
+        cached = self._aggregate_paths.get(league)
+        if cached and time.monotonic() - cached[0] < AGGREGATE_POINTER_CACHE_SECONDS:
+            return cached[1]
+        
+        doc = self._aggregate_pointer(league).get()
+        firestore_usage.record('aggregate_path', reads=1)
+        return self._follow_aggregate_pointer(league, doc)
+
+    def _aggregate_pointer(self, league):
+        return self.db.collection(f"{LEAGUES[league]['firebase_path']}/meta").document('aggregates')
+
+    def _follow_aggregate_pointer(self, league, doc):
+        """Aggregate path named by a meta/aggregates snapshot, cached for aggregate_path()."""
+        firebase_path = LEAGUES[league]['firebase_path']
+        version = (doc.to_dict() or {}).get('version') if doc.exists else None
+        path = f"{firebase_path}/aggregates/{version}" if version else firebase_path
+        self._aggregate_paths[league] = (time.monotonic(), path)
+        return path
 
     def game_exists(self, league, game_id):
         """Check if a game already exists in the database for a specific league.
@@ -27,6 +128,7 @@ class DatabaseManager:
         
         firebase_path = config['firebase_path']
         doc = self.db.collection(f"{firebase_path}/games").document(str(game_id)).get()
+        firestore_usage.record('game_exists', reads=1)
         return doc.exists
 
     def save_game_results(self, league, game_data, season_id=65):
@@ -44,52 +146,251 @@ class DatabaseManager:
         
         firebase_path = config['firebase_path']
         game_id = str(game_data['game_number'])
+
+        # Only final games count towards official aggregates; earlier snapshots are re-polled
+        if not is_final_status(game_data.get('status')):
+            logger.info(f"Game {game_id} is not final ({game_data.get('status')}). Skipping.")
+            return False
         
-        if self.game_exists(league, game_id):
-            logger.info(f"Game {game_id} already exists. Skipping.")
+        # Applied games are skipped from memory; the game doc's create() below still refuses
+        # a duplicate if another instance applied it since the journal was loaded
+        journal = self.get_journal(league)
+        if game_id in journal:
+            logger.info(f"Game {game_id} already ingested. Skipping.")
             return False
 
-        # Save Game to league-specific collection
-        game_data['season_id'] = season_id # Add season ID to game data
-        self.db.collection(f"{firebase_path}/games").document(game_id).set(game_data)
-
         # Process Officials
-        officials = []
-        for ref_name in game_data.get('referees', []):
-            if ref_name and ref_name.strip() not in ["Unknown", "Unknown Unknown"]:
-                officials.append({'name': ref_name.strip(), 'type': 'referee'})
-        for line_name in game_data.get('linesmen', []):
-            if line_name and line_name.strip() not in ["Unknown", "Unknown Unknown"]:
-                officials.append({'name': line_name.strip(), 'type': 'linesman'})
-
-        batch = self.db.batch()
-        
-        for official in officials:
-            # Composite ID (Name + Season) to separate stats per season per league
+        # Parsers emit officials as [name, jersey_number] pairs; each resolves to a canonical ID
+        officials, new_jerseys = self.get_official_directory(league).resolve_game(game_data)
+
+        # Firestore rejects nested arrays, so officials are stored as name lists plus jersey lists,
+        # and the full penalty list goes to the penalties collection instead of the game doc.
+        game_doc = {k: v for k, v in game_data.items() if k != 'penalties'}
+        for key in ('referees', 'linesmen'):
+            pairs = [entry if isinstance(entry, (list, tuple)) else [entry, '0'] for entry in game_data.get(key, [])]
+            game_doc[key] = [pair[0] for pair in pairs]
+            game_doc[f"{key}_jerseys"] = [str(pair[1]) for pair in pairs]
+        game_doc['season_id'] = season_id # Add season ID to game data
+
+        # Team season aggregates: one doc per season, counters bumped in place
+        teams = {}
+        for abbrv, delta in game_team_deltas(game_data).items():
+            teams[abbrv] = {field: firestore.Increment(delta[field]) for field in COUNTER_FIELDS}
+            teams[abbrv]['info'] = delta['info']
+
+        penalties = game_data.get('penalties', [])
+        pointer_ref = self._aggregate_pointer(league)
+
+        @firestore.transactional
+        def apply_game(transaction):
+            """Game doc, penalty rows, journal entry and every aggregate as one atomic unit.
+            Firestore re-runs this on contention, so the reads happen inside it."""
+            # Official and team aggregates live under the current rebuild version, if any. The
+            # pointer is read here rather than through aggregate_path()'s cache, so a rebuild
+            # swapping it before this commits forces a retry onto the new version.
+            aggregates_path = self._follow_aggregate_pointer(league, next(iter(transaction.get_all([pointer_ref]))))
+
+            # Composite ID (Official ID + Season) to separate stats per season per league
             # ID example: "Steve_Smith_65"
-            doc_id = f"{official['name'].replace(' ', '_')}_{season_id}"
-            ref_ref = self.db.collection(f"{firebase_path}/officials").document(doc_id)
-            
-            doc = ref_ref.get()
-            
-            if doc.exists:
-                current_data = doc.to_dict()
-                new_games = current_data.get('games_called', 0) + 1 # type: ignore
-                new_pims = current_data.get('total_pims', 0) + int(game_data['total_pims']) # type: ignore
-            else:
-                new_games = 1
-                new_pims = int(game_data['total_pims'])
-
-            batch.set(ref_ref, {
-                'name': official['name'],
-                'role': official['type'],
-                'season_id': season_id, # Store season ID
-                'games_called': new_games,
-                'total_pims': new_pims,
-                'avg_pims': round(new_pims / new_games, 1)
-            }, merge=True)
-
-        batch.commit()
+            official_refs = [self.db.collection(f"{aggregates_path}/officials").document(f"{official['id']}_{season_id}")
+                             for official in officials]
+            current = {doc.reference.path: doc.to_dict() for doc in transaction.get_all(official_refs) if doc.exists}
+
+            # create() fails if the game doc exists, rolling back everything else with it
+            transaction.create(self.db.collection(f"{firebase_path}/games").document(game_id), game_doc)
+
+            # Normalized penalty rows, indexed by official (array), team and infraction
+            official_ids = [o['id'] for o in officials]
+            for index, penalty in enumerate(penalties):
+                row = dict(penalty)
+                row.update({'game_id': game_id, 'season_id': season_id, 'date': game_data.get('date', ''),
+                            'officials': official_ids})
+                transaction.set(self.db.collection(f"{firebase_path}/penalties").document(f"{game_id}_{index}"), row)
+
+            transaction.set(self.db.collection(f"{firebase_path}/journal").document(str(season_id)),
+                            {'season_id': season_id, 'game_ids': firestore.ArrayUnion([game_id])}, merge=True)
+
+            if new_jerseys:
+                transaction.set(self.db.collection(f"{firebase_path}/meta").document('official_identity'),
+                                {'jerseys': new_jerseys}, merge=True)
+
+            if teams:
+                transaction.set(self.db.collection(f"{aggregates_path}/team_stats").document(str(season_id)),
+                                {'season_id': season_id, 'teams': teams}, merge=True)
+
+            written = []
+            for official, ref_ref in zip(officials, official_refs):
+                current_data = current.get(ref_ref.path, {})
+                new_games = current_data.get('games_called', 0) + 1
+                new_pims = current_data.get('total_pims', 0) + int(game_data['total_pims'])
+
+                record = {
+                    'official_id': official['id'],
+                    'name': official['name'],
+                    'role': official['type'],
+                    'season_id': season_id, # Store season ID
+                    'games_called': new_games,
+                    'total_pims': new_pims,
+                    'avg_pims': round(new_pims / new_games, 1)
+                }
+                # Rolling PIM series for /api/official/<name>/trend, appended in O(1)
+                trend = append_game(current_data.get('trend'), game_id, game_data.get('date', ''), game_data['total_pims'])
+                transaction.set(ref_ref, dict(record, trend=trend), merge=True)
+                written.append(record)
+            return written
+
+        try:
+            with STAGE_SECONDS.time(stage='firestore_write', league=league):
+                written = apply_game(self.db.transaction())
+        except AlreadyExists:
+            logger.info(f"Game {game_id} already exists. Skipping.")
+            journal.record(game_id)
+            return False
+        finally:
+            firestore_usage.record('save_game_results', reads=1 + len(officials))
+        firestore_usage.record('save_game_results',
+                               writes=2 + len(officials) + len(penalties) + bool(new_jerseys) + bool(teams))
+        journal.record(game_id)
+        
+        for listener in self.officials_listeners:
+            listener(league, written)
+        return True
+
+    def get_journal(self, league):
+        """The league's ingestion journal, loaded from Firestore (one read per season) on first use.
+        
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+        """
+        journal = self._journals.get(league)
+        if journal is not None:
+            return journal
+        
+        journal = IngestionJournal(path=journal_path(league))
+        firebase_path = LEAGUES[league]['firebase_path']
+        docs = [doc.to_dict() for doc in self.db.collection(f"{firebase_path}/journal").stream()]
+        firestore_usage.record('get_journal', reads=max(1, len(docs)))
+        for data in docs:
+            journal.update(data.get('game_ids', []))
+        self._journals[league] = journal
+        return journal
+
+    def get_penalty_breakdown(self, league, season_id=65, official=None, team=None, infraction=None):
+        """Break down penalties by infraction for an official, team and/or infraction type.
+        Served from the normalized penalties collection by indexed equality / array-contains
+        filters, so no game documents are scanned.
+        
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+            season_id: The season ID to query
+            official: Only penalties in games this official worked (name or official ID)
+            team: Only penalties taken by this team abbreviation
+            infraction: Only this infraction code (e.g., 'roughing')
+        """
+        config = LEAGUES.get(league)
+        if not config:
+            logger.error(f"Unknown league: {league}")
+            return {}
+        
+        firebase_path = config['firebase_path']
+        official_id = self.get_official_directory(league).resolve(official) if official else None
+        query = self.db.collection(f"{firebase_path}/penalties").where('season_id', '==', season_id)
+        if official_id:
+            query = query.where('officials', 'array_contains', official_id)
+        if team:
+            query = query.where('team', '==', team)
+        if infraction:
+            query = query.where('infraction', '==', infraction)
+        
+        rows = [doc.to_dict() for doc in query.stream()]
+        firestore_usage.record('get_penalty_breakdown', reads=max(1, len(rows)))
+        
+        by_infraction = {}
+        by_minutes = {}
+        for row in rows:
+            entry = by_infraction.setdefault(row['infraction'], {'description': row.get('description', ''),
+                                                                 'count': 0, 'minutes': 0})
+            entry['count'] += 1
+            entry['minutes'] += row.get('minutes', 0)
+            by_minutes[str(row.get('minutes', 0))] = by_minutes.get(str(row.get('minutes', 0)), 0) + 1
+        
+        games = self._games_in_scope(league, season_id, official_id, team)
+        return {
+            'season_id': season_id,
+            'filters': {'official': official, 'team': team, 'infraction': infraction},
+            'games': games,
+            'total_penalties': len(rows),
+            'total_minutes': sum(row.get('minutes', 0) for row in rows),
+            'penalties_per_game': round(len(rows) / games, 1) if games else 0,
+            'by_minutes': by_minutes,
+            'by_infraction': dict(sorted(by_infraction.items(), key=lambda item: item[1]['count'], reverse=True))
+        }
+
+    def _games_in_scope(self, league, season_id, official_id=None, team=None):
+        """Games a penalty breakdown averages over: the season's, the official's or the team's.
+        
+        Read from the journal or an aggregate document (one read); an official and a team
+        together scan the team's game docs for the season.
+        """
+        firebase_path = LEAGUES[league]['firebase_path']
+        if official_id and team:
+            games = self.db.collection(f"{firebase_path}/games").where('season_id', '==', season_id)
+            docs = [doc.to_dict() for side in ('home_abbrv', 'visitor_abbrv')
+                    for doc in games.where(side, '==', team).stream()]
+            firestore_usage.record('get_penalty_breakdown', reads=max(1, len(docs)))
+            directory = self.get_official_directory(league)
+            return sum(1 for doc in docs
+                       if any(directory.resolve(name, jersey) == official_id
+                              for key in ('referees', 'linesmen')
+                              for name, jersey in zip(doc.get(key, []), doc.get(f"{key}_jerseys") or ['0'] * len(doc.get(key, [])))))
+        
+        firestore_usage.record('get_penalty_breakdown', reads=1)
+        if official_id:
+            doc = self.db.collection(f"{self.aggregate_path(league)}/officials").document(f"{official_id}_{season_id}").get()
+            return (doc.to_dict() or {}).get('games_called', 0) if doc.exists else 0
+        if team:
+            doc = self.db.collection(f"{self.aggregate_path(league)}/team_stats").document(str(season_id)).get()
+            teams = (doc.to_dict() or {}).get('teams', {}) if doc.exists else {}
+            return teams.get(team, {}).get('games_played', 0)
+        doc = self.db.collection(f"{firebase_path}/journal").document(str(season_id)).get()
+        return len((doc.to_dict() or {}).get('game_ids', [])) if doc.exists else 0
+
+    def get_ingestion_state(self, league):
+        """Load the ingestion watermark and re-poll queue for a league.
+        
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+        """
+        config = LEAGUES.get(league)
+        if not config:
+            logger.error(f"Unknown league: {league}")
+            return new_ingestion_state()
+        
+        firebase_path = config['firebase_path']
+        doc = self.db.collection(f"{firebase_path}/meta").document('ingestion').get()
+        firestore_usage.record('get_ingestion_state', reads=1)
+        if not doc.exists:
+            return new_ingestion_state()
+        
+        state = new_ingestion_state()
+        state.update(doc.to_dict())
+        return state
+
+    def save_ingestion_state(self, league, state):
+        """Persist the ingestion watermark and re-poll queue for a league.
+        
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+            state: State dict from ingestion.new_ingestion_state()
+        """
+        config = LEAGUES.get(league)
+        if not config:
+            logger.error(f"Unknown league: {league}")
+            return False
+        
+        firebase_path = config['firebase_path']
+        self.db.collection(f"{firebase_path}/meta").document('ingestion').set(state)
+        firestore_usage.record('save_ingestion_state', writes=1)
         return True
 
     def get_all_officials_for_season(self, league, season_id=65):
@@ -107,14 +408,64 @@ class DatabaseManager:
             logger.error(f"Unknown league: {league}")
             return []
         
-        firebase_path = config['firebase_path']
-        query = self.db.collection(f"{firebase_path}/officials").where('season_id', '==', season_id)
+        query = self.db.collection(f"{self.aggregate_path(league)}/officials").where('season_id', '==', season_id)
         docs = query.stream()
         
-        # Return all officials as-is
-        results = [doc.to_dict() for doc in docs]
+        # Return all officials as-is, minus the per-game trend series
+        results = [without_trend(doc.to_dict()) for doc in docs]
+        firestore_usage.record('get_all_officials_for_season', reads=max(1, len(results)))
         return results
     
+    def get_team_stats(self, league, season_id=65):
+        """Fetches the season's per-team penalty counters (a single document read).
+        
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+            season_id: The season ID to query
+            
+        Returns:
+            {team_abbrv: counters} as written by save_game_results
+        """
+        config = LEAGUES.get(league)
+        if not config:
+            logger.error(f"Unknown league: {league}")
+            return {}
+        
+        doc = self.db.collection(f"{self.aggregate_path(league)}/team_stats").document(str(season_id)).get()
+        firestore_usage.record('get_team_stats', reads=1)
+        return (doc.to_dict() or {}).get('teams', {}) if doc.exists else {}
+    
+    def get_all_officials(self, league):
+        """Fetches every official season record in a league (all seasons). Used to build
+        in-memory indexes once per instance; this reads the whole collection.
+        
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+        """
+        config = LEAGUES.get(league)
+        if not config:
+            logger.error(f"Unknown league: {league}")
+            return []
+        
+        results = [doc.to_dict() for doc in self.db.collection(f"{self.aggregate_path(league)}/officials").stream()]
+        firestore_usage.record('get_all_officials', reads=max(1, len(results)))
+        return results
+
+    def get_game_dates(self, league):
+        """Sorted dates (YYYY-MM-DD) with at least one stored game. Reads every game doc.
+        
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+        """
+        config = LEAGUES.get(league)
+        if not config:
+            logger.error(f"Unknown league: {league}")
+            return []
+        
+        docs = [doc.to_dict() for doc in self.db.collection(f"{config['firebase_path']}/games").stream()]
+        firestore_usage.record('get_game_dates', reads=max(1, len(docs)))
+        return sorted({data['date'] for data in docs if data.get('date')})
+
     # DEPRECATED: Kept for backwards compatibility if needed
     def get_leaderboard(self, league, role='all', sort_by='total_pims', order='desc', season_id=65, games_called_threshold=5):
         """
@@ -134,8 +485,7 @@ class DatabaseManager:
             logger.error(f"Unknown league: {league}")
             return []
         
-        firebase_path = config['firebase_path']
-        query = self.db.collection(f"{firebase_path}/officials").where('season_id', '==', season_id)
+        query = self.db.collection(f"{self.aggregate_path(league)}/officials").where('season_id', '==', season_id)
 
         # Apply Role Filter
         if role != 'all':
@@ -149,6 +499,7 @@ class DatabaseManager:
         
         # Post-query filtering in Python
         results = [doc.to_dict() for doc in docs]
+        firestore_usage.record('get_leaderboard', reads=max(1, len(results)))
         
         if games_called_threshold > 0:
             results = [r for r in results if r.get('games_called', 0) >= games_called_threshold]
@@ -161,39 +512,121 @@ class DatabaseManager:
         
         Args:
             league: League identifier (e.g., 'kijhl', 'whl')
-            official_name: The official's name to look up
+            official_name: The official's name (any spelling variant) or official ID
         """
         config = LEAGUES.get(league)
         if not config:
             logger.error(f"Unknown league: {league}")
             return {}
         
-        firebase_path = config['firebase_path']
-        query = self.db.collection(f"{firebase_path}/officials").where('name', '==', official_name)
-        docs = query.stream()
+        official_id = self.get_official_directory(league).resolve(official_name)
+        seasons = [without_trend(season) for season in
+                   self._official_seasons(league, official_id, official_name, 'get_official_career_stats')]
+        
+        return {
+            'name': official_name,
+            'official_id': official_id,
+            'seasons': seasons,
+            'career': career_totals(seasons)
+        }
+
+    def _official_seasons(self, league, official_id, official_name, call_site):
+        """All season records for one official, most recent season first."""
+        query = self.db.collection(f"{self.aggregate_path(league)}/officials").where('official_id', '==', official_id)
+        seasons = [doc.to_dict() for doc in query.stream()]
+        firestore_usage.record(call_site, reads=max(1, len(seasons)))
         
-        seasons = []
-        for doc in docs:
-            data = doc.to_dict()
-            seasons.append(data)
+        if not seasons:
+            # Records written before official IDs existed, until merge_officials.py re-keys them
+            query = self.db.collection(f"{self.aggregate_path(league)}/officials").where('name', '==', official_name)
+            seasons = [doc.to_dict() for doc in query.stream()]
+            firestore_usage.record(call_site, reads=max(1, len(seasons)))
         
         # Sort by season_id descending (most recent first)
         seasons.sort(key=lambda x: x.get('season_id', 0), reverse=True)
+        return seasons
+
+    def get_official_trend(self, league, official_name, season_id=None):
+        """Fetches an official's per-game PIM series and rolling averages, per season.
         
-        # Calculate career totals
-        career_totals = {
-            'total_games': sum(s.get('games_called', 0) for s in seasons),
-            'total_pims': sum(s.get('total_pims', 0) for s in seasons),
-            'seasons_count': len(seasons)
-        }
+        Args:
+            league: League identifier (e.g., 'kijhl', 'whl')
+            official_name: The official's name (any spelling variant) or official ID
+            season_id: Only this season (default: every season)
+        """
+        config = LEAGUES.get(league)
+        if not config:
+            logger.error(f"Unknown league: {league}")
+            return {}
         
-        if career_totals['total_games'] > 0:
-            career_totals['career_avg'] = int(round(career_totals['total_pims'] / career_totals['total_games'], 1))
-        else:
-            career_totals['career_avg'] = 0
+        official_id = self.get_official_directory(league).resolve(official_name)
+        seasons = self._official_seasons(league, official_id, official_name, 'get_official_trend')
+        if season_id is not None:
+            seasons = [s for s in seasons if s.get('season_id') == season_id]
         
         return {
             'name': official_name,
-            'seasons': seasons,
-            'career': career_totals
-        }
\ No newline at end of file
+            'official_id': official_id,
+            'windows': list(WINDOWS),
+            'seasons': [dict(trend_points(s.get('trend')), season_id=s.get('season_id'),
+                             games_called=s.get('games_called', 0)) for s in seasons]
+        }
+
+    def get_officials_career_stats_batch(self, officials):
+        """Fetches season records for several officials (optionally across leagues) in as few
+        reads as possible: one 'in' query per league per 30 officials, instead of one query each,
+        plus one by name for officials with no ID-keyed records (legacy records, as in _official_seasons).
+        
+        Args:
+            officials: List of (league, official_name) pairs
+            
+        Returns:
+            List of {'league', 'name', 'official_id', 'seasons', 'career'} in the order given
+        """
+        resolved = []
+        ids_by_league = {}
+        for league, official_name in officials:
+            if league not in LEAGUES:
+                logger.error(f"Unknown league: {league}")
+                continue
+            official_id = self.get_official_directory(league).resolve(official_name)
+            resolved.append((league, official_name, official_id))
+            ids_by_league.setdefault(league, set()).add(official_id)
+        
+        seasons_by_official = {}
+        for league, ids in ids_by_league.items():
+            ids = sorted(ids)
+            for i in range(0, len(ids), IN_QUERY_LIMIT):
+                query = self.db.collection(f"{self.aggregate_path(league)}/officials").where('official_id', 'in', ids[i:i + IN_QUERY_LIMIT])
+                docs = [doc.to_dict() for doc in query.stream()]
+                firestore_usage.record('get_officials_career_stats_batch', reads=max(1, len(docs)))
+                for data in map(without_trend, docs):
+                    seasons_by_official.setdefault((league, data['official_id']), []).append(data)
+        
+        # Records written before official IDs existed, until merge_officials.py re-keys them
+        legacy_names = {}
+        for league, official_name, official_id in resolved:
+            if (league, official_id) not in seasons_by_official:
+                legacy_names.setdefault(league, set()).add(official_name)
+        legacy_by_name = {}
+        for league, names in legacy_names.items():
+            names = sorted(names)
+            for i in range(0, len(names), IN_QUERY_LIMIT):
+                query = self.db.collection(f"{self.aggregate_path(league)}/officials").where('name', 'in', names[i:i + IN_QUERY_LIMIT])
+                docs = [doc.to_dict() for doc in query.stream()]
+                firestore_usage.record('get_officials_career_stats_batch', reads=max(1, len(docs)))
+                for data in map(without_trend, docs):
+                    legacy_by_name.setdefault((league, data['name']), []).append(data)
+        
+        results = []
+        for league, official_name, official_id in resolved:
+            seasons = seasons_by_official.get((league, official_id)) or legacy_by_name.get((league, official_name), [])
+            seasons = sorted(seasons, key=lambda x: x.get('season_id', 0), reverse=True)
+            results.append({
+                'league': league,
+                'name': official_name,
+                'official_id': official_id,
+                'seasons': seasons,
+                'career': career_totals(seasons)
+            })
+        return results
\ No newline at end of file
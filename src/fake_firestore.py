@@ -0,0 +1,307 @@
+"""In-memory stand-in for the Firestore client, for load tests and offline runs.
+
+Implements the part of google-cloud-firestore that DatabaseManager and the maintenance
+scripts use: documents addressed by path, set (with merge), create and delete, write
+batches, transactions (optimistic, retried by firestore.transactional on conflict),
+'==' / 'in' / 'array_contains' / range filters, order_by and limit, and the Increment and
+ArrayUnion transforms. Every read, write and query holds one process-wide lock, like a
+single Firestore backend would serialise conflicting commits.
+
+Selected with FIRESTORE_BACKEND=memory (see DatabaseManager.__init__). Set
+FIRESTORE_MEMORY_LATENCY (fake_hockeytech's latency spec, e.g. 'lognormal:8:0.5') to add a
+simulated round trip to every RPC.
+"""
+import copy
+import os
+import random
+import threading
+import time
+import uuid
+
+from google.api_core import exceptions
+from google.cloud.firestore_v1.transforms import ArrayUnion, Increment
+
+from fake_hockeytech import parse_latency
+
+def _get_field(data, field_path):
+    for part in field_path.split('.'):
+        if not isinstance(data, dict) or part not in data:
+            raise KeyError(field_path)
+        data = data[part]
+    return data
+
+def _matches(data, field_path, op, value) -> bool:
+    try:
+        field = _get_field(data, field_path)
+    except KeyError:
+        return False
+    if op == '==':
+        return field == value
+    if op == '!=':
+        return field != value
+    if op == 'in':
+        return field in value
+    if op == 'array_contains':
+        return isinstance(field, list) and value in field
+    if op in ('<', '<=', '>', '>='):
+        try:
+            return {'<': field < value, '<=': field <= value, '>': field > value, '>=': field >= value}[op]
+        except TypeError:
+            return False
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+def _apply_fields(target, data, merge):
+    """Write data into target, resolving transforms against target's current values."""
+    for key, value in data.items():
+        if isinstance(value, Increment):
+            current = target.get(key)
+            target[key] = (current if isinstance(current, (int, float)) else 0) + value.value
+        elif isinstance(value, ArrayUnion):
+            array = list(target.get(key) or [])
+            array.extend(v for v in value.values if v not in array)
+            target[key] = array
+        elif isinstance(value, dict):
+            # Maps merge field by field under merge=True; otherwise they replace
+            nested = target.get(key) if merge and isinstance(target.get(key), dict) else {}
+            target[key] = _apply_fields(nested, value, merge)
+        else:
+            target[key] = copy.deepcopy(value)
+    return target
+
+class DocumentSnapshot:
+
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self.exists else None
+
+    def get(self, field_path):
+        return copy.deepcopy(_get_field(self._data or {}, field_path))
+
+class DocumentReference:
+
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def __eq__(self, other):
+        return isinstance(other, DocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def collection(self, name):
+        return CollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self, transaction=None):
+        return self._client.get_all([self], transaction=transaction)[0]
+
+    def set(self, data, merge=False):
+        self._client._commit([('set', self, data, merge)])
+
+    def create(self, data):
+        self._client._commit([('create', self, data, False)])
+
+    def delete(self):
+        self._client._commit([('delete', self, None, False)])
+
+class Query:
+
+    def __init__(self, client, path, filters=(), orders=(), limit=None):
+        self._client = client
+        self._path = path
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+
+    def where(self, field_path, op_string, value):
+        return Query(self._client, self._path, self._filters + ((field_path, op_string, value),),
+                     self._orders, self._limit)
+
+    def order_by(self, field_path, direction='ASCENDING'):
+        return Query(self._client, self._path, self._filters, self._orders + ((field_path, direction),),
+                     self._limit)
+
+    def limit(self, count):
+        return Query(self._client, self._path, self._filters, self._orders, count)
+
+    def stream(self, transaction=None):
+        return iter(self._client._run_query(self, transaction))
+
+    def get(self, transaction=None):
+        return list(self.stream(transaction))
+
+class CollectionReference(Query):
+
+    def __init__(self, client, path):
+        super().__init__(client, path.strip('/'))
+
+    @property
+    def id(self):
+        return self._path.rsplit('/', 1)[-1]
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, f"{self._path}/{document_id or uuid.uuid4().hex[:20]}")
+
+class WriteBatch:
+
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(('set', reference, document_data, merge))
+
+    def create(self, reference, document_data):
+        self._writes.append(('create', reference, document_data, False))
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference, None, False))
+
+    def commit(self):
+        writes, self._writes = self._writes, []
+        return self._client._commit(writes)
+
+class Transaction(WriteBatch):
+    """Optimistic transaction: commit aborts (and firestore.transactional retries) if any
+    document it read has changed since."""
+
+    def __init__(self, client, max_attempts=5, read_only=False):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id = None
+        self._reads = {}
+
+    @property
+    def in_progress(self):
+        return self._id is not None
+
+    def _begin(self, retry_id=None):
+        self._id = uuid.uuid4().bytes
+
+    def _clean_up(self):
+        self._writes = []
+        self._reads = {}
+        self._id = None
+
+    def _rollback(self):
+        self._clean_up()
+
+    def _commit(self):
+        try:
+            return self._client._commit(self._writes, self._reads)
+        finally:
+            self._clean_up()
+
+    def _note_read(self, path, version):
+        self._reads.setdefault(path, version)
+
+    def get_all(self, references):
+        return self._client.get_all(references, transaction=self)
+
+    def get(self, ref_or_query):
+        if isinstance(ref_or_query, DocumentReference):
+            return iter(self.get_all([ref_or_query]))
+        return ref_or_query.stream(transaction=self)
+
+class Client:
+    """In-memory Firestore database."""
+
+    def __init__(self, latency=None, seed=None):
+        self._collections = {}  # collection path -> {doc_id: (version, data)}
+        self._lock = threading.Lock()
+        self._latency = parse_latency(latency) if latency else None
+        self._rng = random.Random(seed)
+        self.rpc_count = 0
+
+    def _rpc(self):
+        self.rpc_count += 1
+        if self._latency:
+            time.sleep(self._latency(self._rng))
+
+    def _lookup(self, path):
+        collection, _, doc_id = path.rpartition('/')
+        return self._collections.get(collection, {}).get(doc_id, (0, None))
+
+    def collection(self, path):
+        return CollectionReference(self, path)
+
+    def document(self, path):
+        return DocumentReference(self, path.strip('/'))
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def transaction(self, max_attempts=5, read_only=False):
+        return Transaction(self, max_attempts, read_only)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        self._rpc()
+        snapshots = []
+        with self._lock:
+            for reference in references:
+                version, data = self._lookup(reference.path)
+                if transaction is not None:
+                    transaction._note_read(reference.path, version)
+                snapshots.append(DocumentSnapshot(reference, data))
+        return snapshots
+
+    def _run_query(self, query, transaction=None):
+        self._rpc()
+        with self._lock:
+            docs = list(self._collections.get(query._path, {}).items())
+            results = []
+            for doc_id, (version, data) in docs:
+                if all(_matches(data, *f) for f in query._filters):
+                    if transaction is not None:
+                        transaction._note_read(f"{query._path}/{doc_id}", version)
+                    results.append(DocumentSnapshot(DocumentReference(self, f"{query._path}/{doc_id}"), data))
+        for field_path, direction in reversed(query._orders):
+            results = [r for r in results if _matches(r._data, field_path, '!=', object())]
+            results.sort(key=lambda r: _get_field(r._data, field_path), reverse=(direction == 'DESCENDING'))
+        return results[:query._limit] if query._limit is not None else results
+
+    def _commit(self, writes, reads=None):
+        """Apply writes atomically: every precondition is checked before anything changes."""
+        self._rpc()
+        with self._lock:
+            for path, version in (reads or {}).items():
+                if self._lookup(path)[0] != version:
+                    raise exceptions.Aborted(f"Transaction conflict on {path}")
+
+            staged = {}
+            for op, reference, data, merge in writes:
+                current_version, current = staged.get(reference.path, self._lookup(reference.path))
+                if op == 'create' and current is not None:
+                    raise exceptions.AlreadyExists(f"Document already exists: {reference.path}")
+                if op == 'delete':
+                    staged[reference.path] = (current_version + 1, None)
+                    continue
+                base = copy.deepcopy(current) if merge and current is not None else {}
+                staged[reference.path] = (current_version + 1, _apply_fields(base, data, merge))
+
+            for path, (version, data) in staged.items():
+                collection, _, doc_id = path.rpartition('/')
+                docs = self._collections.setdefault(collection, {})
+                if data is None:
+                    docs.pop(doc_id, None)
+                else:
+                    docs[doc_id] = (version, data)
+        return [None] * len(writes)
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+def shared_client():
+    """The process-wide in-memory database used when FIRESTORE_BACKEND=memory."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = Client(latency=os.environ.get('FIRESTORE_MEMORY_LATENCY') or None)
+        return _shared_client
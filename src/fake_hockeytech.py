@@ -0,0 +1,230 @@
+"""Local stand-in for the HockeyTech feed API, for load and fault testing the scraper.
+
+Serves the statviewfeed (gameSummary, schedule), modulekit gamesbydate and gc gamesummary
+endpoints from the payloads in fixtures/, wrapped in whichever JSONP callback the
+request asks for. Games and dates with no fixture are synthesised from a template
+fixture, so any date has games to scrape.
+
+Usage:
+    python fake_hockeytech.py --port 8090 --latency lognormal:80:0.6 --error-rate 0.02 --rate-limit-rate 0.05
+    HOCKEYTECH_BASE_URL=http://localhost:8090 python app.py
+
+Request counters are served as JSON at /__stats.
+"""
+import argparse
+import calendar
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from replay import FIXTURE_DIR, fixture_name_for_url, load_fixture
+
+TEMPLATE_GAMES = {'kijhl': 'kijhl_game_19059.jsonp', 'whl': 'whl_game_1022633.jsonp'}
+
+def parse_latency(spec: str):
+    """Build a latency sampler (returning seconds) from a spec string.
+
+    fixed:MS            Always MS milliseconds
+    uniform:LO:HI       Uniform between LO and HI milliseconds
+    lognormal:MEDIAN:SIGMA  Log-normal with the given median (ms) and shape, i.e. a long tail
+    """
+    kind, *args = spec.split(':')
+    values = [float(a) for a in args]
+    if kind == 'fixed':
+        return lambda rng: values[0] / 1000
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == 'lognormal':
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+class FaultConfig:
+    """How the fake server misbehaves. Rates are probabilities per request."""
+
+    def __init__(self, latency='fixed:0', error_rate=0.0, rate_limit_rate=0.0,
+                 slow_loris_rate=0.0, slow_loris_seconds=20.0, games_per_day=4, seed=None):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.slow_loris_rate = slow_loris_rate
+        self.slow_loris_seconds = slow_loris_seconds
+        self.games_per_day = games_per_day
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self):
+        """Pick (latency_seconds, fault) for one request; fault is None, 'error', '429' or 'slow'."""
+        with self.lock:
+            latency = self.latency(self.rng)
+            roll = self.rng.random()
+        if roll < self.error_rate:
+            return latency, 'error'
+        roll -= self.error_rate
+        if roll < self.rate_limit_rate:
+            return latency, '429'
+        roll -= self.rate_limit_rate
+        if roll < self.slow_loris_rate:
+            return latency, 'slow'
+        return latency, None
+
+def _unwrap(text: str) -> str:
+    """Strip the JSONP callback a fixture was saved with, leaving the JSON body."""
+    match = re.match(r'^[\w.$]+\((.*)\)\s*$', text, re.DOTALL)
+    return match.group(1) if match else text
+
+def synthetic_game_ids(league, month, day, count) -> list:
+    """Deterministic fake game IDs for a calendar day, so repeated schedule fetches agree."""
+    base = 900000 if league == 'kijhl' else 9000000
+    return [str(base + (month * 32 + day) * 10 + i) for i in range(count)]
+
+def synthetic_payload(params, games_per_day):
+    """Build a payload for a request that has no fixture."""
+    feed = params.get('feed')
+    view = params.get('view') or params.get('tab')
+    client = params.get('client_code', 'kijhl')
+
+    if view in ('gameSummary', 'gamesummary'):
+        template = json.loads(_unwrap(load_fixture(TEMPLATE_GAMES.get(client, TEMPLATE_GAMES['kijhl']))))
+        if client == 'whl':
+            template['GC']['Gamesummary']['meta']['id'] = params.get('game_id')
+        else:
+            template['details']['id'] = params.get('game_id')
+        return json.dumps(template)
+
+    if feed == 'statviewfeed' and view == 'schedule':
+        # The schedule is keyed by season and month only, and rows carry "Fri, Nov 7" style
+        # dates, so emit the month for every recent year to match whichever weekday is asked for
+        month = int(params.get('month', 1))
+        rows = []
+        seen = set()
+        for year in range(datetime.now().year - 6, datetime.now().year + 2):
+            for day in range(1, calendar.monthrange(year, month)[1] + 1):
+                date_with_day = datetime(year, month, day).strftime(f"%a, %b {day}")
+                if date_with_day in seen:
+                    continue
+                seen.add(date_with_day)
+                for game_id in synthetic_game_ids(client, month, day, games_per_day):
+                    rows.append({'row': {'game_id': game_id, 'date_with_day': date_with_day}})
+        return json.dumps([{'sections': [{'data': rows}]}])
+
+    if feed == 'modulekit' and view == 'gamesbydate':
+        dt = datetime.strptime(params.get('fetch_date', '2025-01-01'), '%Y-%m-%d')
+        ids = synthetic_game_ids(client, dt.month, dt.day, games_per_day)
+        return json.dumps({'SiteKit': {'Gamesbydate': [{'id': game_id} for game_id in ids]}})
+
+    return None
+
+def make_handler(faults: FaultConfig, stats: Counter):
+    class HockeyTechHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _count(self, key):
+            with faults.lock:
+                stats[key] += 1
+
+        def _send(self, status, body: bytes, content_type='application/javascript'):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if status == 429:
+                self.send_header('Retry-After', '1')
+            self.end_headers()
+            self.wfile.write(body)
+            self._count(f"status_{status}")
+
+        def _send_slowly(self, body: bytes):
+            """Slow-loris: headers arrive promptly, the body trickles in over slow_loris_seconds."""
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/javascript')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            chunks = max(1, int(faults.slow_loris_seconds))
+            size = max(1, len(body) // chunks + 1)
+            for i in range(0, len(body), size):
+                self.wfile.write(body[i:i + size])
+                self.wfile.flush()
+                time.sleep(faults.slow_loris_seconds / chunks)
+            self._count('status_200_slow')
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            self._count('requests')
+
+            if url.path == '/__stats':
+                return self._send(200, json.dumps(dict(stats)).encode(), 'application/json')
+            if not url.path.startswith('/feed'):
+                return self._send(404, b'Not found', 'text/plain')
+
+            latency, fault = faults.draw()
+            time.sleep(latency)
+
+            if fault == 'error':
+                return self._send(500, b'Internal Server Error', 'text/plain')
+            if fault == '429':
+                return self._send(429, b'Too Many Requests', 'text/plain')
+
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            name = fixture_name_for_url(self.path)
+            if name and (FIXTURE_DIR / name).exists():
+                payload = _unwrap(load_fixture(name))
+            else:
+                payload = synthetic_payload(params, faults.games_per_day)
+            if payload is None:
+                return self._send(404, b'Unknown feed', 'text/plain')
+
+            callback = params.get('callback')
+            body = (f"{callback}({payload})" if callback else payload).encode()
+            if fault == 'slow':
+                return self._send_slowly(body)
+            return self._send(200, body)
+
+    return HockeyTechHandler
+
+def start_server(host='127.0.0.1', port=0, **fault_options):
+    """Start the fake server on a background thread.
+
+    Returns (server, base_url). Use port=0 for a free port; call server.shutdown() when done.
+    Request counters are available on server.stats.
+    """
+    faults = FaultConfig(**fault_options)
+    stats = Counter()
+    server = ThreadingHTTPServer((host, port), make_handler(faults, stats))
+    server.daemon_threads = True
+    server.stats = stats # type: ignore
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', default='fixed:0', help='fixed:MS | uniform:LO:HI | lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--slow-loris-rate', type=float, default=0.0, help='Fraction of responses trickled slowly')
+    parser.add_argument('--slow-loris-seconds', type=float, default=20.0)
+    parser.add_argument('--games-per-day', type=int, default=4, help='Games on synthesised schedule days')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+                                    rate_limit_rate=args.rate_limit_rate, slow_loris_rate=args.slow_loris_rate,
+                                    slow_loris_seconds=args.slow_loris_seconds,
+                                    games_per_day=args.games_per_day, seed=args.seed)
+    print(f"Fake HockeyTech serving on {base_url} (set HOCKEYTECH_BASE_URL={base_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,86 @@
+"""Firestore read/write accounting per call site, per HTTP endpoint and per day.
+
+DatabaseManager reports every operation through record(). Counts feed the
+zebrazone_firestore_operations_total metric, the optional X-Firestore-Ops debug header,
+and a per-day budget that logs a warning once the day's reads or writes pass it.
+
+Budgets default to the Firestore free tier and can be set with FIRESTORE_DAILY_READ_BUDGET
+and FIRESTORE_DAILY_WRITE_BUDGET. Counts are per process, so with several Cloud Run
+instances each one warns against the full budget.
+"""
+from contextvars import ContextVar
+from datetime import datetime
+import logging
+import os
+import threading
+import pytz
+
+from metrics import FIRESTORE_OPERATIONS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DAILY_BUDGETS = {
+    'reads': int(os.environ.get('FIRESTORE_DAILY_READ_BUDGET', 50000)),
+    'writes': int(os.environ.get('FIRESTORE_DAILY_WRITE_BUDGET', 20000)),
+}
+
+# Firestore quotas reset at midnight Pacific time
+QUOTA_TIMEZONE = pytz.timezone('America/Los_Angeles')
+
+# HTTP endpoint of the current request ('background' outside of Flask), and its running totals
+endpoint_var = ContextVar('firestore_endpoint', default='background')
+request_usage_var = ContextVar('firestore_request_usage', default=None)
+
+_lock = threading.Lock()
+_daily = {'day': None, 'reads': 0, 'writes': 0, 'rpcs': 0, 'warned': set()}
+
+def start_request(endpoint: str):
+    """Begin counting operations for a new HTTP request."""
+    endpoint_var.set(endpoint or 'unknown')
+    request_usage_var.set({'reads': 0, 'writes': 0, 'rpcs': 0})
+
+def request_usage():
+    """Operations counted so far in the current request, or None outside a request."""
+    return request_usage_var.get()
+
+def daily_usage() -> dict:
+    """Totals for the current quota day."""
+    with _lock:
+        return {key: _daily[key] for key in ('day', 'reads', 'writes', 'rpcs')}
+
+def record(call_site: str, reads=0, writes=0, rpcs=1):
+    """Count Firestore operations made by a DatabaseManager method.
+
+    Args:
+        call_site: Method name (e.g., 'get_all_officials_for_season')
+        reads: Documents read (queries returning nothing still bill one read)
+        writes: Documents written or deleted
+        rpcs: Round trips to Firestore
+    """
+    endpoint = endpoint_var.get()
+    for operation, amount in (('reads', reads), ('writes', writes), ('rpcs', rpcs)):
+        if amount:
+            FIRESTORE_OPERATIONS.inc(amount, operation=operation, call_site=call_site, endpoint=endpoint)
+
+    usage = request_usage_var.get()
+    if usage is not None:
+        usage['reads'] += reads
+        usage['writes'] += writes
+        usage['rpcs'] += rpcs
+
+    today = datetime.now(QUOTA_TIMEZONE).date().isoformat()
+    with _lock:
+        if _daily['day'] != today:
+            _daily.update({'day': today, 'reads': 0, 'writes': 0, 'rpcs': 0, 'warned': set()})
+        _daily['reads'] += reads
+        _daily['writes'] += writes
+        _daily['rpcs'] += rpcs
+        over_budget = [kind for kind, budget in DAILY_BUDGETS.items()
+                       if _daily[kind] > budget and kind not in _daily['warned']]
+        _daily['warned'].update(over_budget)
+        totals = dict(_daily)
+
+    for kind in over_budget:
+        logger.warning(f"Firestore daily {kind} budget exceeded: {totals[kind]} > {DAILY_BUDGETS[kind]} "
+                       f"(last call: {call_site} from {endpoint})")
@@ -1,9 +1,15 @@
+from abc import ABC, abstractmethod
 import requests
 import json
+import os
+import random
 import re
+import threading
+import time
 from datetime import datetime
 import logging
-from league_config import LEAGUES
+from league_config import LEAGUES, HOCKEYTECH_BASE_URL
+from metrics import CACHE_REQUESTS, STAGE_SECONDS, UPSTREAM_RESPONSES
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +29,30 @@ BASE_HEADERS = {
     }
 }
 
+# statviewfeed schedules come a month at a time; a parsed month is reused for this long.
+# Past months rarely change, the current and later months get postponements and additions.
+SCHEDULE_CACHE_SECONDS = 300
+PAST_SCHEDULE_CACHE_SECONDS = 24 * 3600
+
+# RAW_PAYLOAD_DIR keeps every fetched game summary as <dir>/<league>/<game_id>.jsonp, so
+# rebuild_aggregates.py --reparse can re-run the current parsers without hitting HockeyTech
+RAW_PAYLOAD_DIR = os.environ.get('RAW_PAYLOAD_DIR', '')
+
+def raw_payload_path(league: str, game_id, root=None) -> str:
+    return os.path.join(root or RAW_PAYLOAD_DIR, league, f"{game_id}.jsonp")
+
+def save_raw_payload(league: str, game_id, text: str):
+    """Write a game summary payload to RAW_PAYLOAD_DIR (no-op when unset)."""
+    if not RAW_PAYLOAD_DIR or not text:
+        return
+    path = raw_payload_path(league, game_id)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    except OSError as e:
+        logger.warning(f"Could not cache raw payload for game {game_id}: {e}")
+
 def _load_jsonp(text: str) -> dict:
     """Helper: Strip JSONP callback and return parsed JSON dict."""
     if not text:
@@ -47,97 +77,55 @@ def _load_jsonp(text: str) -> dict:
         logger.error(f"Error parsing JSONP: {e}")
         return {}
 
+def _fetch(url: str, league: str, endpoint: str, timeout: int, session=requests):
+    """Helper: GET a HockeyTech feed URL, recording its latency and response status.
+    
+    Args:
+        url: Feed URL
+        league: League identifier (e.g., 'kijhl', 'whl')
+        endpoint: Short feed name for metrics ('schedule' or 'game')
+        timeout: Request timeout in seconds
+        session: requests.Session to send it through (default: a one-off connection)
+    """
+    stage = 'game_fetch' if endpoint == 'game' else 'schedule_fetch'
+    try:
+        with STAGE_SECONDS.time(stage=stage, league=league):
+            response = session.get(url, headers=BASE_HEADERS.get(league, {}), timeout=timeout)
+    except requests.exceptions.RequestException:
+        UPSTREAM_RESPONSES.inc(league=league, endpoint=endpoint, status='error')
+        raise
+    UPSTREAM_RESPONSES.inc(league=league, endpoint=endpoint, status=response.status_code)
+    return response
+
+def _decode(text: str, league: str) -> dict:
+    """Helper: _load_jsonp with decode timing."""
+    with STAGE_SECONDS.time(stage='jsonp_decode', league=league):
+        return _load_jsonp(text)
+
 def get_game_ids_by_date_kijhl(date_str: str, season_id: int) -> list:
     """
     Fetches game IDs for KIJHL for a specific date (YYYY-MM-DD).
     """
-    try:
-        # Get league config
-        config = LEAGUES.get('kijhl')
-        if not config:
-            logger.error("KIJHL league config not found")
-            return []
-        
-        # Parse input date
-        dt = datetime.strptime(date_str, '%Y-%m-%d')
-        
-        # Format date for filtering (e.g., "Fri, Nov 7")
-        # Remove zero-padding from day (e.g., 07 -> 7) to match API format
-        day_val = dt.day
-        formatted_date = dt.strftime(f"%a, %b {day_val}")
-
-        # Construct URL dynamically based on month using league config
-        url = (f"https://lscluster.hockeytech.com/feed/index.php?feed=statviewfeed&view=schedule"
-               f"&team=-1&season={season_id}&month={dt.month}&location=homeaway&key={config['api_key']}"
-               f"&client_code={config['client_code']}&site_id=2&league_id=1&conference_id=-1&division_id=-1&lang=en"
-               f"&callback=angular.callbacks._3")
-
-        response = requests.get(url, headers=BASE_HEADERS.get('kijhl', {}), timeout=10)
-        response.raise_for_status()
-        
-        data = _load_jsonp(response.text)
-        
-        game_ids = []
-        
-        # Navigate JSON structure: [0]['sections'][0]['data']
-        if data and isinstance(data, list) and data[0].get('sections'):
-            games_data = data[0]['sections'][0].get('data', [])
-            for game in games_data:
-                row = game.get('row', {})
-                # Match the formatted date string
-                if row.get('date_with_day') == formatted_date:
-                    if 'game_id' in row:
-                        game_ids.append(row['game_id'])
-        
-        return game_ids
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Network error fetching KIJHL schedule: {e}")
-        return []
-    except Exception as e:
-        logger.error(f"Unexpected error fetching KIJHL schedule: {e}")
-        return []
+    return ADAPTERS['kijhl'].schedule_game_ids(date_str, season_id)
 
 def get_game_ids_by_date_whl(date_str: str, season_id: int) -> list:
     """
     Fetches game IDs for WHL for a specific date (YYYY-MM-DD).
     """
-    url = (f"https://lscluster.hockeytech.com/feed/?feed=modulekit&key=f1aa699db3d81487&view=gamesbydate"
-           f"&fetch_date={date_str}&client_code=whl&lang_code=en&fmt=json&callback=jsonp_1769492720618_46885")
-    
-    response = requests.get(url, headers=BASE_HEADERS.get('whl', {}), timeout=10)
-    response.raise_for_status()
-
-    data = _load_jsonp(response.text)
-
-    game_ids = []
-
-    # Navigate JSON structure: data['Games']
-    gamesbydate = data.get('SiteKit', {}).get('Gamesbydate', [])
-
-    for game in gamesbydate:
-        game_ids.append(game.get('id'))
-
-    return game_ids
+    return ADAPTERS['whl'].schedule_game_ids(date_str, season_id)
 
 def get_game_ids_by_date(date_str, league, season_id=None) -> list:
     """
     Fetches game IDs for a specific date (YYYY-MM-DD).
-    Dispatches to league-specific implementations.
+    Dispatches to the league's adapter.
     
     Args:
         date_str: Date string in YYYY-MM-DD format
         league: League identifier (e.g., 'kijhl', 'whl')
         season_id: Season ID for the league
     """
-    # League-specific dispatchers
-    LEAGUE_DISPATCHERS = {
-        'kijhl': get_game_ids_by_date_kijhl,
-        'whl': get_game_ids_by_date_whl,
-    }
-    
-    # Validate league
-    if league not in LEAGUES:
+    adapter = ADAPTERS.get(league)
+    if not adapter:
         logger.error(f"Unknown league: {league}")
         return []
     
@@ -145,14 +133,15 @@ def get_game_ids_by_date(date_str, league, season_id=None) -> list:
         logger.error(f"season_id is required")
         return []
     
-    # Get the appropriate dispatcher function
-    dispatcher = LEAGUE_DISPATCHERS.get(league)
-    if not dispatcher:
-        logger.error(f"No dispatcher found for league: {league}")
-        return []
+    return adapter.schedule_game_ids(date_str, season_id)
+
+def infraction_code(description: str) -> str:
+    """Normalise a penalty description to a league-independent infraction code.
     
-    # Call the league-specific function
-    return dispatcher(date_str, season_id)
+    e.g. 'Fighting (Major)' -> 'fighting', 'Too Many Men' -> 'too_many_men'
+    """
+    description = re.sub(r'\(.*?\)', '', description or '').strip().lower()
+    return re.sub(r'[^a-z0-9]+', '_', description).strip('_') or 'unknown'
 
 def parse_kijhl_game(data: dict) -> dict:
     """Parse KIJHL game data from API response."""
@@ -215,6 +204,28 @@ def parse_kijhl_game(data: dict) -> dict:
 
         return fight_count, major_penalty_count, notable_penalties
     
+    def get_all_penalties():
+        # One compact row per infraction, including minors and misconducts
+        rows = []
+        for period in data.get('periods', []):
+            for penalty in period.get('penalties', []):
+                player = penalty.get('takenBy') or {}
+                rows.append({
+                    'period': str((penalty.get('period') or {}).get('id', '')),
+                    'time': penalty.get('time', ''),
+                    'team': (penalty.get('againstTeam') or {}).get('abbreviation', ''),
+                    'player': f"{player.get('firstName', 'Unknown').rstrip().title()} "
+                              f"{player.get('lastName', 'Unknown').rstrip().title()} #{player.get('jerseyNumber', '0')}",
+                    'infraction': infraction_code(penalty.get('description', '')),
+                    'description': penalty.get('description', ''),
+                    'minutes': int(penalty.get('minutes', 0) or 0),
+                    'power_play': bool(penalty.get('isPowerPlay')),
+                    # A fight candidate by the rule in get_fight_and_major_penalty_count
+                    'fighting': penalty.get('minutes', 0) == 5 and penalty.get('description', '').startswith('Fighting')
+                                and penalty.get('isPowerPlay') == False
+                })
+        return rows
+
     fight_count, major_penalty_count, notable_penalties = get_fight_and_major_penalty_count()
 
     stats = {
@@ -237,6 +248,7 @@ def parse_kijhl_game(data: dict) -> dict:
             'major_penalty_count': major_penalty_count,
             'notable_penalties': notable_penalties
         },
+        'penalties': get_all_penalties(),
         'officials': {
             'referees': [
                 [get_official_name(referees, 0), '0'], [get_official_name(referees, 1), '0']
@@ -296,6 +308,26 @@ def parse_whl_game(data: dict) -> dict:
 
         return fight_count, major_penalty_count, notable_penalties
     
+    def get_all_penalties():
+        # One compact row per infraction, including minors and misconducts
+        rows = []
+        for penalty in gamesummary.get('penalties', []):
+            player = penalty.get('player_penalized_info') or {}
+            rows.append({
+                'period': str(penalty.get('period', '')),
+                'time': penalty.get('time_off_formatted', ''),
+                'team': player.get('team_code', ''),
+                'player': f"{player.get('first_name', 'Unknown').rstrip().title()} "
+                          f"{player.get('last_name', 'Unknown').rstrip().title()} #{player.get('jersey_number', '0')}",
+                'infraction': infraction_code(penalty.get('lang_penalty_description', '')),
+                'description': penalty.get('lang_penalty_description', ''),
+                'minutes': int(float(penalty.get('minutes', 0) or 0)),
+                'power_play': penalty.get('pp') == '1',
+                # A fight candidate by the rule in get_fight_and_major_penalty_count
+                'fighting': penalty.get('minutes', 0) == 5 and penalty.get('offence') == '54' and penalty.get('pp') == '0'
+            })
+        return rows
+
     # Extract team info
     home_team = gamesummary.get('home', {})
     visitor_team = gamesummary.get('visitor', {})
@@ -337,6 +369,7 @@ def parse_whl_game(data: dict) -> dict:
             'major_penalty_count': major_penalty_count,
             'notable_penalties': notable_penalties
         },
+        'penalties': get_all_penalties(),
         'officials': {
             'referees': referees,
             'linesmen': linesmen,
@@ -350,6 +383,130 @@ def parse_whl_game(data: dict) -> dict:
 
     return stats
 
+class _KeepMissing(dict):
+    """format_map() mapping that leaves unknown {placeholders} in place."""
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+class LeagueAdapter(ABC):
+    """Everything needed to talk to one league's HockeyTech feeds, built once at import.
+
+    Each adapter owns its URL templates (with the key, client code and callback already
+    filled in), a pooled HTTP session and a semaphore bounding its concurrent requests, so
+    one league's slow feed or rate limit never holds up another's. Subclasses supply the
+    schedule lookup and the game summary parser for their feed family.
+    """
+    parser = None
+
+    def __init__(self, league: str, config: dict):
+        self.league = league
+        self.config = config
+        fixed = _KeepMissing(api_key=config['api_key'], client_code=config['client_code'],
+                             callback=f"jsonp_{int(time.time() * 1000)}_{random.randint(10000, 99999)}")
+        self.game_url = config['base_url'].format_map(fixed)
+        self.schedule_url = config['schedule_url'].format_map(fixed)
+        self.max_concurrency = config.get('max_concurrency', 15)
+        self.semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self.session = requests.Session()
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=self.max_concurrency))
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=self.max_concurrency))
+
+    def use_base_url(self, base_url: str):
+        """Point this league at another HockeyTech host (e.g. a fake_hockeytech server) at runtime."""
+        base_url = base_url.rstrip('/')
+        self.game_url = self.game_url.replace(HOCKEYTECH_BASE_URL, base_url, 1)
+        self.schedule_url = self.schedule_url.replace(HOCKEYTECH_BASE_URL, base_url, 1)
+
+    def fetch(self, url: str, endpoint: str, timeout: int):
+        """GET a feed URL through this league's session, within its concurrency budget."""
+        with self.semaphore:
+            return _fetch(url, self.league, endpoint, timeout, session=self.session)
+
+    @abstractmethod
+    def schedule_game_ids(self, date_str: str, season_id: int) -> list:
+        """Game IDs scheduled on a date (YYYY-MM-DD). Raises if the schedule can't be read."""
+
+    def parse_game(self, data: dict) -> dict:
+        return type(self).parser(data)
+
+class StatviewFeedAdapter(LeagueAdapter):
+    """statviewfeed leagues (KIJHL): monthly schedule filtered by date, gameSummary parser."""
+    parser = staticmethod(parse_kijhl_game)
+
+    def __init__(self, league: str, config: dict):
+        super().__init__(league, config)
+        self._months = {}  # schedule URL -> (fetched_at, ttl, {date_with_day: [game_id, ...]})
+        self._months_lock = threading.Lock()
+
+    def schedule_game_ids(self, date_str: str, season_id: int) -> list:
+        """Game IDs scheduled on a date. Fetch and decode failures raise, so callers can tell
+        an outage apart from a day without games."""
+        # Parse input date
+        dt = datetime.strptime(date_str, '%Y-%m-%d')
+        
+        # Format date for filtering (e.g., "Fri, Nov 7")
+        # Remove zero-padding from day (e.g., 07 -> 7) to match API format
+        formatted_date = dt.strftime(f"%a, %b {dt.day}")
+        return list(self.month_index(dt, season_id).get(formatted_date, []))
+
+    def month_index(self, dt: datetime, season_id: int) -> dict:
+        """{date_with_day: [game_id, ...]} for the month containing dt, fetched once per
+        SCHEDULE_CACHE_SECONDS (PAST_SCHEDULE_CACHE_SECONDS for months already over)."""
+        url = self.schedule_url.format(season_id=season_id, month=dt.month)
+        with self._months_lock:
+            cached = self._months.get(url)
+            if cached and time.monotonic() - cached[0] < cached[1]:
+                CACHE_REQUESTS.inc(cache='schedule_month', result='hit')
+                return cached[2]
+        CACHE_REQUESTS.inc(cache='schedule_month', result='miss')
+
+        response = self.fetch(url, 'schedule', timeout=10)
+        response.raise_for_status()
+        
+        data = _decode(response.text, self.league)
+        if not isinstance(data, list):
+            raise ValueError(f"Unreadable {self.league.upper()} schedule for {dt:%Y-%m}")
+        
+        index = {}
+        
+        # Navigate JSON structure: [0]['sections'][0]['data']
+        if data and data[0].get('sections'):
+            games_data = data[0]['sections'][0].get('data', [])
+            for game in games_data:
+                row = game.get('row', {})
+                if 'game_id' in row:
+                    index.setdefault(row.get('date_with_day'), []).append(row['game_id'])
+        
+        now = datetime.now()
+        past = (dt.year, dt.month) < (now.year, now.month)
+        with self._months_lock:
+            self._months[url] = (time.monotonic(), PAST_SCHEDULE_CACHE_SECONDS if past else SCHEDULE_CACHE_SECONDS, index)
+        return index
+
+class ModulekitAdapter(LeagueAdapter):
+    """modulekit/gc leagues (WHL): games-by-date schedule, gc gamesummary parser."""
+    parser = staticmethod(parse_whl_game)
+
+    def schedule_game_ids(self, date_str: str, season_id: int) -> list:
+        response = self.fetch(self.schedule_url.format(date=date_str), 'schedule', timeout=10)
+        response.raise_for_status()
+
+        data = _decode(response.text, self.league)
+        if not isinstance(data, dict) or 'SiteKit' not in data:
+            raise ValueError(f"Unreadable {self.league.upper()} schedule for {date_str}")
+
+        # Navigate JSON structure: data['SiteKit']['Gamesbydate']
+        gamesbydate = data['SiteKit'].get('Gamesbydate', [])
+        return [game.get('id') for game in gamesbydate]
+
+ADAPTER_TYPES = {
+    'statviewfeed': StatviewFeedAdapter,
+    'modulekit': ModulekitAdapter,
+}
+
+# league -> adapter, built once from league_config.LEAGUES
+ADAPTERS = {league: ADAPTER_TYPES[config['feed']](league, config) for league, config in LEAGUES.items()}
+
 def fetch_game_api(game_number, league):
     """Fetch detailed game stats.
     
@@ -357,36 +514,24 @@ def fetch_game_api(game_number, league):
         game_number: The game ID to fetch
         league: League identifier (e.g., 'kijhl', 'whl')
     """
-    # Get league config
-    config = LEAGUES.get(league)
-
-    # League-specific parser mapping
-    LEAGUE_DISPATCHERS = {
-        'kijhl': parse_kijhl_game,
-        'whl': parse_whl_game,
-    }
-    
-    if not config:
+    adapter = ADAPTERS.get(league)
+    if not adapter:
         logger.error(f"Unknown league: {league}")
         return game_number, None, f"Unknown league: {league}"
     
-    url = (config['base_url'].format(game_id=game_number))
-
     try:
-        response = requests.get(url, headers=BASE_HEADERS.get(league, {}), timeout=15)
+        response = adapter.fetch(adapter.game_url.format(game_id=game_number), 'game', timeout=15)
         response.raise_for_status()
-        data = _load_jsonp(response.text)
+        save_raw_payload(league, game_number, response.text)
+        data = _decode(response.text, league)
         
         if not data:
             return game_number, None, "Empty response"
-        
-        parser = LEAGUE_DISPATCHERS.get(league)
-        if not parser:
-            return game_number, None, f"No parser for league: {league}"
 
-        stats = parser(data)
+        with STAGE_SECONDS.time(stage='parse', league=league):
+            stats = adapter.parse_game(data)
 
         return game_number, stats, None
             
     except Exception as e:
-        return game_number, None, f"{type(e).__name__}: {str(e)}"
\ No newline at end of file
+        return game_number, None, f"{type(e).__name__}: {str(e)}"
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+import logging
+import os
+import threading
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Catch-up and re-poll limits for the daily update task
+MAX_CATCHUP_DAYS = 14          # Dates scraped per run when the watermark is far behind
+REPOLL_BASE_MINUTES = 30       # First re-poll delay for a non-final game
+REPOLL_MAX_MINUTES = 24 * 60   # Backoff ceiling
+MAX_REPOLL_ATTEMPTS = 10       # Give up on games that never go final (postponed, cancelled)
+
+# INGESTION_JOURNAL_DIR mirrors each league's journal to <dir>/<league>.journal, so bulk runs
+# (backfills, replays) start with every applied game ID without reading Firestore
+INGESTION_JOURNAL_DIR = os.environ.get('INGESTION_JOURNAL_DIR', '')
+
+def is_final_status(status) -> bool:
+    """Return True if a game status string marks the game as final.
+
+    KIJHL and WHL both report 'Final', 'Final OT', 'Final SO' once a game is over.
+    """
+    return str(status or '').strip().lower().startswith('final')
+
+def new_ingestion_state() -> dict:
+    """Return an empty per-league ingestion state.
+
+    watermark: last date (YYYY-MM-DD) whose schedule was fully ingested. Every game on
+               or before it is either saved or waiting in 'pending'.
+    pending:   game_id -> {'date', 'season_id', 'attempts', 'next_poll'} for games that
+               were not final yet (or failed to fetch) when their date was scraped.
+    """
+    return {'watermark': None, 'pending': {}}
+
+def dates_to_scrape(state, today, max_days=MAX_CATCHUP_DAYS) -> list:
+    """List the dates after the watermark up to today, oldest first.
+
+    Args:
+        state: Ingestion state dict
+        today: datetime.date for the current day in league time
+        max_days: Maximum number of dates to return, so a long gap is filled over several runs
+    """
+    watermark = state.get('watermark')
+    if not watermark:
+        return [today.strftime('%Y-%m-%d')]
+
+    start = datetime.strptime(watermark, '%Y-%m-%d').date() + timedelta(days=1)
+    dates = []
+    current = start
+    while current <= today and len(dates) < max_days:
+        dates.append(current.strftime('%Y-%m-%d'))
+        current += timedelta(days=1)
+    return dates
+
+def next_poll_time(attempts, now) -> datetime:
+    """Exponential backoff for re-polling a non-final game."""
+    delay = min(REPOLL_BASE_MINUTES * (2 ** attempts), REPOLL_MAX_MINUTES)
+    return now + timedelta(minutes=delay)
+
+def queue_pending(state, game_id, date_str, season_id, now):
+    """Add a game to the re-poll queue, or push back its next poll if already queued.
+
+    Returns False once the game has used up MAX_REPOLL_ATTEMPTS and was dropped.
+    """
+    pending = state.setdefault('pending', {})
+    key = str(game_id)
+    entry = pending.get(key, {'date': date_str, 'season_id': season_id, 'attempts': 0})
+
+    if entry['attempts'] >= MAX_REPOLL_ATTEMPTS:
+        logger.warning(f"Game {key} ({entry['date']}) never went final after {entry['attempts']} polls. Dropping.")
+        pending.pop(key, None)
+        return False
+
+    entry['next_poll'] = next_poll_time(entry['attempts'], now).isoformat()
+    entry['attempts'] += 1
+    pending[key] = entry
+    return True
+
+def resolve_pending(state, game_id):
+    """Remove a game from the re-poll queue once it has been saved as final."""
+    state.setdefault('pending', {}).pop(str(game_id), None)
+
+def due_pending(state, now) -> list:
+    """Return (game_id, entry) pairs whose next poll time has passed, oldest date first."""
+    due = [
+        (game_id, entry) for game_id, entry in state.get('pending', {}).items()
+        if datetime.fromisoformat(entry['next_poll']) <= now
+    ]
+    due.sort(key=lambda item: item[1]['date'])
+    return due
+
+class IngestionJournal:
+    """Game IDs already applied to one league's games, penalties and aggregates.
+
+    The durable copy is written in the same Firestore transaction as the game itself (see
+    DatabaseManager.save_game_results), so the journal and the aggregates cannot disagree.
+    This in-memory set answers "already ingested?" without a read per game, optionally
+    mirrored to an append-only local file.
+    """
+
+    def __init__(self, game_ids=(), path=None):
+        self.path = path
+        self._applied = {str(game_id) for game_id in game_ids}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self._applied.update(line.strip() for line in f if line.strip())
+
+    def __contains__(self, game_id) -> bool:
+        return str(game_id) in self._applied
+
+    def __len__(self):
+        return len(self._applied)
+
+    def update(self, game_ids):
+        """Merge IDs known to be applied (e.g. loaded from Firestore)."""
+        with self._lock:
+            self._applied.update(str(game_id) for game_id in game_ids)
+
+    def record(self, game_id):
+        """Mark a game applied after its transaction committed."""
+        game_id = str(game_id)
+        with self._lock:
+            if game_id in self._applied:
+                return
+            self._applied.add(game_id)
+            if self.path:
+                try:
+                    os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(game_id + '\n')
+                except OSError as e:
+                    logger.warning(f"Could not append to ingestion journal {self.path}: {e}")
+
+def journal_path(league):
+    """Local journal file for a league, or None when INGESTION_JOURNAL_DIR is unset."""
+    return os.path.join(INGESTION_JOURNAL_DIR, f"{league}.journal") if INGESTION_JOURNAL_DIR else None
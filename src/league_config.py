@@ -1,10 +1,22 @@
+import os
+
+# Root of the HockeyTech feed API. Override with HOCKEYTECH_BASE_URL to point the scraper
+# at a local stand-in, e.g. `python fake_hockeytech.py` -> http://localhost:8090
+HOCKEYTECH_BASE_URL = os.environ.get('HOCKEYTECH_BASE_URL', 'https://lscluster.hockeytech.com').rstrip('/')
+
+# Per-league HockeyTech settings. 'feed' picks the adapter in getgames.ADAPTERS that talks to
+# the league; {api_key}, {client_code} and {callback} in the URL templates are filled in once
+# when the adapter is built, the rest ({game_id}, {season_id}, {month}, {date}) per request.
 LEAGUES = {
     'kijhl': {
         'name': 'Kootenay International Junior Hockey League',
         'abbreviation': 'KIJHL',
         'client_code': 'kijhl',
         'api_key': '2589e0f644b1bb71',
-        'base_url': 'https://lscluster.hockeytech.com/feed/index.php?feed=statviewfeed&view=gameSummary&game_id={game_id}&key=2589e0f644b1bb71&site_id=2&client_code=kijhl&lang=en&league_id=&callback=angular.callbacks._4',
+        'feed': 'statviewfeed',
+        'base_url': HOCKEYTECH_BASE_URL + '/feed/index.php?feed=statviewfeed&view=gameSummary&game_id={game_id}&key={api_key}&site_id=2&client_code={client_code}&lang=en&league_id=&callback=angular.callbacks._4',
+        'schedule_url': HOCKEYTECH_BASE_URL + '/feed/index.php?feed=statviewfeed&view=schedule&team=-1&season={season_id}&month={month}&location=homeaway&key={api_key}&client_code={client_code}&site_id=2&league_id=1&conference_id=-1&division_id=-1&lang=en&callback=angular.callbacks._3',
+        'max_concurrency': 15,
         'season_ids': { 
             '2021-2022 (Reg Season)': 49,
             '2021-2022 (Playoffs)'  : 51,
@@ -29,7 +41,10 @@ LEAGUES = {
         'abbreviation': 'WHL',
         'client_code': 'whl',
         'api_key': 'f1aa699db3d81487',
-        'base_url': 'https://lscluster.hockeytech.com/feed/?feed=gc&key=f1aa699db3d81487&game_id={game_id}&client_code=whl&tab=gamesummary&lang_code=en&fmt=json&callback=jsonp_1769465924711_51167',
+        'feed': 'modulekit',
+        'base_url': HOCKEYTECH_BASE_URL + '/feed/?feed=gc&key={api_key}&game_id={game_id}&client_code={client_code}&tab=gamesummary&lang_code=en&fmt=json&callback={callback}',
+        'schedule_url': HOCKEYTECH_BASE_URL + '/feed/?feed=modulekit&key={api_key}&view=gamesbydate&fetch_date={date}&client_code={client_code}&lang_code=en&fmt=json&callback={callback}',
+        'max_concurrency': 15,
         'season_ids': {
             # Pre-season is +1 from regular season
             # Playoffs is +3 from regular season
@@ -54,4 +69,32 @@ LEAGUES = {
         },
         'firebase_path': 'leagues/whl'
     }        
-}
\ No newline at end of file
+}
+
+# Map season IDs to readable names (shared across leagues, specific mappings per league would go here)
+SEASON_NAMES = {
+    # KIJHL seasons
+    66: '2025-26 Playoffs',
+    65: '2025-26 Regular Season',
+    63: '2024-25 Playoffs',
+    61: '2024-25 Regular Season',
+    59: '2023-24 Playoffs',
+    56: '2023-24 Regular Season',
+    54: '2022-23 Playoffs',
+    52: '2022-23 Regular Season',
+    51: '2021-22 Playoffs',
+    49: '2021-22 Regular Season',
+    # WHL seasons
+    292: '2025-26 Playoffs',
+    289: '2025-26 Regular Season',
+    288: '2024-25 Playoffs',
+    285: '2024-25 Regular Season',
+    284: '2023-24 Playoffs',
+    281: '2023-24 Regular Season',
+    268: '2022-23 Playoffs',
+    265: '2022-23 Regular Season',
+    264: '2021-22 Playoffs',
+    261: '2021-22 Regular Season',
+    260: '2020-21 Playoffs',
+    257: '2020-21 Regular Season',
+}
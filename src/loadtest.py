@@ -0,0 +1,284 @@
+"""HTTP load test for the web app against local stand-ins for Firestore and HockeyTech.
+
+Starts fake_hockeytech on a free port, switches DatabaseManager to the in-memory Firestore
+(FIRESTORE_BACKEND=memory), seeds a season of games through save_game_results, then serves
+app.py with the same threaded Werkzeug server `python app.py` uses in production. Virtual
+users replay a weighted mix of page views and API calls at each concurrency level, and the
+run reports throughput, p50/p95/p99 latency and error rate per level, noting where
+throughput stops scaling. Each run is appended to benchmarks/loadtest.jsonl.
+
+Usage:
+    python loadtest.py                                   # gamenight mix at 1, 2, 4, 8, 16, 32 users
+    python loadtest.py --mix browse --levels 1,8,64 --duration 20
+    python loadtest.py --hockeytech-latency lognormal:120:0.6 --firestore-latency lognormal:8:0.5
+    python loadtest.py --snapshots                       # serve pre-rendered snapshots (snapshots.py)
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import requests
+
+from benchmark import git_revision, FIXTURE_DATE
+
+RESULTS_PATH = Path(__file__).parent / "benchmarks" / "loadtest.jsonl"
+
+LEAGUE = 'kijhl'
+SEASON_ID = 65
+SEASON_START = date(2025, 9, 19)
+
+# Throughput gains below this between levels mark the app as saturated
+SATURATION_GAIN = 0.10
+
+# Request mixes: (weight, request name). Paths are built by build_request().
+MIXES = {
+    # Fans browsing the leaderboard and official pages
+    'browse': [(15, 'statistics'), (30, 'officials'), (20, 'officials_page'), (20, 'official'),
+               (10, 'search'), (5, 'teams')],
+    # Browsing plus the games page scraping tonight's games
+    'gamenight': [(12, 'statistics'), (25, 'officials'), (18, 'officials_page'), (18, 'official'),
+                  (10, 'search'), (5, 'teams'), (12, 'scrape')],
+    'scrape': [(1, 'scrape')],
+}
+
+REFEREES = [f"Referee {name}" for name in
+            ('Adams', 'Baker', 'Clark', 'Dubois', 'Evans', 'Fraser', 'Gill', 'Hall', 'Irwin', 'Jones',
+             'Klassen', 'Lee', 'Morin', 'Nash', 'Olsen', 'Price', 'Quinn', 'Reid', 'Singh', 'Tran')]
+LINESMEN = [f"Linesman {name}" for name in
+            ('Abbott', 'Bell', 'Chan', 'Dyck', 'Ellis', 'Ford', 'Grant', 'Hunt', 'Ito', 'Kerr',
+             'Lam', 'Moore', 'Nolan', 'Ortiz', 'Park', 'Ross', 'Shaw', 'Tate', 'Usher', 'Vance',
+             'Walsh', 'Young', 'Zhang', 'Boyd', 'Cole', 'Dunn', 'Egan', 'Frost', 'Gray', 'Hart')]
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def seed_games(db_manager, template, count, rng):
+    """Save `count` final games built from a template game record, with officials drawn from
+    fixed pools, through the normal ingestion path."""
+    for i in range(count):
+        game = dict(template)
+        game.update({
+            'game_number': str(800000 + i),
+            'date': (SEASON_START + timedelta(days=i // 4)).isoformat(),
+            'status': 'Final',
+            'referees': [[name, '0'] for name in rng.sample(REFEREES, 2)],
+            'linesmen': [[name, '0'] for name in rng.sample(LINESMEN, 2)],
+            'home_pims': rng.randint(2, 40),
+            'visitor_pims': rng.randint(2, 40),
+        })
+        game['total_pims'] = game['home_pims'] + game['visitor_pims']
+        db_manager.save_game_results(LEAGUE, game, season_id=SEASON_ID)
+
+def build_request(name, rng) -> str:
+    if name == 'statistics':
+        return f"/statistics?league={LEAGUE}&season={SEASON_ID}"
+    if name == 'officials':
+        return f"/api/officials?league={LEAGUE}&season={SEASON_ID}"
+    if name == 'officials_page':
+        return f"/api/officials?league={LEAGUE}&season={SEASON_ID}&sort=avg&limit=10&page={rng.randint(1, 5)}"
+    if name == 'official':
+        return f"/api/official/{rng.choice(REFEREES + LINESMEN)}?league={LEAGUE}"
+    if name == 'search':
+        return f"/api/officials/search?q={rng.choice(REFEREES + LINESMEN).split()[1][:rng.randint(1, 4)]}"
+    if name == 'teams':
+        return f"/api/teams?league={LEAGUE}&season={SEASON_ID}"
+    if name == 'scrape':
+        day = SEASON_START + timedelta(days=rng.randint(0, 120))
+        return f"/api/scrape?league={LEAGUE}&date={day.isoformat()}"
+    raise ValueError(f"Unknown request: {name}")
+
+@contextmanager
+def local_stack(seed_count=400, hockeytech_latency='fixed:0', firestore_latency='', seed=1, snapshots=False):
+    """Run fake HockeyTech, the in-memory Firestore and the app for the duration of the block.
+    Yields the app's base URL.
+
+    The app gets an empty snapshot directory, filled by snapshots.generate() when snapshots is set.
+    The environment, league adapter URLs and app snapshot store it changes are put back on exit,
+    so code running afterwards in the same process talks to the real feeds again.
+    """
+    from werkzeug.serving import make_server
+    from fake_hockeytech import start_server
+    from getgames import ADAPTERS
+    from replay import replay_hockeytech
+    from scraper import scrape_games
+    from snapshots import SnapshotStore, generate
+
+    saved_env = {name: os.environ.get(name) for name in ('FIRESTORE_BACKEND', 'FIRESTORE_MEMORY_LATENCY')}
+    saved_urls = {league: (adapter.game_url, adapter.schedule_url) for league, adapter in ADAPTERS.items()}
+    webapp = hockeytech = server = None
+    try:
+        os.environ['FIRESTORE_BACKEND'] = 'memory'
+        if firestore_latency:
+            os.environ['FIRESTORE_MEMORY_LATENCY'] = firestore_latency
+        import app as webapp
+        saved_store = webapp.snapshot_store
+
+        hockeytech, hockeytech_url = start_server(latency=hockeytech_latency, seed=seed)
+        for adapter in ADAPTERS.values():
+            adapter.use_base_url(hockeytech_url)
+
+        with replay_hockeytech():
+            template = next(g for g in scrape_games(FIXTURE_DATE, league=LEAGUE)['games'] if g['status'] == 'Final')
+        seed_games(webapp.db_manager, template, seed_count, random.Random(seed))
+        webapp.snapshot_store = SnapshotStore(tempfile.mkdtemp(prefix='loadtest-snapshots-'))
+        if snapshots:
+            generate(webapp.db_manager, webapp.app, LEAGUE, store=webapp.snapshot_store)
+
+        server = make_server('127.0.0.1', 0, webapp.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        if server:
+            server.shutdown()
+        if hockeytech:
+            hockeytech.shutdown()
+        if webapp:
+            webapp.snapshot_store = saved_store
+        for league, (game_url, schedule_url) in saved_urls.items():
+            ADAPTERS[league].game_url, ADAPTERS[league].schedule_url = game_url, schedule_url
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+def run_level(base_url, mix, concurrency, duration, seed=0) -> dict:
+    """Drive `concurrency` virtual users through the mix for `duration` seconds."""
+    names = [name for _, name in MIXES[mix]]
+    weights = [weight for weight, _ in MIXES[mix]]
+    samples = []  # (name, seconds, ok)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        local = []
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = session.get(base_url + build_request(name, rng), timeout=60).status_code < 400
+            except requests.exceptions.RequestException:
+                ok = False
+            local.append((name, time.perf_counter() - start, ok))
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return summarize(samples, elapsed, concurrency)
+
+def summarize(samples, elapsed, concurrency) -> dict:
+    latencies = sorted(seconds * 1000 for _, seconds, _ in samples)
+    errors = sum(1 for _, _, ok in samples if not ok)
+    endpoints = {}
+    for name in sorted({name for name, _, _ in samples}):
+        times = sorted(seconds * 1000 for n, seconds, _ in samples if n == name)
+        endpoints[name] = {'requests': len(times), 'p50_ms': round(percentile(times, 50), 1),
+                           'p95_ms': round(percentile(times, 95), 1)}
+    return {
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'rps': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'endpoints': endpoints,
+    }
+
+def saturation_point(levels):
+    """First concurrency whose throughput gain over the previous level is below SATURATION_GAIN."""
+    for previous, level in zip(levels, levels[1:]):
+        if previous['rps'] and level['rps'] < previous['rps'] * (1 + SATURATION_GAIN):
+            return previous['concurrency']
+    return None
+
+def run_loadtest(mix='gamenight', levels=(1, 2, 4, 8, 16, 32), duration=10.0, seed_count=400,
+                 hockeytech_latency='fixed:0', firestore_latency='', snapshots=False) -> dict:
+    with local_stack(seed_count, hockeytech_latency, firestore_latency, snapshots=snapshots) as base_url:
+        # Warm caches and lazy indexes so the first level isn't measuring start-up
+        run_level(base_url, mix, 1, min(1.0, duration))
+        results = [run_level(base_url, mix, concurrency, duration, seed=concurrency) for concurrency in levels]
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'config': {'mix': mix, 'duration': duration, 'seed_games': seed_count,
+                   'hockeytech_latency': hockeytech_latency, 'firestore_latency': firestore_latency,
+                   'snapshots': snapshots},
+        'levels': results,
+        'saturated_at': saturation_point(results),
+    }
+
+def load_previous_run(mix, path=RESULTS_PATH) -> dict:
+    """The most recent stored run for the same mix, or an empty dict."""
+    if not path.exists():
+        return {}
+    runs = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+    runs = [run for run in runs if run.get('config', {}).get('mix') == mix]
+    return runs[-1] if runs else {}
+
+def print_run(run, previous=None):
+    previous_rps = {level['concurrency']: level['rps'] for level in (previous or {}).get('levels', [])}
+    print(f"{'users':>6}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>9}{'vs last':>10}")
+    for level in run['levels']:
+        delta = ''
+        if previous_rps.get(level['concurrency']):
+            delta = f"{(level['rps'] / previous_rps[level['concurrency']] - 1) * 100:+.1f}%"
+        print(f"{level['concurrency']:>6}{level['requests']:>10}{level['rps']:>9.1f}{level['p50_ms']:>9.1f}"
+              f"{level['p95_ms']:>9.1f}{level['p99_ms']:>9.1f}{level['error_rate']:>9.2%}{delta:>10}")
+    if run['saturated_at']:
+        print(f"\nThroughput stops scaling after {run['saturated_at']} concurrent users")
+    if run['levels']:
+        busiest = run['levels'][-1]
+        print(f"\nPer endpoint at {busiest['concurrency']} users:")
+        for name, stats in busiest['endpoints'].items():
+            print(f"  {name:<16}{stats['requests']:>8}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}")
+
+def save_run(run, path=RESULTS_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('a') as f:
+        f.write(json.dumps(run) + '\n')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mix', choices=sorted(MIXES), default='gamenight')
+    parser.add_argument('--levels', default='1,2,4,8,16,32', help='Comma-separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per level')
+    parser.add_argument('--seed-games', type=int, default=400, help='Games ingested before the run')
+    parser.add_argument('--hockeytech-latency', default='fixed:0', help="fake_hockeytech latency spec")
+    parser.add_argument('--firestore-latency', default='', help="Per-RPC latency spec for the in-memory Firestore")
+    parser.add_argument('--snapshots', action='store_true', help="Generate snapshots first and let the app serve them")
+    parser.add_argument('--no-save', action='store_true', help="Don't append this run to the results file")
+    args = parser.parse_args()
+
+    # Request logging from the app would dominate the run
+    logging.disable(logging.INFO)
+    run = run_loadtest(args.mix, [int(level) for level in args.levels.split(',')], args.duration, args.seed_games,
+                       args.hockeytech_latency, args.firestore_latency, snapshots=args.snapshots)
+    print_run(run, load_previous_run(args.mix))
+    if not args.no_save:
+        save_run(run)
+        print(f"\nSaved to {RESULTS_PATH}")
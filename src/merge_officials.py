@@ -0,0 +1,175 @@
+"""Re-key official season records under canonical official IDs and merge spelling variants.
+
+Groups every doc in leagues/<league>/officials by (official ID, season). A doc's stored
+official_id (assigned at ingestion, jersey matches included) is kept unless the alias table
+maps it elsewhere; only legacy name-keyed docs are resolved from their name. Each group is written as a
+single '<official_id>_<season_id>' doc with summed totals, the old docs are deleted, and
+every variant spelling is recorded in the alias table so future games resolve to the same ID.
+The 'officials' arrays on penalty rows are rewritten in the same batches, so official-filtered
+penalty queries find rows stored under a merged variant ID or a raw name.
+
+Usage:
+    python merge_officials.py kijhl --dry-run
+    python merge_officials.py whl --alias "Kev Pollock=Kevin_Pollock"
+"""
+import argparse
+import logging
+
+from database import DatabaseManager
+from league_config import LEAGUES
+from officials_identity import normalize_name
+from trends import append_game
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Firestore batches are limited to 500 operations
+BATCH_LIMIT = 450
+
+def record_official_id(data, directory) -> str:
+    """Canonical ID for an official doc. The display name is the latest spelling seen and can
+    belong to a jersey-matched variant, so it's only used for docs written before official IDs."""
+    if data.get('official_id'):
+        return directory.resolve(data['official_id'])
+    return directory.resolve(data.get('name', ''))
+
+def plan_merges(records, directory) -> dict:
+    """Group official docs by (official_id, season_id).
+
+    Args:
+        records: (doc_id, data) pairs from the officials collection
+        directory: OfficialDirectory used to resolve names
+
+    Returns:
+        {(official_id, season_id): [(doc_id, data), ...]}
+    """
+    groups = {}
+    for doc_id, data in records:
+        official_id = record_official_id(data, directory)
+        groups.setdefault((official_id, data.get('season_id')), []).append((doc_id, data))
+    return groups
+
+def merge_group(official_id, season_id, docs) -> dict:
+    """Combine one official's docs for a season into a single record."""
+    games = sum(data.get('games_called', 0) for _, data in docs)
+    pims = sum(data.get('total_pims', 0) for _, data in docs)
+    # Display name and role come from the variant with the most games
+    primary = max(docs, key=lambda item: item[1].get('games_called', 0))[1]
+    merged = dict(primary)
+    merged.update({
+        'official_id': official_id,
+        'season_id': season_id,
+        'games_called': games,
+        'total_pims': pims,
+        'avg_pims': round(pims / games, 1) if games else 0
+    })
+    # Replay every variant's games in date order so the rolling averages cover all of them
+    games_played = sorted(
+        (date, game_id, game_pims)
+        for _, data in docs if data.get('trend')
+        for game_id, date, game_pims in zip(data['trend']['game_ids'], data['trend']['dates'], data['trend']['pims']))
+    if games_played:
+        trend = None
+        for date, game_id, game_pims in games_played:
+            trend = append_game(trend, game_id, date, game_pims)
+        merged['trend'] = trend
+    return merged
+
+def remap_officials(officials, renamed, directory) -> list:
+    """A penalty row's 'officials' array with merged variant IDs and raw names replaced.
+
+    Args:
+        officials: Official IDs (or, on rows written before canonical IDs, names)
+        renamed: Variant ID or name -> canonical ID, from this merge
+        directory: OfficialDirectory (with this merge's aliases) for anything else
+    """
+    remapped = []
+    for entry in officials:
+        official_id = renamed.get(entry) or directory.resolve(entry)
+        if official_id not in remapped:
+            remapped.append(official_id)
+    return remapped
+
+def merge_officials(db_manager, league, dry_run=False):
+    """Re-key and merge all official docs for a league. Returns the number of docs rewritten."""
+    config = LEAGUES[league]
+    firebase_path = config['firebase_path']
+    collection = db_manager.db.collection(f"{db_manager.aggregate_path(league)}/officials")
+    directory = db_manager.get_official_directory(league)
+
+    records = [(doc.id, doc.to_dict()) for doc in collection.stream()]
+    groups = plan_merges(records, directory)
+
+    writes = []
+    renamed = {}  # variant official ID or name -> canonical ID, for the penalty rows
+    for (official_id, season_id), docs in groups.items():
+        new_doc_id = f"{official_id}_{season_id}"
+        already_keyed = len(docs) == 1 and docs[0][0] == new_doc_id and docs[0][1].get('official_id') == official_id
+        if already_keyed:
+            continue
+
+        names = sorted({data.get('name', '') for _, data in docs})
+        for doc_id, data in docs:
+            if data.get('official_id'):
+                renamed[data['official_id']] = official_id
+            else:
+                # Penalty rows from before official IDs hold the raw name
+                renamed[doc_id.rsplit('_', 1)[0]] = official_id
+                renamed[data.get('name', '')] = official_id
+        logger.info(f"{new_doc_id}: merging {[doc_id for doc_id, _ in docs]} ({', '.join(names)})")
+        for name in names:
+            if normalize_name(name) != normalize_name(official_id.replace('_', ' ')):
+                directory.add_alias(name, official_id)
+        writes.append((new_doc_id, merge_group(official_id, season_id, docs), [doc_id for doc_id, _ in docs]))
+
+    penalties = db_manager.db.collection(f"{firebase_path}/penalties")
+    penalty_updates = []
+    for doc in penalties.stream():
+        officials = doc.to_dict().get('officials', [])
+        remapped = remap_officials(officials, renamed, directory)
+        if remapped != officials:
+            penalty_updates.append((doc.id, remapped))
+
+    if dry_run:
+        logger.info(f"Dry run: {len(writes)} records and {len(penalty_updates)} penalty rows would be rewritten")
+        return len(writes)
+
+    batch, ops = db_manager.db.batch(), 0
+    for new_doc_id, merged, old_doc_ids in writes:
+        batch.set(collection.document(new_doc_id), merged)
+        ops += 1
+        for old_doc_id in old_doc_ids:
+            if old_doc_id != new_doc_id:
+                batch.delete(collection.document(old_doc_id))
+                ops += 1
+        if ops >= BATCH_LIMIT:
+            batch.commit()
+            batch, ops = db_manager.db.batch(), 0
+    for doc_id, remapped in penalty_updates:
+        batch.set(penalties.document(doc_id), {'officials': remapped}, merge=True)
+        ops += 1
+        if ops >= BATCH_LIMIT:
+            batch.commit()
+            batch, ops = db_manager.db.batch(), 0
+    batch.set(db_manager.db.collection(f"{firebase_path}/meta").document('official_identity'),
+              directory.to_dict())
+    batch.commit()
+
+    logger.info(f"Rewrote {len(writes)} official records and {len(penalty_updates)} penalty rows for {league}")
+    return len(writes)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('league', choices=sorted(LEAGUES))
+    parser.add_argument('--alias', action='append', default=[], metavar='NAME=OFFICIAL_ID',
+                        help='Add an alias before merging (repeatable)')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    directory = db_manager.get_official_directory(args.league)
+    for alias in args.alias:
+        name, official_id = alias.split('=', 1)
+        directory.add_alias(name, official_id.strip())
+
+    merge_officials(db_manager, args.league, dry_run=args.dry_run)
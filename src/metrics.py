@@ -0,0 +1,163 @@
+"""In-process metrics with Prometheus text exposition, plus per-request trace IDs for logs.
+
+Metrics live for the life of the process (one Cloud Run instance) and are served by the
+/metrics route in app.py. Only the small subset of the Prometheus data model this app
+needs is implemented: counters, gauges and fixed-bucket histograms with labels.
+"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import threading
+import time
+
+# Latency buckets in seconds, from a cached logo lookup to a slow upstream page
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(names, values, extra=None) -> str:
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ''
+    escaped = [(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in pairs]
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+class _Metric(ABC):
+    kind = ''
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    @abstractmethod
+    def _samples(self):
+        """Exposition lines for every label set (called with the lock held)."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return '\n'.join(lines)
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in self._values.items()]
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # [per-bucket counts, sum, count]
+            series = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        series = self._values.get(self._key(labels))
+        return series[2] if series else 0
+
+    def _samples(self):
+        lines = []
+        for key, (counts, total, observed) in self._values.items():
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', bound)])} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', '+Inf')])} {observed}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {observed}")
+        return lines
+
+REGISTRY = []
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format (version 0.0.4)."""
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
+
+# --- Application metrics -----------------------------------------------------------------
+
+STAGE_SECONDS = Histogram(
+    'zebrazone_stage_duration_seconds',
+    'Duration of each scrape/ingest stage (schedule_fetch, game_fetch, jsonp_decode, parse, firestore_write, scrape_total).',
+    labels=('stage', 'league'))
+UPSTREAM_RESPONSES = Counter(
+    'zebrazone_upstream_responses_total',
+    'HockeyTech responses by endpoint and HTTP status ("error" when no response was received).',
+    labels=('league', 'endpoint', 'status'))
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    'zebrazone_executor_queue_depth',
+    'Game fetches submitted to the scrape thread pool that have not started yet.',
+    labels=('league',))
+CACHE_REQUESTS = Counter(
+    'zebrazone_cache_requests_total',
+    'In-process cache lookups by cache and result (hit/miss).',
+    labels=('cache', 'result'))
+FIRESTORE_OPERATIONS = Counter(
+    'zebrazone_firestore_operations_total',
+    'Firestore document reads, writes and RPCs by DatabaseManager call site and HTTP endpoint.',
+    labels=('operation', 'call_site', 'endpoint'))
+HTTP_REQUEST_SECONDS = Histogram(
+    'zebrazone_http_request_duration_seconds',
+    'Flask request latency by endpoint, method and status.',
+    labels=('endpoint', 'method', 'status'))
+
+# --- Trace IDs ---------------------------------------------------------------------------
+
+# Worker threads don't inherit context variables: run pool tasks under
+# contextvars.copy_context().run (see scraper.scrape_games) to keep the request's trace ID
+trace_id_var = ContextVar('trace_id', default='-')
+
+class TraceIdFilter(logging.Filter):
+    """Attach the current request's trace ID to every log record as %(trace_id)s."""
+
+    def filter(self, record):
+        record.trace_id = trace_id_var.get()
+        return True
+
+def install_trace_logging():
+    """Prefix log lines on the root handlers with the current trace ID."""
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(TraceIdFilter())
+        handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s:[%(trace_id)s] %(message)s'))
@@ -0,0 +1,129 @@
+"""In-memory prefix index over every official in every league and season.
+
+Names are indexed by their normalised full name and by each word suffix
+('steve smith', 'smith'), in one sorted list searched with bisect. A query costs
+O(log n + matches) with no database access. The index is built from Firestore (a read
+of every official doc) and updated in place as ingestion writes official records. It is
+rebuilt only when its version changes (an aggregate rebuild swap, or new aliases from
+merge_officials.py), with SEARCH_INDEX_SECONDS as a backstop.
+"""
+from bisect import bisect_left, insort
+import threading
+import time
+
+from metrics import CACHE_REQUESTS
+from officials_identity import normalize_name
+
+# Backstop rebuild interval; staleness is otherwise detected through the version callable
+SEARCH_INDEX_SECONDS = 24 * 3600
+
+# Rank buckets: exact name, name prefix, later-word prefix
+EXACT, PREFIX, WORD_PREFIX = 0, 1, 2
+
+class OfficialSearchIndex:
+
+    def __init__(self):
+        self._keys = []       # sorted (search_key, rank_if_prefix, (league, official_id))
+        self._entries = {}    # (league, official_id) -> {'name', 'role', 'seasons': {season_id: record}}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _index_keys(self, entry_key, name):
+        words = normalize_name(name).split()
+        for i in range(len(words)):
+            insort(self._keys, (' '.join(words[i:]), PREFIX if i == 0 else WORD_PREFIX, entry_key))
+
+    def add(self, league, record):
+        """Add or update one official season record (a doc from the officials collection)."""
+        official_id = record.get('official_id') or record.get('name', '').replace(' ', '_')
+        entry_key = (league, official_id)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                entry = self._entries[entry_key] = {'name': record.get('name', ''), 'role': record.get('role', ''),
+                                                    'seasons': {}}
+                self._index_keys(entry_key, entry['name'])
+            entry['seasons'][record.get('season_id')] = {
+                'games_called': record.get('games_called', 0),
+                'total_pims': record.get('total_pims', 0),
+            }
+
+    def add_many(self, league, records):
+        for record in records:
+            self.add(league, record)
+
+    def search(self, query, league=None, limit=10) -> list:
+        """Return up to `limit` officials whose name (or a later word of it) starts with `query`.
+
+        Ranked exact match first, then full-name prefix, then word prefix; ties by career games.
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+
+        with self._lock:
+            best = {}
+            i = bisect_left(self._keys, (query,))
+            while i < len(self._keys) and self._keys[i][0].startswith(query):
+                key, rank, entry_key = self._keys[i]
+                if key == query and rank == PREFIX:
+                    rank = EXACT
+                if (league is None or entry_key[0] == league) and rank < best.get(entry_key, WORD_PREFIX + 1):
+                    best[entry_key] = rank
+                i += 1
+            results = [self._summary(entry_key, rank) for entry_key, rank in best.items()]
+
+        results.sort(key=lambda r: (r['rank'], -r['career']['total_games'], r['name']))
+        return results[:limit]
+
+    def _summary(self, entry_key, rank) -> dict:
+        entry = self._entries[entry_key]
+        games = sum(s['games_called'] for s in entry['seasons'].values())
+        pims = sum(s['total_pims'] for s in entry['seasons'].values())
+        return {
+            'league': entry_key[0],
+            'official_id': entry_key[1],
+            'name': entry['name'],
+            'role': entry['role'],
+            'rank': rank,
+            'career': {
+                'total_games': games,
+                'total_pims': pims,
+                'career_avg': round(pims / games, 1) if games else 0,
+                'seasons_count': len(entry['seasons'])
+            }
+        }
+
+
+class SearchIndexCache:
+    """The search index over every league, loaded through a callable and rebuilt when a version
+    callable's value changes or the index is older than the TTL."""
+
+    def __init__(self, loader, version=lambda: None, ttl=SEARCH_INDEX_SECONDS):
+        self.loader = loader
+        self.version = version
+        self.ttl = ttl
+        self._cached = None   # (built_at, version, index)
+        self._lock = threading.Lock()
+
+    def get(self) -> OfficialSearchIndex:
+        version = self.version()
+        with self._lock:
+            cached = self._cached
+            if cached and cached[1] == version and time.monotonic() - cached[0] < self.ttl:
+                CACHE_REQUESTS.inc(cache='official_search', result='hit')
+                return cached[2]
+            CACHE_REQUESTS.inc(cache='official_search', result='miss')
+            index = OfficialSearchIndex()
+            for league, records in self.loader():
+                index.add_many(league, records)
+            self._cached = (time.monotonic(), version, index)
+            return index
+
+    def add_many(self, league, records):
+        """Officials listener: add new records to the current index, if one is built."""
+        cached = self._cached
+        if cached:
+            cached[2].add_many(league, records)
@@ -0,0 +1,85 @@
+"""Canonical official IDs per league.
+
+Official docs used to be keyed by the display name the parser built, so 'Dana O'Neil',
+'Dana ONeil' and 'dana  oneil' became three people. Every name is now resolved to one
+canonical ID per person per league using, in order:
+    1. the league's alias table (normalised variant -> ID), maintained by merge_officials.py
+    2. the jersey number (WHL publishes it) when the last name agrees with the known holder
+    3. the normalised name itself, e.g. 'Dana_Oneil'
+"""
+import re
+import unicodedata
+
+def normalize_name(name: str) -> str:
+    """Case-fold, strip accents and punctuation, and collapse whitespace.
+
+    e.g. "  Dana O'Neil " -> 'dana oneil', 'Jean-Luc Côté' -> 'jean luc cote'
+    """
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(c for c in name if not unicodedata.combining(c)).casefold()
+    name = re.sub(r"['’.`]", '', name)
+    name = re.sub(r'[^a-z0-9]+', ' ', name)
+    return ' '.join(name.split())
+
+def canonical_id(name: str) -> str:
+    """ID derived from the name alone, in the same style as the old doc keys ('Steve_Smith')."""
+    return '_'.join(part.capitalize() for part in normalize_name(name).split())
+
+def _last_name(normalized: str) -> str:
+    parts = normalized.split()
+    return parts[-1] if parts else ''
+
+class OfficialDirectory:
+    """Alias and jersey tables for one league, resolving names to canonical IDs in O(1)."""
+
+    def __init__(self, aliases=None, jerseys=None):
+        self.aliases = dict(aliases or {})    # normalised name -> official ID
+        self.jerseys = dict(jerseys or {})    # jersey number -> official ID
+
+    def resolve(self, name: str, jersey=None) -> str:
+        """Return the canonical ID for an official as named in a game summary."""
+        normalized = normalize_name(name)
+        if normalized in self.aliases:
+            return self.aliases[normalized]
+
+        jersey = str(jersey or '0')
+        if jersey != '0' and jersey in self.jerseys:
+            known_id = self.jerseys[jersey]
+            # Jersey numbers get reassigned; only trust them when the last name agrees
+            if _last_name(normalize_name(known_id.replace('_', ' '))) == _last_name(normalized):
+                return known_id
+
+        return canonical_id(name)
+
+    def learn(self, jersey, official_id: str) -> dict:
+        """Remember a jersey for an ID. Returns the table entries that are new, for persisting."""
+        jersey = str(jersey or '0')
+        if jersey == '0' or self.jerseys.get(jersey) == official_id:
+            return {}
+        self.jerseys[jersey] = official_id
+        return {jersey: official_id}
+
+    def resolve_game(self, game_data) -> tuple:
+        """Resolve a game record's referees and linesmen, learning any new jerseys.
+
+        Parsers emit officials as [name, jersey_number] pairs (bare names are also accepted).
+
+        Returns:
+            ([{'id', 'name', 'type'}, ...], new jersey table entries)
+        """
+        officials = []
+        new_jerseys = {}
+        for role, key in (('referee', 'referees'), ('linesman', 'linesmen')):
+            for entry in game_data.get(key, []):
+                name, jersey = entry if isinstance(entry, (list, tuple)) else (entry, '0')
+                if name and name.strip() not in ["Unknown", "Unknown Unknown"]:
+                    official_id = self.resolve(name.strip(), jersey)
+                    new_jerseys.update(self.learn(jersey, official_id))
+                    officials.append({'id': official_id, 'name': name.strip(), 'type': role})
+        return officials, new_jerseys
+
+    def add_alias(self, name: str, official_id: str):
+        self.aliases[normalize_name(name)] = official_id
+
+    def to_dict(self) -> dict:
+        return {'aliases': self.aliases, 'jerseys': self.jerseys}
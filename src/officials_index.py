@@ -0,0 +1,92 @@
+"""Per-season officials index for server-side filtering, sorting and pagination.
+
+Each season's records are sorted once per sort key when the index is built, so a
+request is a single pass over a presorted list (filtering by role and min games and
+counting the total) instead of a sort.
+"""
+import threading
+import time
+
+from metrics import CACHE_REQUESTS
+
+# Accepted sort parameters -> record field. Short names match leaderboard.html's sort keys.
+SORT_FIELDS = {
+    'games': 'games_called', 'games_called': 'games_called',
+    'pims': 'total_pims', 'total_pims': 'total_pims',
+    'avg': 'avg_pims', 'avg_pims': 'avg_pims',
+    'name': 'name',
+}
+
+# Season indexes are dropped after this long, or as soon as ingestion touches the season
+INDEX_CACHE_SECONDS = 300
+
+class SeasonOfficialsIndex:
+
+    def __init__(self, records):
+        self.records = list(records)
+        self._orders = {}
+        for field in set(SORT_FIELDS.values()):
+            default = '' if field == 'name' else 0
+            # Ties broken by name so pages are stable
+            self._orders[field] = sorted(self.records, key=lambda r: (r.get(field, default) or default, r.get('name', '')))
+
+    def query(self, role='all', min_games=0, sort='total_pims', order='desc', page=1, limit=None, fields=None):
+        """Filter, sort and page the season's officials.
+
+        Args:
+            role: 'all', 'referee' or 'linesman'
+            min_games: Minimum games_called
+            sort: Key from SORT_FIELDS
+            order: 'desc' or 'asc'
+            page: 1-based page number
+            limit: Page size, or None for every matching row
+            fields: Optional list of fields to keep in each row
+
+        Returns:
+            (rows, total_matching)
+        """
+        ordered = self._orders[SORT_FIELDS.get(sort, 'total_pims')]
+        if order == 'desc':
+            ordered = reversed(ordered)
+
+        start = (max(page, 1) - 1) * limit if limit else 0
+        end = start + limit if limit else None
+        rows = []
+        total = 0
+        for record in ordered:
+            if role != 'all' and record.get('role') != role:
+                continue
+            if record.get('games_called', 0) < min_games:
+                continue
+            if start <= total and (end is None or total < end):
+                rows.append({f: record[f] for f in fields if f in record} if fields else record)
+            total += 1
+        return rows, total
+
+class SeasonIndexCache:
+    """(league, season_id) -> SeasonOfficialsIndex, loaded through a callable on a miss."""
+
+    def __init__(self, loader, ttl=INDEX_CACHE_SECONDS):
+        self.loader = loader
+        self.ttl = ttl
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, league, season_id) -> SeasonOfficialsIndex:
+        key = (league, season_id)
+        with self._lock:
+            cached = self._indexes.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                CACHE_REQUESTS.inc(cache='season_officials', result='hit')
+                return cached[1]
+        CACHE_REQUESTS.inc(cache='season_officials', result='miss')
+        index = SeasonOfficialsIndex(self.loader(league, season_id))
+        with self._lock:
+            self._indexes[key] = (time.monotonic(), index)
+        return index
+
+    def invalidate(self, league, records):
+        """Officials listener: drop the cached seasons these records belong to."""
+        with self._lock:
+            for season_id in {r.get('season_id') for r in records}:
+                self._indexes.pop((league, season_id), None)
@@ -0,0 +1,320 @@
+"""Rebuild a league's official and team aggregates from its stored games and swap them in.
+
+save_game_results only ever adds to the aggregates, so a change to the parsers (fight
+pairing, role detection) or to identity resolution never reaches games already saved.
+This job recomputes everything from scratch:
+
+    1. load every stored game doc (plus its penalty rows) for the league
+    2. map: a process pool turns chunks of games into partial per-official and per-team
+       totals; with --reparse each game is first re-parsed by the current parsers from its
+       cached raw payload (RAW_PAYLOAD_DIR, see getgames.save_raw_payload) when there is one
+    3. reduce: merge the partials into official season records (with trend series) and
+       team_stats docs
+    4. write them to leagues/<league>/aggregates/<version>, then point meta/aggregates at
+       that version in a single write, which DatabaseManager.aggregate_path() follows. The
+       swap is refused if a game was ingested meanwhile (see swap_version)
+
+Career totals and the leaderboards are derived from the official season records, so they
+pick up the rebuilt numbers with the swap. The previous version is left in place and
+recorded in meta/aggregates['previous'] for rollback.
+
+Usage:
+    python rebuild_aggregates.py kijhl
+    python rebuild_aggregates.py whl --reparse --workers 8
+    python rebuild_aggregates.py kijhl --dry-run
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from firebase_admin import firestore
+
+from getgames import _load_jsonp, ADAPTERS, raw_payload_path, RAW_PAYLOAD_DIR
+from ingestion import is_final_status
+from league_config import LEAGUES
+from officials_identity import OfficialDirectory
+from scraper import build_game_record
+from team_stats import COUNTER_FIELDS, game_team_deltas
+from trends import append_game
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Firestore batches are limited to 500 operations
+BATCH_LIMIT = 450
+
+# Games per map task
+CHUNK_SIZE = 250
+
+def game_from_doc(doc, penalties=()) -> dict:
+    """Turn a stored game doc back into the record shape save_game_results receives.
+
+    Game docs keep officials as parallel name and jersey lists (Firestore rejects nested
+    arrays) and their penalties in the penalties collection.
+    """
+    game = dict(doc)
+    for key in ('referees', 'linesmen'):
+        names = doc.get(key, [])
+        jerseys = doc.get(f"{key}_jerseys") or ['0'] * len(names)
+        game[key] = [[name, jersey] for name, jersey in zip(names, jerseys)]
+        game.pop(f"{key}_jerseys", None)
+    game['penalties'] = sorted(penalties, key=lambda p: (p.get('period', ''), p.get('time', '')))
+    return game
+
+def reparse_game(league, game, raw_root) -> dict:
+    """Re-run the current parser over a game's cached raw payload. Returns None if not cached."""
+    path = raw_payload_path(league, game['game_number'], root=raw_root)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        data = _load_jsonp(f.read())
+    if not data:
+        return None
+    record = build_game_record(game['game_number'], ADAPTERS[league].parse_game(data), game.get('date', ''), league)
+    record['season_id'] = game.get('season_id')
+    return record
+
+def _game_sort_key(date, game_id):
+    return (date or '', str(game_id).zfill(12))
+
+def map_games(league, games, directory_tables, raw_root=None) -> dict:
+    """Map step: partial aggregates for one chunk of games. Runs in a worker process.
+
+    Args:
+        league: League identifier (e.g., 'kijhl', 'whl')
+        games: Game records from game_from_doc (each with 'season_id')
+        directory_tables: OfficialDirectory.to_dict() for the league
+        raw_root: Re-parse games from cached raw payloads under this directory when available
+
+    Returns:
+        {'officials': {(official_id, season_id): {'name', 'role', 'last', 'games': [...]}},
+         'teams': {season_id: {abbrv: counters}}, 'games': int, 'reparsed': int}
+    """
+    directory = OfficialDirectory(directory_tables.get('aliases'), directory_tables.get('jerseys'))
+    partial = {'officials': {}, 'teams': {}, 'games': 0, 'reparsed': 0}
+    for game in games:
+        season_id = game.get('season_id')
+        if raw_root:
+            reparsed = reparse_game(league, game, raw_root)
+            if reparsed is not None:
+                game = reparsed
+                partial['reparsed'] += 1
+        if not is_final_status(game.get('status')):
+            continue
+        partial['games'] += 1
+
+        game_id = str(game['game_number'])
+        sort_key = _game_sort_key(game.get('date'), game_id)
+        officials, _ = directory.resolve_game(game)
+        for official in officials:
+            entry = partial['officials'].setdefault((official['id'], season_id),
+                                                    {'name': '', 'role': '', 'last': None, 'games': []})
+            entry['games'].append((game.get('date', ''), game_id, int(game.get('total_pims', 0))))
+            # Display name and role follow the most recent game, as incremental ingestion does
+            if entry['last'] is None or sort_key > entry['last']:
+                entry.update({'name': official['name'], 'role': official['type'], 'last': sort_key})
+
+        season_teams = partial['teams'].setdefault(season_id, {})
+        for abbrv, delta in game_team_deltas(game).items():
+            counters = season_teams.setdefault(abbrv, {field: 0 for field in COUNTER_FIELDS})
+            for field in COUNTER_FIELDS:
+                counters[field] += delta[field]
+            counters['info'] = delta['info']
+    return partial
+
+def reduce_partials(partials) -> dict:
+    """Reduce step: merge map_games results."""
+    combined = {'officials': {}, 'teams': {}, 'games': 0, 'reparsed': 0}
+    for partial in partials:
+        combined['games'] += partial['games']
+        combined['reparsed'] += partial['reparsed']
+        for key, entry in partial['officials'].items():
+            target = combined['officials'].get(key)
+            if target is None:
+                combined['officials'][key] = {**entry, 'games': list(entry['games'])}
+                continue
+            target['games'].extend(entry['games'])
+            if entry['last'] > target['last']:
+                target.update({'name': entry['name'], 'role': entry['role'], 'last': entry['last']})
+        for season_id, teams in partial['teams'].items():
+            season_teams = combined['teams'].setdefault(season_id, {})
+            for abbrv, counters in teams.items():
+                target = season_teams.setdefault(abbrv, {field: 0 for field in COUNTER_FIELDS})
+                for field in COUNTER_FIELDS:
+                    target[field] += counters[field]
+                target['info'] = counters['info']
+    return combined
+
+def official_records(combined) -> dict:
+    """Official season docs keyed by '<official_id>_<season_id>', in save_game_results' format."""
+    records = {}
+    for (official_id, season_id), entry in combined['officials'].items():
+        trend = None
+        for date, game_id, pims in sorted(entry['games'], key=lambda g: _game_sort_key(g[0], g[1])):
+            trend = append_game(trend, game_id, date, pims)
+        games = len(entry['games'])
+        total_pims = sum(pims for _, _, pims in entry['games'])
+        records[f"{official_id}_{season_id}"] = {
+            'official_id': official_id,
+            'name': entry['name'],
+            'role': entry['role'],
+            'season_id': season_id,
+            'games_called': games,
+            'total_pims': total_pims,
+            'avg_pims': round(total_pims / games, 1),
+            'trend': trend
+        }
+    return records
+
+def aggregate_games(league, games, directory_tables, workers=None, raw_root=None) -> dict:
+    """Map-reduce games into aggregates, in a process pool unless workers == 1."""
+    chunks = [games[i:i + CHUNK_SIZE] for i in range(0, len(games), CHUNK_SIZE)]
+    if workers == 1 or len(chunks) <= 1:
+        partials = [map_games(league, chunk, directory_tables, raw_root) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(map_games, [league] * len(chunks), chunks,
+                                         [directory_tables] * len(chunks), [raw_root] * len(chunks)))
+    combined = reduce_partials(partials)
+    return {
+        'officials': official_records(combined),
+        'team_stats': {season_id: {'season_id': season_id, 'teams': teams}
+                       for season_id, teams in combined['teams'].items()},
+        'games': combined['games'],
+        'reparsed': combined['reparsed'],
+    }
+
+def load_games(db_manager, league) -> list:
+    """Every stored game for a league with its penalty rows (two collection scans)."""
+    firebase_path = LEAGUES[league]['firebase_path']
+    penalties = {}
+    for doc in db_manager.db.collection(f"{firebase_path}/penalties").stream():
+        row = doc.to_dict()
+        penalties.setdefault(str(row.get('game_id')), []).append(row)
+    return [game_from_doc(data, penalties.get(str(data.get('game_number')), []))
+            for data in (doc.to_dict() for doc in db_manager.db.collection(f"{firebase_path}/games").stream())]
+
+def write_version(db_manager, league, version, aggregates):
+    """Write rebuilt aggregates under leagues/<league>/aggregates/<version>."""
+    root = f"{LEAGUES[league]['firebase_path']}/aggregates/{version}"
+    writes = [(f"{root}/officials", doc_id, record) for doc_id, record in aggregates['officials'].items()]
+    writes += [(f"{root}/team_stats", str(season_id), doc) for season_id, doc in aggregates['team_stats'].items()]
+
+    batch, ops = db_manager.db.batch(), 0
+    for collection, doc_id, data in writes:
+        batch.set(db_manager.db.collection(collection).document(doc_id), data)
+        ops += 1
+        if ops >= BATCH_LIMIT:
+            batch.commit()
+            batch, ops = db_manager.db.batch(), 0
+    if ops:
+        batch.commit()
+    return len(writes)
+
+def seed_journal(db_manager, league, games):
+    """Record every stored game in the ingestion journal, so games saved before the journal
+    existed are skipped from memory instead of by a failed create()."""
+    firebase_path = LEAGUES[league]['firebase_path']
+    by_season = {}
+    for game in games:
+        by_season.setdefault(game.get('season_id'), []).append(str(game['game_number']))
+    batch = db_manager.db.batch()
+    for season_id, game_ids in by_season.items():
+        batch.set(db_manager.db.collection(f"{firebase_path}/journal").document(str(season_id)),
+                  {'season_id': season_id, 'game_ids': firestore.ArrayUnion(game_ids)}, merge=True)
+    batch.commit()
+
+def swap_version(db_manager, league, version, aggregates, game_ids):
+    """Point meta/aggregates at a version. A single-document write, so readers switch atomically.
+
+    The write runs in a transaction that also reads the journal. If a game outside `game_ids`
+    was ingested (into the old version) since the games were loaded, nothing is swapped and
+    this returns (False, None). save_game_results reads the pointer in its own transaction,
+    so a game saved once the swap commits lands on the new version.
+
+    Returns:
+        (swapped, previous version)
+    """
+    firebase_path = LEAGUES[league]['firebase_path']
+    pointer = db_manager.db.collection(f"{firebase_path}/meta").document('aggregates')
+    journal = db_manager.db.collection(f"{firebase_path}/journal")
+
+    @firestore.transactional
+    def swap(transaction):
+        current = next(iter(transaction.get_all([pointer])))
+        ingested = set()
+        for doc in transaction.get(journal):
+            ingested.update(str(game_id) for game_id in doc.to_dict().get('game_ids', []))
+        if ingested - game_ids:
+            return False, None
+        previous = (current.to_dict() or {}).get('version') if current.exists else None
+        transaction.set(pointer, {
+            'version': version,
+            'previous': previous,
+            'built_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'games': aggregates['games'],
+            'officials': len(aggregates['officials']),
+        })
+        return True, previous
+
+    return swap(db_manager.db.transaction())
+
+def rebuild(db_manager, league, workers=None, reparse=False, dry_run=False) -> dict:
+    """Rebuild one league's aggregates and swap them in. Returns a summary."""
+    start = time.perf_counter()
+    state_before = db_manager.get_ingestion_state(league)
+    games = load_games(db_manager, league)
+    directory_tables = db_manager.get_official_directory(league).to_dict()
+    raw_root = (RAW_PAYLOAD_DIR or None) if reparse else None
+    if reparse and not raw_root:
+        logger.warning("--reparse needs RAW_PAYLOAD_DIR; rebuilding from stored game docs only")
+
+    aggregates = aggregate_games(league, games, directory_tables, workers=workers, raw_root=raw_root)
+    summary = {
+        'league': league,
+        'games': aggregates['games'],
+        'reparsed': aggregates['reparsed'],
+        'officials': len(aggregates['officials']),
+        'team_seasons': len(aggregates['team_stats']),
+        'version': None,
+    }
+    logger.info(f"Aggregated {summary['games']} games ({summary['reparsed']} re-parsed) into "
+                f"{summary['officials']} official records in {time.perf_counter() - start:.1f}s")
+    if dry_run:
+        return summary
+
+    version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+    written = write_version(db_manager, league, version, aggregates)
+    logger.info(f"Wrote {written} docs to aggregates/{version}")
+
+    # Games saved during the rebuild went to the old version; don't swap them out of sight
+    if db_manager.get_ingestion_state(league) != state_before:
+        logger.error("Ingestion ran during the rebuild; not swapping. Re-run to build a fresh version.")
+        return summary
+
+    seed_journal(db_manager, league, games)
+    swapped, previous = swap_version(db_manager, league, version, aggregates,
+                                     {str(game['game_number']) for game in games})
+    if not swapped:
+        logger.error("Games were ingested during the rebuild; not swapping. Re-run to build a fresh version.")
+        return summary
+    summary['version'] = version
+    logger.info(f"Swapped {league} aggregates to {version} (previous: {previous or 'league root'})")
+    return summary
+
+if __name__ == '__main__':
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('league', choices=sorted(LEAGUES))
+    parser.add_argument('--workers', type=int, default=None, help='Map processes (default: CPU count)')
+    parser.add_argument('--reparse', action='store_true',
+                        help='Re-parse cached raw payloads from RAW_PAYLOAD_DIR with the current parsers')
+    parser.add_argument('--dry-run', action='store_true', help='Aggregate and report without writing')
+    args = parser.parse_args()
+
+    print(rebuild(DatabaseManager(), args.league, workers=args.workers, reparse=args.reparse,
+                  dry_run=args.dry_run))
@@ -0,0 +1,95 @@
+"""Replay HockeyTech payloads from fixtures/ instead of hitting the live API.
+
+The checked-in fixtures are synthetic (see fixtures/README.md); record_fixtures() captures
+real ones from the live feed. Fixture files are named after the request they answer:
+    {client_code}_game_{game_id}.jsonp               statviewfeed gameSummary / gc gamesummary
+    {client_code}_schedule_{season}_{month}.jsonp    statviewfeed schedule (KIJHL)
+    {client_code}_gamesbydate_{fetch_date}.jsonp     modulekit gamesbydate (WHL)
+"""
+import argparse
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urlsplit, parse_qs
+import requests
+
+from getgames import ADAPTERS
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+def load_fixture(name: str) -> str:
+    """Return the raw text of a fixture file (e.g. 'kijhl_game_19059.jsonp')."""
+    return (FIXTURE_DIR / name).read_text()
+
+def fixture_name_for_url(url: str):
+    """Map a HockeyTech feed URL to the fixture file that answers it, or None."""
+    params = {key: values[0] for key, values in parse_qs(urlsplit(url).query).items()}
+    feed = params.get('feed')
+    view = params.get('view') or params.get('tab')
+    client = params.get('client_code', '')
+
+    if feed in ('statviewfeed', 'gc') and view in ('gameSummary', 'gamesummary'):
+        return f"{client}_game_{params.get('game_id')}.jsonp"
+    if feed == 'statviewfeed' and view == 'schedule':
+        return f"{client}_schedule_{params.get('season')}_{params.get('month')}.jsonp"
+    if feed == 'modulekit' and view == 'gamesbydate':
+        return f"{client}_gamesbydate_{params.get('fetch_date')}.jsonp"
+    return None
+
+class ReplayResponse:
+    """Just enough of requests.Response for getgames."""
+
+    def __init__(self, url, status_code, text):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self) # type: ignore
+
+def replay_get(url, headers=None, timeout=None, **kwargs):
+    """Drop-in for requests.get that answers from fixtures (404 when there is none)."""
+    name = fixture_name_for_url(url)
+    if name and (FIXTURE_DIR / name).exists():
+        return ReplayResponse(url, 200, load_fixture(name))
+    return ReplayResponse(url, 404, '')
+
+@contextmanager
+def replay_hockeytech():
+    """Route every HockeyTech request made by getgames to the fixtures."""
+    with ExitStack() as stack:
+        for adapter in ADAPTERS.values():
+            stack.enter_context(mock.patch.object(adapter.session, 'get', replay_get))
+        yield
+
+def record_fixtures(date_str, league, season_id, fixture_dir=FIXTURE_DIR) -> list:
+    """Save a date's live schedule and game summary payloads as fixtures. Returns the file names.
+
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        league: League identifier (e.g., 'kijhl', 'whl')
+        season_id: Season ID for the league
+        fixture_dir: Directory to write to
+    """
+    adapter = ADAPTERS[league]
+    urls = [adapter.schedule_url.format(season_id=season_id, month=int(date_str[5:7]), date=date_str)]
+    urls += [adapter.game_url.format(game_id=game_id) for game_id in adapter.schedule_game_ids(date_str, season_id)]
+
+    names = []
+    for url in urls:
+        response = adapter.fetch(url, 'record', timeout=15)
+        response.raise_for_status()
+        name = fixture_name_for_url(url)
+        (Path(fixture_dir) / name).write_text(response.text)
+        names.append(name)
+    return names
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Record live HockeyTech payloads for one date into fixtures/.')
+    parser.add_argument('league', choices=sorted(ADAPTERS))
+    parser.add_argument('date', help='YYYY-MM-DD')
+    parser.add_argument('season_id', type=int)
+    args = parser.parse_args()
+    for name in record_fixtures(args.date, args.league, args.season_id):
+        print(name)
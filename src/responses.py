@@ -0,0 +1,96 @@
+"""Content-negotiated API responses: fast JSON, optional MessagePack, gzip/brotli and ETags.
+
+api_response() replaces jsonify() for the JSON API. It
+    - serialises with orjson when installed (falls back to the stdlib json module)
+    - returns MessagePack instead when the client sends Accept: application/msgpack
+    - compresses with brotli (if installed) or gzip according to Accept-Encoding
+    - sets a weak ETag and answers If-None-Match revalidation with 304 Not Modified; the
+      ETag ignores per-request timing fields, so an unchanged result still revalidates
+"""
+import gzip
+import hashlib
+import json
+
+from flask import request, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional encoding
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Top-level timing fields that differ on every request and are left out of the ETag
+UNVERSIONED_FIELDS = ('elapsed_time', 'elapsed_ms')
+
+def dumps_json(payload) -> bytes:
+    """Serialise to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+
+def _accepts(header_value: str, token: str) -> bool:
+    """True if a comma-separated Accept-style header lists token without q=0."""
+    for part in (header_value or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip() == token and params.replace(' ', '') not in ('q=0', 'q=0.0'):
+            return True
+    return False
+
+def encode_body(payload, accept='', accept_encoding=''):
+    """Serialise and compress a payload for the given Accept / Accept-Encoding headers.
+
+    Returns (body, content_type, content_encoding or None, etag).
+    """
+    if msgpack is not None and any(_accepts(accept, t) for t in MSGPACK_TYPES):
+        serialise = lambda p: msgpack.packb(p, use_bin_type=True, default=str)
+        content_type = 'application/msgpack'
+    else:
+        serialise = dumps_json
+        content_type = 'application/json'
+    body = serialise(payload)
+
+    # Weak ETag: one validator for the representation regardless of compression or timing
+    versioned = body
+    if isinstance(payload, dict) and any(field in payload for field in UNVERSIONED_FIELDS):
+        versioned = serialise({k: v for k, v in payload.items() if k not in UNVERSIONED_FIELDS})
+    etag = 'W/"' + hashlib.sha1(versioned).hexdigest()[:20] + '"'
+
+    encoding = None
+    if len(body) >= MIN_COMPRESS_BYTES:
+        if brotli is not None and _accepts(accept_encoding, 'br'):
+            body, encoding = brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+        elif _accepts(accept_encoding, 'gzip'):
+            body, encoding = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), 'gzip'
+    return body, content_type, encoding, etag
+
+def api_response(payload, status=200, cache_control=None) -> Response:
+    """Build the negotiated response for a JSON-able payload in the current request."""
+    body, content_type, encoding, etag = encode_body(payload, request.headers.get('Accept', ''),
+                                                     request.headers.get('Accept-Encoding', ''))
+    headers = {'ETag': etag, 'Vary': 'Accept, Accept-Encoding'}
+    if cache_control:
+        headers['Cache-Control'] = cache_control
+
+    if_none_match = [t.strip() for t in request.headers.get('If-None-Match', '').split(',')]
+    if status == 200 and (etag in if_none_match or '*' in if_none_match):
+        return Response(status=304, headers=headers)
+
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(body, status=status, content_type=content_type, headers=headers)
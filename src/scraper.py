@@ -0,0 +1,203 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
+from league_config import LEAGUES
+import time
+from datetime import datetime
+from pathlib import Path
+
+from getgames import ADAPTERS, get_game_ids_by_date, fetch_game_api
+from metrics import STAGE_SECONDS, EXECUTOR_QUEUE_DEPTH, CACHE_REQUESTS
+
+# (league, team_abbrev) -> logo path; logos only change with a redeploy
+_logo_cache = {}
+
+def get_logo_path(league: str, team_abbrev: str) -> str:
+    """
+    Get the path to a cached team logo.
+    
+    Args:
+        league: League identifier (e.g., 'kijhl', 'whl')
+        team_abbrev: Team abbreviation (e.g., 'CGY', 'EDM')
+        
+    Returns:
+        Path to the logo file (e.g., 'static/logos/kijhl/CGY.png')
+        Returns an empty string if logo file doesn't exist
+    """
+    key = (league, team_abbrev)
+    if key in _logo_cache:
+        CACHE_REQUESTS.inc(cache='logo_path', result='hit')
+        return _logo_cache[key]
+    
+    CACHE_REQUESTS.inc(cache='logo_path', result='miss')
+    logo_path = Path(__file__).parent / "static" / "logos" / league / f"{team_abbrev}.png"
+    _logo_cache[key] = f"static/logos/{league}/{team_abbrev}.png" if logo_path.exists() else ''
+    return _logo_cache[key]
+
+def _fetch_game_queued(game_num, league):
+    """Thread pool task: leave the queue-depth gauge, then fetch the game."""
+    EXECUTOR_QUEUE_DEPTH.dec(league=league)
+    return fetch_game_api(game_num, league)
+
+def get_season_id_by_date(date_str):
+    """
+    Determine the season ID based on the provided date.
+    This is a placeholder function and should be implemented
+    based on actual season date ranges.
+    """
+    season_start_dates = {
+        '2025-2026 (Playoffs)'  : ['2026-02-19', 66],
+        '2025-2026 (Reg Season)': ['2025-09-19', 65],
+        '2024-2025 (Playoffs)'  : ['2025-02-28', 63],
+        '2024-2025 (Reg Season)': ['2024-09-20', 61],
+        '2023-2024 (Playoffs)'  : ['2024-02-23', 59],
+        '2023-2024 (Reg Season)': ['2023-09-22', 56],
+        '2022-2023 (Playoffs)'  : ['2023-02-17', 54],
+        '2022-2023 (Reg Season)': ['2022-09-23', 52],
+        '2021-2022 (Playoffs)'  : ['2022-02-22', 51],
+        '2021-2022 (Reg Season)': ['2021-10-01', 49]
+    }
+    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+    for season, (start_date, season_id) in season_start_dates.items():
+        if date_obj >= datetime.strptime(start_date, '%Y-%m-%d'):
+            return season_id
+    return 0
+
+def build_game_record(game_num, data, date, league):
+    """Flatten parsed game stats into the record returned by /api/scrape and saved to Firestore.
+    
+    Args:
+        game_num: The game ID
+        data: Parsed stats from fetch_game_api
+        date: Date string in YYYY-MM-DD format
+        league: League identifier (e.g., 'kijhl', 'whl')
+    """
+    visitor_abbrv = data['teams']['visitor_abbrv']
+    home_abbrv = data['teams']['home_abbrv']
+    visitor_pims = int(data['pims']['visitor'])
+    home_pims = int(data['pims']['home'])
+
+    return {
+        'game_number': game_num,
+        'venue': data['game_details']['venue'],
+        'attendance': data['game_details']['attendance'],
+        'status': data['game_details']['status'],
+        'visitor_city': data['teams']['visitor_city'],
+        'home_city': data['teams']['home_city'],
+        'visitor_nickname': data['teams']['visitor_nickname'],
+        'home_nickname': data['teams']['home_nickname'],
+        'visitor_abbrv': visitor_abbrv,
+        'home_abbrv': home_abbrv,
+        'visitor_goals': data['goals']['visitor'],
+        'home_goals': data['goals']['home'],
+        'visitor_pims': visitor_pims,
+        'home_pims': home_pims,
+        'total_pims': visitor_pims + home_pims,
+        'fight_count': data['pims'].get('fight_count', 0),
+        'major_penalty_count': data['pims'].get('major_penalty_count', 0),
+        'notable_penalties': data['pims'].get('notable_penalties', []),
+        'penalties': data.get('penalties', []),
+        'referees': data['officials']['referees'],
+        'linesmen': data['officials']['linesmen'],
+        'visitor_logo': get_logo_path(league, visitor_abbrv),
+        'home_logo': get_logo_path(league, home_abbrv),
+        'date': date,
+        'league': league
+    }
+
+def day_totals(games, total_games):
+    """A day's jungle score (PIMs per scheduled game) and dirtiest team.
+    
+    Args:
+        games: Game records from build_game_record, in the order they were fetched
+        total_games: Number of games scheduled that day (including any that failed to fetch)
+    """
+    dirtiest_team_name = ""
+    dirtiest_team_pims = 0
+    for game in games:
+        visitor_pims = game['visitor_pims']
+        home_pims = game['home_pims']
+        max_pims_in_game = max(visitor_pims, home_pims)
+        if max_pims_in_game > dirtiest_team_pims:
+            dirtiest_team_name = game['visitor_abbrv'] if visitor_pims > home_pims else game['home_abbrv']
+            dirtiest_team_pims = max_pims_in_game
+    
+    jungle_score = round(sum(game['total_pims'] for game in games) / total_games, 1) if total_games > 0 else 0
+    return jungle_score, dirtiest_team_name
+
+def scrape_games(date, league='kijhl'):
+    """Retrieve game data for a given date using the API.
+    
+    Args:
+        date: Date string in YYYY-MM-DD format
+        league: League identifier (e.g., 'kijhl', 'whl')
+    """
+    # Validate league
+    if league not in LEAGUES:
+        return {
+            'games': [],
+            'errors': [f"Unknown league: {league}"],
+            'total_games': 0,
+            'elapsed_time': 0,
+            'success': False,
+            'jungle_score': 0,
+            'dirty_team': ""
+        }
+    
+    results = {
+        'games': [],
+        'errors': [],
+        'total_games': 0,
+        'elapsed_time': 0,
+        'success': False,
+        'jungle_score': 0,
+        'dirty_team': ""
+    }
+    
+    start_time = time.time()
+    
+    try:
+        # 1. Fetch Game IDs directly from API
+        season_id = get_season_id_by_date(date)
+        if not season_id:
+            results['errors'].append("No season found for the given date")
+            results['elapsed_time'] = time.time() - start_time
+            return results
+
+        game_numbers = get_game_ids_by_date(date, league=league, season_id=season_id)
+        results['total_games'] = len(game_numbers)
+        
+        if not game_numbers:
+            results['errors'].append("No games found for this date")
+            results['elapsed_time'] = time.time() - start_time
+            return results
+
+        # 2. Fetch Game Details (Concurrently)
+        max_workers = min(ADAPTERS[league].max_concurrency, len(game_numbers))  # The league's request budget
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            EXECUTOR_QUEUE_DEPTH.inc(len(game_numbers), league=league)
+            # Each task runs in a copy of this request's context, so its log lines keep the trace ID
+            future_to_game = {executor.submit(contextvars.copy_context().run, _fetch_game_queued, game_num, league): game_num 
+                              for game_num in game_numbers}
+            
+            for future in as_completed(future_to_game):
+                game_num, data, error = future.result()
+                
+                if error:
+                    results['errors'].append({
+                        'game_number': game_num,
+                        'error': error
+                    })
+                elif data:
+                    results['games'].append(build_game_record(game_num, data, date, league))
+        
+        # 4. Final Calculations
+        results['jungle_score'], results['dirty_team'] = day_totals(results['games'], results['total_games'])
+        results['success'] = True
+        
+    except Exception as e:
+        results['errors'].append(f"An application error occurred: {str(e)}")
+    
+    results['elapsed_time'] = time.time() - start_time
+    STAGE_SECONDS.observe(results['elapsed_time'], stage='scrape_total', league=league)
+    return results
@@ -0,0 +1,255 @@
+"""Pre-rendered static snapshots of closed season leaderboards and past game days.
+
+Completed seasons never change, yet every /statistics view, leaderboard load and past
+/games date still reaches Firestore or HockeyTech. This module writes those responses to
+disk once, as the exact payloads the API would return:
+
+    <league>/seasons/<season_id>/officials.json    /api/officials?league=&season=
+    <league>/seasons/<season_id>/statistics.html   /statistics page with the officials embedded
+    <league>/games/<date>.json                     /api/scrape?date=
+    <league>/manifest.json                         seasons, latest season and counts
+
+Every file gets .gz and .br (when brotli is installed) siblings compressed at the highest
+level, so serving one is a file send. SNAPSHOT_DIR defaults to static/snapshots, so the
+files ship in the image and are reachable under /static/snapshots/.
+
+Only data that can no longer change is snapshotted, because each instance serves from its
+own disk and can't see what another instance ingested. A season is closed once a later
+season in the league has records when the generator runs; the live season and careers are
+always answered by the live routes. A game day is written from a scrape_games result (the
+same payload /api/scrape returns) once every game on it is final and the date is past,
+and /tasks/update-daily adds the days it finishes. Both get SNAPSHOT_CACHE_CONTROL.
+
+Re-run the generator when a season closes, and after rebuild_aggregates.py or
+merge_officials.py changes a closed season (then purge the CDN).
+
+Usage:
+    python snapshots.py kijhl
+    python snapshots.py all --out /mnt/snapshots
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import quote
+
+from flask import request, render_template, send_file
+
+from database import without_trend
+from ingestion import is_final_status
+from league_config import LEAGUES
+from responses import _accepts, brotli, dumps_json, MSGPACK_TYPES
+from scraper import scrape_games
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                           'static', 'snapshots'))
+
+# Completed seasons and past game days: a week in browsers, a year at the CDN (purge after a rebuild)
+SNAPSHOT_CACHE_CONTROL = 'public, max-age=604800, s-maxage=31536000'
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+CONTENT_TYPES = {'.json': 'application/json', '.html': 'text/html'}
+
+def season_payload(league, season_id, records) -> dict:
+    """The default /api/officials body for one season's official records."""
+    records = [without_trend(dict(record)) for record in records]
+    return {
+        'officials': records,
+        'season': str(season_id),
+        'league': league,
+        'count': len(records)
+    }
+
+def is_complete_day(results, today) -> bool:
+    """True if a /api/scrape result is a finished, fully fetched day before today."""
+    return (results['success'] and not results['errors'] and bool(results['games'])
+            and all(game['date'] < today.isoformat() for game in results['games'])
+            and all(is_final_status(game['status']) for game in results['games']))
+
+def render_statistics(flask_app, league, season_id, payload) -> str:
+    """Render leaderboard.html for a season with its officials embedded, so the page needs no API call."""
+    with flask_app.test_request_context('/statistics', query_string={'league': league, 'season': season_id}):
+        return render_template('leaderboard.html', current_league=league, current_season=str(season_id),
+                               officials_snapshot=payload)
+
+class SnapshotStore:
+    """Snapshot files under one root directory, plus each league's manifest."""
+
+    def __init__(self, root=None):
+        self.root = root or SNAPSHOT_DIR
+        self._manifests = {}  # league -> (mtime, manifest)
+        self._lock = threading.Lock()
+
+    def path(self, league, *parts) -> str:
+        # Parts come from request parameters: quote separators and never let one be '.' or '..'
+        parts = [quote(str(part), safe='') for part in parts]
+        return os.path.join(self.root, league, *(p.replace('.', '%2E') if p in ('.', '..') else p for p in parts))
+
+    def season_path(self, league, season_id, filename) -> str:
+        return self.path(league, 'seasons', season_id, filename)
+
+    def game_day_path(self, league, date_str) -> str:
+        return self.path(league, 'games', f"{date_str}.json")
+
+    def write(self, path, body):
+        """Write body (bytes or str) and its compressed variants, each atomically."""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        variants = [('', body), ('.gz', gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(body, quality=BROTLI_QUALITY)))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for suffix, data in variants:
+            tmp_path = f"{path}{suffix}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path + suffix)
+
+    def write_json(self, path, payload):
+        self.write(path, dumps_json(payload))
+
+    def manifest(self, league) -> dict:
+        """The league's manifest, re-read only when the file changes (empty if there is none)."""
+        path = self.path(league, 'manifest.json')
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return {}
+        with self._lock:
+            cached = self._manifests.get(league)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        with self._lock:
+            self._manifests[league] = (mtime, manifest)
+        return manifest
+
+    def update_manifest(self, league, season_ids=(), **counts) -> dict:
+        """Merge season IDs and counts into the league's manifest."""
+        manifest = dict(self.manifest(league))
+        seasons = sorted(set(manifest.get('seasons', [])) | {int(s) for s in season_ids})
+        manifest.update(counts)
+        manifest.update({
+            'league': league,
+            'seasons': seasons,
+            'latest_season': seasons[-1] if seasons else None,
+            'generated_at': datetime.now(timezone.utc).isoformat()
+        })
+        self.write_json(self.path(league, 'manifest.json'), manifest)
+        return manifest
+
+    def is_complete(self, league, season_id) -> bool:
+        """A season is complete once a later season in the same league has snapshots."""
+        latest = self.manifest(league).get('latest_season')
+        return latest is not None and int(season_id) < latest
+
+def send_snapshot(path, cache_control):
+    """Serve a snapshot file for the current request, or None if there isn't one.
+
+    Picks the precompressed variant the client accepts, and leaves MessagePack requests to
+    the live route.
+    """
+    if not os.path.isfile(path):
+        return None
+    if any(_accepts(request.headers.get('Accept', ''), t) for t in MSGPACK_TYPES):
+        return None
+    mimetype = CONTENT_TYPES[os.path.splitext(path)[1]]
+    accept_encoding = request.headers.get('Accept-Encoding', '')
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if _accepts(accept_encoding, encoding) and os.path.isfile(path + suffix):
+            response = send_file(path + suffix, mimetype=mimetype, conditional=True)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_file(path, mimetype=mimetype, conditional=True)
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    return response
+
+def write_season(store, flask_app, league, season_id, records):
+    """Write one season's officials.json and statistics.html."""
+    payload = season_payload(league, season_id, records)
+    store.write_json(store.season_path(league, season_id, 'officials.json'), payload)
+    store.write(store.season_path(league, season_id, 'statistics.html'),
+                render_statistics(flask_app, league, season_id, payload))
+
+def generate(db_manager, flask_app, league, store=None, today=None) -> dict:
+    """Write every snapshot for a league: each closed season and every finished game day.
+
+    Game days never change once written, so only dates with stored games and no snapshot
+    file yet are scraped from HockeyTech, one scrape_games call each.
+
+    Args:
+        db_manager: DatabaseManager to read from
+        flask_app: The Flask app, for rendering statistics.html
+        league: League identifier (e.g., 'kijhl', 'whl')
+        store: SnapshotStore to write to (defaults to SNAPSHOT_DIR)
+        today: Game days from this date on are skipped (defaults to today)
+    """
+    store = store or SnapshotStore()
+    today = today or date.today()
+
+    # Official season records: one collection scan covers every season
+    by_season = {}
+    for record in db_manager.get_all_officials(league):
+        by_season.setdefault(record.get('season_id', 0), []).append(record)
+    latest = max(by_season, default=None)
+    for season_id, season_records in sorted(by_season.items()):
+        if season_id != latest:
+            write_season(store, flask_app, league, season_id, season_records)
+
+    # Game days up to the ingestion watermark, skipping any with games still awaiting final
+    state = db_manager.get_ingestion_state(league)
+    pending_dates = {entry.get('date') for entry in state.get('pending', {}).values()}
+    yesterday = (today - timedelta(days=1)).isoformat()
+    last_date = min(state['watermark'], yesterday) if state.get('watermark') else yesterday
+    game_days = 0
+    for date_str in db_manager.get_game_dates(league):
+        if date_str > last_date or date_str in pending_dates:
+            continue
+        if os.path.isfile(store.game_day_path(league, date_str)):
+            game_days += 1
+            continue
+        game_days += write_game_days(store, league, [scrape_games(date_str, league=league)], today)
+
+    manifest = store.update_manifest(league, by_season, game_days=game_days)
+    logger.info(f"{league}: wrote {max(len(by_season) - 1, 0)} closed seasons and {game_days} game days "
+                f"to {store.path(league)}")
+    return manifest
+
+def write_game_days(store, league, game_days, today) -> int:
+    """Write the /api/scrape results that are finished days before today. Returns how many.
+
+    Args:
+        store: SnapshotStore to write to
+        league: League identifier (e.g., 'kijhl', 'whl')
+        game_days: scrape_games results, one per date
+        today: Days from this date on are left to the live route
+    """
+    written = 0
+    for results in game_days:
+        if is_complete_day(results, today):
+            store.write_json(store.game_day_path(league, results['games'][0]['date']), results)
+            written += 1
+    return written
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('league', choices=sorted(LEAGUES) + ['all'])
+    parser.add_argument('--out', default=SNAPSHOT_DIR, help=f'Snapshot directory (default: {SNAPSHOT_DIR})')
+    args = parser.parse_args()
+
+    from app import app, db_manager
+
+    store = SnapshotStore(args.out)
+    for league in (sorted(LEAGUES) if args.league == 'all' else [args.league]):
+        print(generate(db_manager, app, league, store=store))
@@ -0,0 +1,112 @@
+"""Per-team season penalty aggregates.
+
+Each (league, season) keeps one document, leagues/<league>/team_stats/<season_id>, whose
+'teams' map holds running counters per team abbreviation. Ingestion adds a game's
+contribution with firestore.Increment in the same batch as the rest of the game's writes,
+so team standings never need to re-read game documents.
+"""
+
+# Counters kept per team. *_for are penalties the team took, *_against its opponents'.
+COUNTER_FIELDS = (
+    'games_played', 'home_games', 'away_games',
+    'pims_for', 'pims_against', 'home_pims_for', 'away_pims_for',
+    'fights', 'majors',
+)
+
+# Accepted /api/teams sort parameters -> row field
+TEAM_SORT_FIELDS = {
+    'pims': 'pims_for', 'pims_for': 'pims_for',
+    'pims_against': 'pims_against',
+    'avg': 'pims_per_game', 'pims_per_game': 'pims_per_game',
+    'fights': 'fights', 'majors': 'majors',
+    'games': 'games_played', 'games_played': 'games_played',
+}
+
+def game_team_deltas(game_data) -> dict:
+    """Each team's contribution from one game record (as built by scraper.build_game_record).
+
+    Returns:
+        {team_abbrv: {counter: amount, ..., 'info': {'city', 'nickname', 'logo'}}}
+    """
+    deltas = {}
+    for side, other in (('home', 'visitor'), ('visitor', 'home')):
+        abbrv = game_data.get(f'{side}_abbrv')
+        if not abbrv:
+            continue
+        pims_for = int(game_data.get(f'{side}_pims', 0) or 0)
+        deltas[abbrv] = {
+            'games_played': 1,
+            'home_games': int(side == 'home'),
+            'away_games': int(side == 'visitor'),
+            'pims_for': pims_for,
+            'pims_against': int(game_data.get(f'{other}_pims', 0) or 0),
+            'home_pims_for': pims_for if side == 'home' else 0,
+            'away_pims_for': pims_for if side == 'visitor' else 0,
+            'fights': 0,
+            'majors': 0,
+            'info': {
+                'city': game_data.get(f'{side}_city', ''),
+                'nickname': game_data.get(f'{side}_nickname', ''),
+                'logo': game_data.get(f'{side}_logo', ''),
+            },
+        }
+
+    for abbrv, counts in fights_and_majors(game_data.get('penalties', [])).items():
+        if abbrv in deltas:
+            deltas[abbrv].update(counts)
+    return deltas
+
+def fights_and_majors(penalties) -> dict:
+    """Each team's fights and majors from a game's penalty rows, by the parsers' rule.
+
+    Rows the parser flagged 'fighting' (5-minute fighting penalties off a power play) pair
+    up into fights, opponents at the same period and time first; an unpaired one is a
+    one-man fight and counts as a major, as does every other 5-minute penalty. So over the
+    two teams, fights add up to twice the game's fight_count and majors to its
+    major_penalty_count.
+
+    Returns:
+        {team_abbrv: {'fights': n, 'majors': n}}
+    """
+    counts = {}
+    fighting_by_time = {}
+    for penalty in penalties:
+        if penalty.get('minutes') != 5:
+            continue
+        team = counts.setdefault(penalty.get('team'), {'fights': 0, 'majors': 0})
+        # Rows stored before the parsers flagged fights
+        fighting = penalty.get('fighting', penalty.get('infraction') == 'fighting' and not penalty.get('power_play'))
+        if fighting:
+            fighting_by_time.setdefault((penalty.get('period'), penalty.get('time')), []).append(team)
+        else:
+            team['majors'] += 1
+
+    unpaired = []
+    for teams in fighting_by_time.values():
+        for i in range(0, len(teams) - 1, 2):
+            teams[i]['fights'] += 1
+            teams[i + 1]['fights'] += 1
+        if len(teams) % 2:
+            unpaired.append(teams[-1])
+    for i in range(0, len(unpaired) - 1, 2):
+        unpaired[i]['fights'] += 1
+        unpaired[i + 1]['fights'] += 1
+    if len(unpaired) % 2:
+        unpaired[-1]['majors'] += 1
+    return counts
+
+def team_rows(teams) -> list:
+    """Flatten a team_stats 'teams' map into rows with per-game rates."""
+    rows = []
+    for abbrv, counters in teams.items():
+        row = {'team': abbrv}
+        row.update(counters.get('info', {}))
+        for field in COUNTER_FIELDS:
+            row[field] = counters.get(field, 0)
+        games = row['games_played']
+        row['pims_per_game'] = round(row['pims_for'] / games, 1) if games else 0
+        row['pims_against_per_game'] = round(row['pims_against'] / games, 1) if games else 0
+        row['home_pims_per_game'] = round(row['home_pims_for'] / row['home_games'], 1) if row['home_games'] else 0
+        row['away_pims_per_game'] = round(row['away_pims_for'] / row['away_games'], 1) if row['away_games'] else 0
+        rows.append(row)
+    return rows
@@ -0,0 +1,117 @@
+from database import DatabaseManager, career_totals
+from officials_identity import OfficialDirectory
+
+class FakeQuery:
+    def __init__(self, docs, calls):
+        self.docs = docs
+        self.calls = calls
+
+    def where(self, field, op, value):
+        self.calls.append((field, op, list(value)))
+        return FakeQuery([d for d in self.docs if d.get(field) in value], self.calls)
+
+    def stream(self):
+        return [FakeDoc(d) for d in self.docs]
+
+class FakeDoc:
+    def __init__(self, data):
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+class FakeDb:
+    def __init__(self, collections):
+        self.collections = collections
+        self.calls = []
+
+    def collection(self, path):
+        return FakeQuery(self.collections.get(path, []), self.calls)
+
+def make_manager(collections):
+    manager = DatabaseManager.__new__(DatabaseManager)
+    manager.db = FakeDb(collections)
+    manager._directories = {league: (float('inf'), OfficialDirectory()) for league in ('kijhl', 'whl')}
+    manager._aggregate_paths = {league: (float('inf'), f'leagues/{league}') for league in ('kijhl', 'whl')}
+    return manager
+
+def test_career_totals():
+    totals = career_totals([{'games_called': 10, 'total_pims': 150}, {'games_called': 5, 'total_pims': 60}])
+    assert totals == {'total_games': 15, 'total_pims': 210, 'seasons_count': 2, 'career_avg': 14}
+    assert career_totals([])['career_avg'] == 0
+
+def test_batch_career_stats_one_query_per_league():
+    kijhl = [{'official_id': 'Steve_Smith', 'name': 'Steve Smith', 'season_id': 63, 'games_called': 20, 'total_pims': 300},
+             {'official_id': 'Steve_Smith', 'name': 'Steve Smith', 'season_id': 65, 'games_called': 4, 'total_pims': 50},
+             {'official_id': 'Dana_Oneil', 'name': "Dana O'Neil", 'season_id': 65, 'games_called': 3, 'total_pims': 30}]
+    whl = [{'official_id': 'Kevin_Pollock', 'name': 'Kevin Pollock', 'season_id': 289, 'games_called': 8, 'total_pims': 80}]
+    manager = make_manager({'leagues/kijhl/officials': kijhl, 'leagues/whl/officials': whl})
+
+    results = manager.get_officials_career_stats_batch(
+        [('kijhl', 'Steve Smith'), ('kijhl', "Dana O'Neil"), ('whl', 'Kevin Pollock'), ('kijhl', 'Nobody Here')])
+
+    # One ID query per league, plus a legacy name lookup for the official with no records
+    assert [call[0] for call in manager.db.calls] == ['official_id', 'official_id', 'name']
+    assert [r['official_id'] for r in results] == ['Steve_Smith', 'Dana_Oneil', 'Kevin_Pollock', 'Nobody_Here']
+    assert [s['season_id'] for s in results[0]['seasons']] == [65, 63]
+    assert results[0]['career']['total_games'] == 24
+    assert results[2]['league'] == 'whl'
+    assert results[3]['seasons'] == [] and results[3]['career']['total_games'] == 0
+
+def test_batch_career_stats_reads_legacy_name_keyed_records():
+    # Written before official IDs existed: keyed by raw name, no official_id field
+    legacy = [{'name': 'Kevin Pollock', 'season_id': 287, 'games_called': 12, 'total_pims': 150},
+              {'name': 'Kevin Pollock', 'season_id': 289, 'games_called': 3, 'total_pims': 40}]
+    current = [{'official_id': 'Steve_Smith', 'name': 'Steve Smith', 'season_id': 289, 'games_called': 5, 'total_pims': 60}]
+    manager = make_manager({'leagues/whl/officials': legacy + current})
+
+    results = manager.get_officials_career_stats_batch([('whl', 'Kevin Pollock'), ('whl', 'Steve Smith')])
+
+    assert [s['season_id'] for s in results[0]['seasons']] == [289, 287]
+    assert results[0]['career']['total_games'] == 15
+    assert manager.db.calls[-1] == ('name', 'in', ['Kevin Pollock'])
+    assert results[1]['career']['total_games'] == 5
+
+def fixture_games():
+    from replay import replay_hockeytech
+    from scraper import scrape_games
+    with replay_hockeytech():
+        return [g for g in scrape_games('2025-11-07', league='kijhl')['games'] if g['status'].startswith('Final')]
+
+def test_penalties_per_game_averages_over_games_in_scope(memory_manager):
+    games = fixture_games()
+    for game in games:
+        assert memory_manager.save_game_results('kijhl', game, season_id=65)
+
+    season = memory_manager.get_penalty_breakdown('kijhl', season_id=65)
+    assert season['games'] == 2
+    assert season['penalties_per_game'] == round(sum(len(g['penalties']) for g in games) / 2, 1)
+
+    # An infraction filter keeps the same denominator; only games with a fight used to count
+    fights = memory_manager.get_penalty_breakdown('kijhl', season_id=65, infraction='fighting')
+    assert fights['games'] == 2
+    assert fights['penalties_per_game'] == round(fights['total_penalties'] / 2, 1)
+
+    team = games[0]['home_abbrv']
+    assert memory_manager.get_penalty_breakdown('kijhl', season_id=65, team=team)['games'] == 1
+    assert memory_manager.get_penalty_breakdown('kijhl', season_id=65, official='Steve Smith')['games'] == 2
+    assert memory_manager.get_penalty_breakdown('kijhl', season_id=65, official='Steve Smith', team=team)['games'] == 1
+    assert memory_manager.get_penalty_breakdown('kijhl', season_id=65, official='Paul Leduc', team=team)['games'] == \
+        int(any(name == 'Paul Leduc' for name, _ in games[0]['linesmen']))
+
+def test_penalties_endpoint_validates_season(webapp):
+    client = webapp.app.test_client()
+    response = client.get('/api/penalties?season=abc')
+    assert response.status_code == 400 and response.get_json()['error'] == 'season must be an integer'
+    assert client.get('/api/penalties?season=65').status_code == 200
+
+def test_compare_includes_legacy_name_keyed_official(monkeypatch, webapp, memory_manager):
+    monkeypatch.setattr(webapp, 'db_manager', memory_manager)
+    officials = memory_manager.db.collection(f"{memory_manager.aggregate_path('whl')}/officials")
+    officials.document('Kevin Pollock_287').set({'name': 'Kevin Pollock', 'season_id': 287, 'games_called': 12, 'total_pims': 150})
+    officials.document('Steve_Smith_287').set({'official_id': 'Steve_Smith', 'name': 'Steve Smith', 'season_id': 287,
+                                               'games_called': 4, 'total_pims': 30})
+
+    body = webapp.app.test_client().get('/api/officials/compare?officials=whl:Kevin Pollock,whl:Steve Smith').get_json()
+    assert [o['career']['total_games'] for o in body['officials']] == [12, 4]
+    assert set(body['seasons'][0]['officials']) == {'whl:Kevin_Pollock', 'whl:Steve_Smith'}
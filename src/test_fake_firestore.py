@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
+
+from fake_firestore import Client
+
+def test_merge_and_transforms():
+    db = Client()
+    ref = db.collection('leagues/kijhl/team_stats').document('65')
+    ref.set({'teams': {'REV': {'pims_for': firestore.Increment(31), 'info': {'city': 'Revelstoke'}}}}, merge=True)
+    ref.set({'teams': {'REV': {'pims_for': firestore.Increment(4)}, 'KAM': {'pims_for': firestore.Increment(27)}},
+             'ids': firestore.ArrayUnion(['1', '2'])}, merge=True)
+    ref.set({'ids': firestore.ArrayUnion(['2', '3'])}, merge=True)
+    data = ref.get().to_dict()
+    assert data['teams']['REV'] == {'pims_for': 35, 'info': {'city': 'Revelstoke'}}
+    assert data['teams']['KAM']['pims_for'] == 27 and data['ids'] == ['1', '2', '3']
+
+def test_queries():
+    db = Client()
+    officials = db.collection('leagues/kijhl/officials')
+    for official_id, season_id, games in (('A', 65, 3), ('B', 65, 9), ('A', 63, 5)):
+        officials.document(f"{official_id}_{season_id}").set({'official_id': official_id, 'season_id': season_id,
+                                                               'games_called': games, 'tags': [official_id]})
+    assert len(officials.where('season_id', '==', 65).get()) == 2
+    assert {d.id for d in officials.where('official_id', 'in', ['A']).stream()} == {'A_65', 'A_63'}
+    assert [d.id for d in officials.where('tags', 'array_contains', 'B').stream()] == ['B_65']
+    top = officials.order_by('games_called', direction='DESCENDING').limit(2).get()
+    assert [d.id for d in top] == ['B_65', 'A_63']
+
+def test_transaction_create_is_atomic():
+    db = Client()
+    game = db.collection('leagues/kijhl/games').document('19059')
+    official = db.collection('leagues/kijhl/officials').document('A_65')
+
+    @firestore.transactional
+    def apply(transaction):
+        current = transaction.get_all([official])[0].to_dict() or {}
+        transaction.create(game, {'game_number': '19059'})
+        transaction.set(official, {'games_called': current.get('games_called', 0) + 1})
+
+    apply(db.transaction())
+    with pytest.raises(AlreadyExists):
+        apply(db.transaction())
+    assert official.get().to_dict() == {'games_called': 1}
+
+def test_database_loads_the_fake_only_for_the_memory_backend():
+    script = "import sys, database; print('fake_firestore' in sys.modules)"
+    env = {k: v for k, v in os.environ.items() if k != 'FIRESTORE_BACKEND'}
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.stdout.strip() == 'False', result.stderr
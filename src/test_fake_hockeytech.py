@@ -0,0 +1,35 @@
+import requests
+from fake_hockeytech import start_server
+from getgames import _load_jsonp
+
+def test_serves_fixtures_with_requested_callback():
+    server, base_url = start_server()
+    try:
+        response = requests.get(f"{base_url}/feed/?feed=gc&game_id=1022633&client_code=whl&tab=gamesummary"
+                                f"&callback=jsonp_1_2", timeout=5)
+        assert response.status_code == 200
+        assert response.text.startswith('jsonp_1_2(')
+        assert _load_jsonp(response.text)['GC']['Gamesummary']['meta']['id'] == '1022633'
+
+        # Unrecorded games are synthesised from a template
+        response = requests.get(f"{base_url}/feed/index.php?feed=statviewfeed&view=gameSummary&game_id=123"
+                                f"&client_code=kijhl&callback=angular.callbacks._4", timeout=5)
+        assert _load_jsonp(response.text)['details']['id'] == '123'
+    finally:
+        server.shutdown()
+
+def test_injects_rate_limits_and_errors():
+    server, base_url = start_server(rate_limit_rate=1.0)
+    try:
+        response = requests.get(f"{base_url}/feed/?feed=modulekit&view=gamesbydate&fetch_date=2025-11-07"
+                                f"&client_code=whl", timeout=5)
+        assert response.status_code == 429
+        assert server.stats['status_429'] == 1 # type: ignore
+    finally:
+        server.shutdown()
+
+    server, base_url = start_server(error_rate=1.0)
+    try:
+        assert requests.get(f"{base_url}/feed/?feed=gc&game_id=1", timeout=5).status_code == 500
+    finally:
+        server.shutdown()
@@ -0,0 +1,18 @@
+import firestore_usage
+from metrics import FIRESTORE_OPERATIONS
+
+def test_counts_per_request_and_call_site():
+    firestore_usage.start_request('get_officials')
+    firestore_usage.record('get_all_officials_for_season', reads=40)
+    firestore_usage.record('game_exists', reads=1)
+    assert firestore_usage.request_usage() == {'reads': 41, 'writes': 0, 'rpcs': 2}
+    assert FIRESTORE_OPERATIONS.value(operation='reads', call_site='get_all_officials_for_season',
+                                      endpoint='get_officials') >= 40
+
+def test_warns_once_when_daily_budget_exceeded(monkeypatch, caplog):
+    monkeypatch.setitem(firestore_usage.DAILY_BUDGETS, 'writes', firestore_usage.daily_usage()['writes'] + 5)
+    firestore_usage.record('save_game_results', writes=3)
+    assert 'budget exceeded' not in caplog.text
+    firestore_usage.record('save_game_results', writes=3)
+    firestore_usage.record('save_game_results', writes=3)
+    assert caplog.text.count('Firestore daily writes budget exceeded') == 1
@@ -0,0 +1,107 @@
+import pytest
+import requests
+
+from getgames import (_load_jsonp, parse_kijhl_game, parse_whl_game, get_game_ids_by_date, ADAPTERS,
+                      LeagueAdapter, PAST_SCHEDULE_CACHE_SECONDS, StatviewFeedAdapter)
+from league_config import LEAGUES
+from replay import load_fixture, replay_get, replay_hockeytech
+from scraper import scrape_games
+
+def test_load_jsonp_callbacks():
+    """Both the angular.callbacks and jsonp_ wrappers are stripped."""
+    assert _load_jsonp(load_fixture('kijhl_game_19059.jsonp'))['details']['id'] == '19059'
+    assert _load_jsonp(load_fixture('whl_game_1022633.jsonp'))['GC']['Gamesummary']['meta']['id'] == '1022633'
+    assert _load_jsonp('') == {}
+    assert _load_jsonp('not json') == {}
+
+def test_kijhl_fight_and_majors():
+    stats = parse_kijhl_game(_load_jsonp(load_fixture('kijhl_game_19059.jsonp')))
+    assert stats['pims']['fight_count'] == 1
+    assert stats['pims']['major_penalty_count'] == 1
+    assert len(stats['pims']['notable_penalties']) == 3
+    assert stats['officials']['referees'] == [['Steve Smith', '0'], ["Dana O'Neil", '0']]
+    assert stats['officials']['linesmen'] == [['Chris Wong', '0'], ['Mark Dube', '0']]
+
+def test_kijhl_one_man_fight_in_overtime_game():
+    stats = parse_kijhl_game(_load_jsonp(load_fixture('kijhl_game_19060.jsonp')))
+    assert stats['game_details']['status'] == 'Final OT'
+    assert stats['pims']['fight_count'] == 0
+    assert stats['pims']['major_penalty_count'] == 1
+    assert stats['officials']['referees'] == [['Steve Smith', '0'], ['Unknown', '0']]
+
+def test_kijhl_missing_officials():
+    stats = parse_kijhl_game(_load_jsonp(load_fixture('kijhl_game_19061.jsonp')))
+    assert stats['officials']['referees'] == [['Unknown', '0'], ['Unknown', '0']]
+    assert stats['officials']['linesmen'] == [['Unknown', '0'], ['Unknown', '0']]
+
+def test_whl_fight_majors_and_officials():
+    stats = parse_whl_game(_load_jsonp(load_fixture('whl_game_1022633.jsonp')))
+    assert stats['pims']['fight_count'] == 1
+    assert stats['pims']['major_penalty_count'] == 1
+    assert stats['officials']['referees'] == [['Kevin Pollock', '28'], ['Bryce Kaufman', '14']]
+    assert stats['officials']['linesmen'] == [['Dustin Minty', '71'], ['Tarrington Wyonzek', '86']]
+
+def test_whl_one_man_fight_without_officials():
+    stats = parse_whl_game(_load_jsonp(load_fixture('whl_game_1022634.jsonp')))
+    assert stats['game_details']['status'] == 'Final OT'
+    assert stats['pims']['fight_count'] == 0
+    assert stats['pims']['major_penalty_count'] == 1
+    assert stats['officials']['referees'] == [['Unknown', '0'], ['Unknown', '0']]
+
+def test_schedules_and_scrape_replay():
+    with replay_hockeytech():
+        assert get_game_ids_by_date('2025-11-07', 'kijhl', season_id=65) == ['19059', '19060', '19061']
+        assert get_game_ids_by_date('2025-11-07', 'whl', season_id=289) == ['1022633', '1022634']
+
+        results = scrape_games('2025-11-07', league='kijhl')
+    assert results['success']
+    assert results['errors'] == []
+    assert sorted(game['game_number'] for game in results['games']) == ['19059', '19060', '19061']
+    assert results['dirty_team'] == 'REV'
+
+def test_every_penalty_is_normalized():
+    kijhl = parse_kijhl_game(_load_jsonp(load_fixture('kijhl_game_19059.jsonp')))['penalties']
+    assert len(kijhl) == 10
+    assert kijhl[0] == {'period': '1', 'time': '4:12', 'team': 'KAM', 'player': 'Ryan Cole #17',
+                        'infraction': 'hooking', 'description': 'Hooking', 'minutes': 2, 'power_play': False,
+                        'fighting': False}
+    assert [p['infraction'] for p in kijhl if p['minutes'] == 5] == ['fighting', 'fighting', 'boarding']
+
+    whl = parse_whl_game(_load_jsonp(load_fixture('whl_game_1022633.jsonp')))['penalties']
+    assert len(whl) == 7
+    assert whl[5]['infraction'] == 'checking_from_behind'
+    assert whl[5]['power_play'] is True
+
+def test_adapters_prefill_urls_from_config():
+    for league, config in LEAGUES.items():
+        adapter = ADAPTERS[league]
+        for url in (adapter.game_url, adapter.schedule_url):
+            assert f"key={config['api_key']}" in url and f"client_code={config['client_code']}" in url
+            assert '{api_key}' not in url and '{callback}' not in url
+    whl_url = ADAPTERS['whl'].schedule_url.format(date='2025-11-07')
+    assert _load_jsonp(whl_url.split('callback=')[1] + '({"ok": 1})') == {'ok': 1}
+    assert ADAPTERS['kijhl'].session is not ADAPTERS['whl'].session
+
+def test_statviewfeed_fetches_each_month_once(monkeypatch):
+    adapter = StatviewFeedAdapter('kijhl', LEAGUES['kijhl'])
+    urls = []
+    monkeypatch.setattr(adapter.session, 'get', lambda url, **kwargs: urls.append(url) or replay_get(url, **kwargs))
+
+    assert adapter.schedule_game_ids('2025-11-07', 65) == ['19059', '19060', '19061']
+    assert adapter.schedule_game_ids('2025-11-08', 65) == ['19066']
+    assert adapter.schedule_game_ids('2025-11-07', 65) == ['19059', '19060', '19061']
+    assert len(urls) == 1
+    assert adapter._months[urls[0]][1] == PAST_SCHEDULE_CACHE_SECONDS
+
+    # A failed fetch isn't cached
+    with pytest.raises(requests.exceptions.HTTPError):
+        adapter.schedule_game_ids('2025-12-05', 65)
+    with pytest.raises(requests.exceptions.HTTPError):
+        adapter.schedule_game_ids('2025-12-06', 65)
+    assert len(urls) == 3
+
+def test_league_adapters_must_implement_schedule_lookup():
+    class Incomplete(LeagueAdapter):
+        pass
+    with pytest.raises(TypeError):
+        Incomplete('kijhl', LEAGUES['kijhl'])
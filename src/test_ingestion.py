@@ -0,0 +1,85 @@
+from datetime import date, datetime, timedelta
+from ingestion import (new_ingestion_state, dates_to_scrape, queue_pending, resolve_pending,
+                       due_pending, is_final_status, IngestionJournal, MAX_REPOLL_ATTEMPTS)
+
+def test_final_status():
+    """Final, overtime and shootout finals count; anything else is re-polled."""
+    assert is_final_status('Final')
+    assert is_final_status('Final OT')
+    assert is_final_status('final so')
+    assert not is_final_status('In Progress')
+    assert not is_final_status('TBD')
+    assert not is_final_status(None)
+
+def test_dates_to_scrape_catches_up_from_watermark():
+    state = new_ingestion_state()
+    assert dates_to_scrape(state, date(2025, 11, 7)) == ['2025-11-07']
+
+    state['watermark'] = '2025-11-04'
+    assert dates_to_scrape(state, date(2025, 11, 7)) == ['2025-11-05', '2025-11-06', '2025-11-07']
+
+    state['watermark'] = '2025-11-07'
+    assert dates_to_scrape(state, date(2025, 11, 7)) == []
+
+    state['watermark'] = '2025-10-01'
+    assert len(dates_to_scrape(state, date(2025, 11, 7), max_days=3)) == 3
+
+def test_pending_games_back_off_and_resolve():
+    state = new_ingestion_state()
+    now = datetime(2025, 11, 7, 19, 0)
+
+    queue_pending(state, 19059, '2025-11-07', 65, now)
+    assert due_pending(state, now) == []
+    later = now + timedelta(hours=1)
+    assert [game_id for game_id, _ in due_pending(state, later)] == ['19059']
+
+    # Each re-poll doubles the delay
+    queue_pending(state, 19059, '2025-11-07', 65, later)
+    assert due_pending(state, later + timedelta(minutes=59)) == []
+    assert due_pending(state, later + timedelta(minutes=61))
+
+    resolve_pending(state, 19059)
+    assert state['pending'] == {}
+
+def test_pending_game_dropped_after_max_attempts():
+    state = new_ingestion_state()
+    now = datetime(2025, 11, 7, 19, 0)
+    for _ in range(MAX_REPOLL_ATTEMPTS):
+        assert queue_pending(state, 1, '2025-11-07', 65, now)
+    assert not queue_pending(state, 1, '2025-11-07', 65, now)
+    assert state['pending'] == {}
+
+def test_journal_answers_from_memory_and_local_file(tmp_path):
+    path = tmp_path / 'journal' / 'kijhl.journal'
+    journal = IngestionJournal(['19058'], path=str(path))
+    assert '19058' in journal and 19059 not in journal
+
+    journal.record(19059)
+    journal.record('19059')
+    assert 19059 in journal
+    assert path.read_text() == '19059\n'
+
+    # A new process picks up the local file plus whatever Firestore reports
+    reloaded = IngestionJournal(path=str(path))
+    reloaded.update(['19060'])
+    assert '19059' in reloaded and '19060' in reloaded and len(reloaded) == 2
+
+def test_daily_update_keeps_watermark_when_schedule_fetch_fails(monkeypatch, webapp):
+    import pytz
+    from getgames import ADAPTERS
+    from replay import ReplayResponse
+
+    today = datetime.now(pytz.timezone('America/Vancouver')).date()
+    yesterday = (today - timedelta(days=1)).isoformat()
+    webapp.db_manager.save_ingestion_state('kijhl', {'watermark': yesterday, 'pending': {}})
+    client = webapp.app.test_client()
+
+    # HockeyTech outage: the day is retried on the next run, not skipped as an off-day
+    monkeypatch.setattr(ADAPTERS['kijhl'].session, 'get', lambda url, **kwargs: ReplayResponse(url, 500, ''))
+    assert client.get('/tasks/update-daily?league=kijhl').get_json()['watermark'] == yesterday
+    assert webapp.db_manager.get_ingestion_state('kijhl')['watermark'] == yesterday
+
+    # A schedule that was fetched and has no games that day is an off-day
+    empty = 'angular.callbacks._3([{"sections": [{"data": []}]}])'
+    monkeypatch.setattr(ADAPTERS['kijhl'].session, 'get', lambda url, **kwargs: ReplayResponse(url, 200, empty))
+    assert client.get('/tasks/update-daily?league=kijhl').get_json()['watermark'] == today.isoformat()
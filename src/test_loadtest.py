@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from getgames import ADAPTERS
+from league_config import HOCKEYTECH_BASE_URL
+from loadtest import percentile, run_loadtest, saturation_point
+
+@pytest.fixture
+def restore_stack_globals(monkeypatch, webapp):
+    """Put back anything a local stack leaves behind, so a failing run can't break later tests."""
+    monkeypatch.delenv('FIRESTORE_BACKEND')
+    urls = {league: (adapter.game_url, adapter.schedule_url) for league, adapter in ADAPTERS.items()}
+    store = webapp.snapshot_store
+    yield urls, store
+    for league, (game_url, schedule_url) in urls.items():
+        ADAPTERS[league].game_url, ADAPTERS[league].schedule_url = game_url, schedule_url
+    webapp.snapshot_store = store
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+def test_saturation_point():
+    levels = [{'concurrency': 1, 'rps': 50}, {'concurrency': 2, 'rps': 95}, {'concurrency': 4, 'rps': 98}]
+    assert saturation_point(levels) == 2
+    assert saturation_point(levels[:2]) is None
+
+def test_short_run_against_local_stack(restore_stack_globals, webapp):
+    run = run_loadtest(mix='gamenight', levels=(1, 2), duration=0.5, seed_count=20)
+    assert [level['concurrency'] for level in run['levels']] == [1, 2]
+    for level in run['levels']:
+        assert level['requests'] > 0 and level['error_rate'] == 0.0
+        assert level['p50_ms'] <= level['p95_ms'] <= level['p99_ms']
+
+    # The stack's environment, feed URLs and snapshot store don't outlive it
+    urls, store = restore_stack_globals
+    assert 'FIRESTORE_BACKEND' not in os.environ
+    assert {league: (a.game_url, a.schedule_url) for league, a in ADAPTERS.items()} == urls
+    assert all(a.game_url.startswith(HOCKEYTECH_BASE_URL) for a in ADAPTERS.values())
+    assert webapp.snapshot_store is store
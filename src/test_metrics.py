@@ -0,0 +1,53 @@
+from metrics import Counter, Histogram, render_metrics
+
+def test_counter_and_histogram_exposition():
+    requests_total = Counter('test_requests_total', 'Test counter.', labels=('status',))
+    requests_total.inc(status=200)
+    requests_total.inc(2, status=200)
+    assert requests_total.value(status=200) == 3
+
+    latency = Histogram('test_latency_seconds', 'Test histogram.', labels=('stage',), buckets=(0.1, 1.0))
+    latency.observe(0.05, stage='parse')
+    latency.observe(0.5, stage='parse')
+    latency.observe(5, stage='parse')
+    assert latency.count(stage='parse') == 3
+
+    text = render_metrics()
+    assert 'test_requests_total{status="200"} 3' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="1.0"} 2' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{stage="parse"} 3' in text
+
+def test_scrape_worker_logs_carry_the_request_trace_id(monkeypatch):
+    import logging
+    import threading
+    import scraper
+    from metrics import TraceIdFilter, trace_id_var
+    from replay import replay_hockeytech
+
+    records = []
+    handler = logging.Handler()
+    handler.addFilter(TraceIdFilter())
+    handler.emit = records.append
+    worker_logger = logging.getLogger('test_worker')
+    worker_logger.addHandler(handler)
+    worker_logger.setLevel(logging.INFO)
+
+    fetch = scraper.fetch_game_api
+    def logged_fetch(game_num, league):
+        worker_logger.info(f"fetching {game_num}")
+        return fetch(game_num, league)
+    monkeypatch.setattr(scraper, 'fetch_game_api', logged_fetch)
+
+    token = trace_id_var.set('trace-abc')
+    try:
+        with replay_hockeytech():
+            scraper.scrape_games('2025-11-07', league='kijhl')
+    finally:
+        trace_id_var.reset(token)
+        worker_logger.removeHandler(handler)
+
+    assert len(records) == 3
+    assert all(r.threadName != threading.current_thread().name for r in records)
+    assert {r.trace_id for r in records} == {'trace-abc'}
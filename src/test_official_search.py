@@ -0,0 +1,77 @@
+import time
+from official_search import OfficialSearchIndex, SearchIndexCache
+
+def _record(name, season, games, pims, role='referee'):
+    return {'official_id': name.replace(' ', '_'), 'name': name, 'role': role,
+            'season_id': season, 'games_called': games, 'total_pims': pims}
+
+def test_prefix_search_ranks_and_summarises_careers():
+    index = OfficialSearchIndex()
+    index.add_many('kijhl', [_record('Steve Smith', 61, 30, 900), _record('Steve Smith', 65, 10, 250),
+                             _record('Stephanie Lowe', 65, 40, 1000), _record('Ben Stevens', 65, 5, 100, 'linesman')])
+    index.add_many('whl', [_record('Kevin Smith', 289, 12, 300)])
+
+    results = index.search('ste')
+    assert [r['name'] for r in results] == ['Stephanie Lowe', 'Steve Smith', 'Ben Stevens']
+    assert results[1]['career'] == {'total_games': 40, 'total_pims': 1150, 'career_avg': 28.8, 'seasons_count': 2}
+
+    # Last-name search spans leagues; exact match ranks first
+    assert [(r['league'], r['name']) for r in index.search('smith')] == [('kijhl', 'Steve Smith'), ('whl', 'Kevin Smith')]
+    assert [r['name'] for r in index.search('steve smith')] == ['Steve Smith']
+    assert [r['name'] for r in index.search('smith', league='whl')] == ['Kevin Smith']
+    assert index.search('') == []
+
+def test_incremental_update_replaces_season_totals():
+    index = OfficialSearchIndex()
+    index.add('kijhl', _record('Steve Smith', 65, 10, 250))
+    index.add('kijhl', _record('Steve Smith', 65, 11, 280))
+    assert len(index) == 1
+    assert index.search('steve')[0]['career']['total_games'] == 11
+
+def test_search_is_sub_millisecond_on_a_large_index():
+    index = OfficialSearchIndex()
+    for i in range(5000):
+        index.add('kijhl', _record(f"Official{i} Name{i % 97}", 65, 10, 200))
+    start = time.perf_counter()
+    index.search('official12')
+    assert time.perf_counter() - start < 0.001 * 5  # generous bound for slow CI machines
+
+def test_search_cache_rebuilds_only_when_version_changes():
+    records = [_record('Dana ONeil', 65, 10, 200), _record('Dana O Neil', 65, 5, 80)]
+    version = ['v1']
+    loads = []
+    def loader():
+        loads.append(1)
+        return [('kijhl', list(records))]
+    cache = SearchIndexCache(loader, version=lambda: version[0])
+    assert len(cache.get().search('dana')) == 2
+
+    # Ingestion updates land in the current index without a reload
+    cache.add_many('kijhl', [_record('Dana Smith', 65, 1, 2)])
+    assert len(cache.get().search('dana')) == 3
+    assert len(loads) == 1
+
+    # A merge elsewhere shows up once the version moves
+    records[:] = [_record('Dana ONeil', 65, 15, 280)]
+    version[0] = 'v2'
+    assert [r['name'] for r in cache.get().search('dana')] == ['Dana ONeil']
+    assert len(loads) == 2
+
+def test_search_cache_rebuilds_after_backstop_ttl():
+    records = [_record('Dana ONeil', 65, 10, 200)]
+    cache = SearchIndexCache(lambda: [('kijhl', list(records))], ttl=0.05)
+    assert cache.get().search('dana')[0]['career']['total_games'] == 10
+    records[:] = [_record('Dana ONeil', 65, 15, 280)]
+    time.sleep(0.06)
+    assert cache.get().search('dana')[0]['career']['total_games'] == 15
+
+def test_search_endpoint_validates_limit(webapp):
+    client = webapp.app.test_client()
+    assert client.get('/api/officials/search?q=a&limit=abc').status_code == 400
+    for limit in ('0', '-3', '500'):
+        assert client.get(f'/api/officials/search?q=a&limit={limit}').status_code == 200
+
+def test_search_endpoint_revalidates_despite_timing(webapp):
+    client = webapp.app.test_client()
+    etag = client.get('/api/officials/search?q=steve').headers['ETag']
+    assert client.get('/api/officials/search?q=steve', headers={'If-None-Match': etag}).status_code == 304
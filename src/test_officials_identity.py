@@ -0,0 +1,74 @@
+from officials_identity import OfficialDirectory, normalize_name, canonical_id
+from merge_officials import plan_merges, merge_group, merge_officials
+from replay import replay_hockeytech
+from scraper import scrape_games
+
+def test_name_variants_share_an_id():
+    assert normalize_name("  Dana O'Neil ") == 'dana oneil'
+    assert normalize_name('Jean-Luc Côté') == 'jean luc cote'
+    assert canonical_id("Dana O'Neil") == canonical_id('dana  ONEIL') == 'Dana_Oneil'
+    assert canonical_id('Steve_Smith') == 'Steve_Smith'
+
+def test_alias_and_jersey_resolution():
+    directory = OfficialDirectory(aliases={'steve smyth': 'Steve_Smith'})
+    assert directory.resolve('Steve Smyth') == 'Steve_Smith'
+
+    assert directory.learn('28', 'Kevin_Pollock') == {'28': 'Kevin_Pollock'}
+    assert directory.learn('28', 'Kevin_Pollock') == {}
+    assert directory.resolve('Kev Pollock', '28') == 'Kevin_Pollock'
+    # A reassigned jersey with a different last name is not trusted
+    assert directory.resolve('Ryan Kaufman', '28') == 'Ryan_Kaufman'
+
+def test_merge_plan_combines_variants():
+    records = [
+        ("Dana_O'Neil_65", {'name': "Dana O'Neil", 'role': 'referee', 'season_id': 65, 'games_called': 10, 'total_pims': 300}),
+        ('Dana_Oneil_65', {'name': 'Dana Oneil', 'role': 'referee', 'season_id': 65, 'games_called': 2, 'total_pims': 40}),
+        ('Dana_Oneil_61', {'name': 'Dana Oneil', 'role': 'referee', 'season_id': 61, 'games_called': 5, 'total_pims': 100}),
+    ]
+    groups = plan_merges(records, OfficialDirectory())
+    assert sorted(groups) == [('Dana_Oneil', 61), ('Dana_Oneil', 65)]
+
+    merged = merge_group('Dana_Oneil', 65, groups[('Dana_Oneil', 65)])
+    assert merged['games_called'] == 12
+    assert merged['total_pims'] == 340
+    assert merged['avg_pims'] == 28.3
+    assert merged['name'] == "Dana O'Neil"
+    assert merged['official_id'] == 'Dana_Oneil'
+
+def test_merge_rewrites_penalty_rows_for_official_queries(memory_manager):
+    with replay_hockeytech():
+        games = {g['game_number']: g for g in scrape_games('2025-11-07', league='kijhl')['games']}
+    # Game 19059 has "Dana O'Neil" (Dana_Oneil); 19060 gets a spelling that resolves to another ID
+    games['19060']['referees'] = [['Dana O Neil', '0']]
+    for game_id in ('19059', '19060'):
+        assert memory_manager.save_game_results('kijhl', games[game_id], season_id=65)
+    # A row written before canonical IDs existed holds the raw name
+    memory_manager.db.collection('leagues/kijhl/penalties').document('legacy_0').set(
+        {'season_id': 65, 'game_id': 'legacy', 'infraction': 'roughing', 'minutes': 2, 'officials': ['Dana O Neil']})
+    assert memory_manager.get_penalty_breakdown('kijhl', season_id=65, official='Dana_Oneil')['total_penalties'] == \
+        len(games['19059']['penalties'])
+
+    memory_manager.get_official_directory('kijhl').add_alias('Dana O Neil', 'Dana_Oneil')
+    merge_officials(memory_manager, 'kijhl')
+
+    breakdown = memory_manager.get_penalty_breakdown('kijhl', season_id=65, official="Dana O'Neil")
+    assert breakdown['total_penalties'] == len(games['19059']['penalties']) + len(games['19060']['penalties']) + 1
+    assert breakdown['games'] == 2
+
+def test_jersey_matched_variant_survives_a_merge(memory_manager):
+    with replay_hockeytech():
+        game = next(g for g in scrape_games('2025-11-07', league='whl')['games'] if g['game_number'] == '1022633')
+    # The second game spells the referee differently; jersey 28 ties it to Kevin_Pollock
+    variant = dict(game, game_number='1022700', referees=[['Kev Pollock', '28'], game['referees'][1]])
+    for g in (game, variant):
+        assert memory_manager.save_game_results('whl', g, season_id=289)
+    officials = memory_manager.db.collection(f"{memory_manager.aggregate_path('whl')}/officials")
+    assert officials.document('Kevin_Pollock_289').get().to_dict()['name'] == 'Kev Pollock'
+
+    merge_officials(memory_manager, 'whl')
+    assert officials.document('Kevin_Pollock_289').get().exists
+    assert not officials.document('Kev_Pollock_289').get().exists
+
+    assert memory_manager.save_game_results('whl', dict(game, game_number='1022701'), season_id=289)
+    assert memory_manager.get_official_career_stats('whl', 'Kevin Pollock')['career']['total_games'] == 3
+    assert memory_manager.get_penalty_breakdown('whl', season_id=289, official='Kevin Pollock')['games'] == 3
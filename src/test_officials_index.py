@@ -0,0 +1,36 @@
+from officials_index import SeasonOfficialsIndex, SeasonIndexCache
+
+RECORDS = [
+    {'name': 'Steve Smith', 'role': 'referee', 'season_id': 65, 'games_called': 20, 'total_pims': 600, 'avg_pims': 30.0},
+    {'name': 'Dana Oneil', 'role': 'referee', 'season_id': 65, 'games_called': 4, 'total_pims': 160, 'avg_pims': 40.0},
+    {'name': 'Chris Wong', 'role': 'linesman', 'season_id': 65, 'games_called': 25, 'total_pims': 500, 'avg_pims': 20.0},
+    {'name': 'Mark Dube', 'role': 'linesman', 'season_id': 65, 'games_called': 10, 'total_pims': 250, 'avg_pims': 25.0},
+]
+
+def test_filter_sort_and_paginate():
+    index = SeasonOfficialsIndex(RECORDS)
+
+    rows, total = index.query(sort='pims')
+    assert [r['name'] for r in rows] == ['Steve Smith', 'Chris Wong', 'Mark Dube', 'Dana Oneil']
+    assert total == 4
+
+    rows, total = index.query(role='linesman', sort='avg', order='asc')
+    assert [r['name'] for r in rows] == ['Chris Wong', 'Mark Dube']
+
+    rows, total = index.query(min_games=5, sort='games', page=2, limit=2)
+    assert [r['name'] for r in rows] == ['Mark Dube']
+    assert total == 3
+
+    rows, _ = index.query(sort='avg', limit=1, fields=['name', 'avg_pims'])
+    assert rows == [{'name': 'Dana Oneil', 'avg_pims': 40.0}]
+
+def test_cache_loads_once_and_invalidates_on_ingest():
+    loads = []
+    cache = SeasonIndexCache(lambda league, season_id: loads.append((league, season_id)) or RECORDS)
+    cache.get('kijhl', 65)
+    cache.get('kijhl', 65)
+    assert loads == [('kijhl', 65)]
+
+    cache.invalidate('kijhl', [{'season_id': 65}])
+    cache.get('kijhl', 65)
+    assert len(loads) == 2
@@ -1,13 +1,11 @@
 import json
 import requests
-from getgames import fetch_game_api, BASE_HEADERS, _load_jsonp
-from league_config import LEAGUES
+from getgames import fetch_game_api, BASE_HEADERS, _load_jsonp, ADAPTERS
 
 def test_raw_whl_response():
     """Debug: Check the raw WHL API response."""
     game_number_whl = 1022633
-    config = LEAGUES.get('whl')
-    url = config['base_url'].format(game_id=game_number_whl)
+    url = ADAPTERS['whl'].game_url.format(game_id=game_number_whl)
     
     print(f"URL: {url}\n")
     
@@ -0,0 +1,97 @@
+import shutil
+
+import rebuild_aggregates
+from league_config import LEAGUES
+from officials_identity import OfficialDirectory
+from rebuild_aggregates import aggregate_games, game_from_doc, rebuild
+from replay import FIXTURE_DIR, replay_hockeytech
+from scraper import scrape_games
+from team_stats import COUNTER_FIELDS, game_team_deltas
+from trends import append_game
+
+def stored_games(league, season_id):
+    """Fixture games as save_game_results would store them (game doc + penalty rows)."""
+    with replay_hockeytech():
+        games = scrape_games('2025-11-07', league=league)['games']
+    docs = []
+    for game in games:
+        doc = {k: v for k, v in game.items() if k != 'penalties'}
+        for key in ('referees', 'linesmen'):
+            doc[key] = [name for name, _ in game[key]]
+            doc[f"{key}_jerseys"] = [str(jersey) for _, jersey in game[key]]
+        doc['season_id'] = season_id
+        docs.append(game_from_doc(doc, game['penalties']))
+    return docs
+
+def test_rebuild_matches_incremental_ingestion():
+    games = stored_games('kijhl', 65)
+    aggregates = aggregate_games('kijhl', games, OfficialDirectory().to_dict(), workers=1)
+
+    final = [g for g in games if g['status'].startswith('Final')]
+    assert aggregates['games'] == len(final) == 2
+    smith = aggregates['officials']['Steve_Smith_65']
+    worked = sorted((g for g in final if any(name == 'Steve Smith' for name, _ in g['referees'])),
+                    key=lambda g: g['game_number'])
+    assert smith['games_called'] == len(worked) and smith['total_pims'] == sum(g['total_pims'] for g in worked)
+    trend = None
+    for g in worked:
+        trend = append_game(trend, g['game_number'], g['date'], g['total_pims'])
+    assert smith['trend'] == trend
+
+    teams = aggregates['team_stats'][65]['teams']
+    for g in final:
+        for abbrv, delta in game_team_deltas(g).items():
+            assert {f: teams[abbrv][f] for f in COUNTER_FIELDS} == {f: delta[f] for f in COUNTER_FIELDS}
+
+def test_parallel_rebuild_matches_serial(monkeypatch):
+    monkeypatch.setattr('rebuild_aggregates.CHUNK_SIZE', 1)
+    games = stored_games('whl', 289)
+    serial = aggregate_games('whl', games, {}, workers=1)
+    parallel = aggregate_games('whl', games, {}, workers=2)
+    assert parallel == serial
+    assert serial['officials']['Kevin_Pollock_289']['games_called'] == 1
+
+def test_reparse_uses_cached_raw_payloads(tmp_path):
+    games = stored_games('whl', 289)
+    for game in games:
+        # Simulate an older parser that missed the officials
+        game['referees'], game['linesmen'] = [], []
+    assert aggregate_games('whl', games, {}, workers=1)['officials'] == {}
+
+    (tmp_path / 'whl').mkdir()
+    shutil.copy(FIXTURE_DIR / 'whl_game_1022633.jsonp', tmp_path / 'whl' / '1022633.jsonp')
+    aggregates = aggregate_games('whl', games, {}, workers=1, raw_root=str(tmp_path))
+    assert aggregates['reparsed'] == 1
+    assert aggregates['officials']['Kevin_Pollock_289']['season_id'] == 289
+
+def fixture_finals(league):
+    with replay_hockeytech():
+        return [g for g in scrape_games('2025-11-07', league=league)['games'] if g['status'].startswith('Final')]
+
+def test_games_saved_after_a_swap_land_on_the_new_version(memory_manager):
+    first, second = sorted(fixture_finals('whl'), key=lambda g: g['game_number'])
+    assert memory_manager.save_game_results('whl', first, season_id=289)
+    old_path = memory_manager.aggregate_path('whl')
+
+    summary = rebuild(memory_manager, 'whl', workers=1)
+    assert summary['version']
+    # The cached pointer is stale, but ingestion reads the pointer in its transaction
+    assert memory_manager.aggregate_path('whl') == old_path
+    assert memory_manager.save_game_results('whl', second, season_id=289)
+    new_path = f"{LEAGUES['whl']['firebase_path']}/aggregates/{summary['version']}"
+    team_stats = memory_manager.db.collection(f"{new_path}/team_stats").document('289').get().to_dict()
+    assert team_stats['teams']['WEN']['games_played'] == 1
+
+def test_swap_is_refused_when_a_game_is_ingested_during_the_rebuild(monkeypatch, memory_manager):
+    first, second = sorted(fixture_finals('whl'), key=lambda g: g['game_number'])
+    assert memory_manager.save_game_results('whl', first, season_id=289)
+
+    write = rebuild_aggregates.write_version
+    def write_then_ingest(*args):
+        written = write(*args)
+        memory_manager.save_game_results('whl', second, season_id=289)
+        return written
+    monkeypatch.setattr(rebuild_aggregates, 'write_version', write_then_ingest)
+    # The ingestion state check can't see it (pending and watermark unchanged)
+    assert rebuild(memory_manager, 'whl', workers=1)['version'] is None
+    assert memory_manager.aggregate_path('whl') == LEAGUES['whl']['firebase_path']
@@ -0,0 +1,46 @@
+import gzip
+import json
+from flask import Flask
+from responses import api_response, encode_body, msgpack
+
+app = Flask(__name__)
+PAYLOAD = {'games': [{'visitor_nickname': 'Storm', 'notable_penalties': []} for _ in range(100)]}
+
+def test_gzip_and_identity_encodings():
+    body, content_type, encoding, _ = encode_body(PAYLOAD)
+    assert (content_type, encoding) == ('application/json', None)
+    assert json.loads(body) == PAYLOAD
+
+    gzipped, _, encoding, _ = encode_body(PAYLOAD, accept_encoding='gzip, deflate')
+    assert encoding == 'gzip'
+    assert json.loads(gzip.decompress(gzipped)) == PAYLOAD
+    assert len(gzipped) < len(body) / 5
+
+    # Small bodies and q=0 are left alone
+    assert encode_body({'ok': True}, accept_encoding='gzip')[2] is None
+    assert encode_body(PAYLOAD, accept_encoding='gzip;q=0')[2] is None
+
+def test_msgpack_negotiation():
+    body, content_type, _, _ = encode_body(PAYLOAD, accept='application/msgpack')
+    if msgpack is not None:
+        assert content_type == 'application/msgpack'
+        assert msgpack.unpackb(body) == PAYLOAD
+    else:
+        assert content_type == 'application/json'
+
+def test_etag_revalidation():
+    with app.test_request_context('/'):
+        etag = api_response(PAYLOAD).headers['ETag']
+    with app.test_request_context('/', headers={'If-None-Match': etag}):
+        response = api_response(PAYLOAD)
+        assert response.status_code == 304
+        assert response.data == b''
+    with app.test_request_context('/', headers={'If-None-Match': 'W/"stale"'}):
+        assert api_response(PAYLOAD).status_code == 200
+
+def test_etag_ignores_timing_fields():
+    with app.test_request_context('/'):
+        etag = api_response(dict(PAYLOAD, elapsed_time=0.41)).headers['ETag']
+    with app.test_request_context('/', headers={'If-None-Match': etag}):
+        assert api_response(dict(PAYLOAD, elapsed_time=0.37)).status_code == 304
+        assert api_response(dict(PAYLOAD, elapsed_time=0.37, count=99)).status_code == 200
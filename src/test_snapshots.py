@@ -0,0 +1,105 @@
+import gzip
+import json
+from datetime import date
+
+from benchmark import FIXTURE_DATE
+from replay import replay_hockeytech
+from scraper import scrape_games
+from snapshots import SnapshotStore, generate, is_complete_day, write_game_days, SNAPSHOT_CACHE_CONTROL
+
+def fixture_day(league='kijhl'):
+    with replay_hockeytech():
+        return scrape_games(FIXTURE_DATE, league=league)
+
+def test_only_finished_days_are_written(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    results = fixture_day()
+
+    # One game is still in progress, so the day isn't finished
+    assert not is_complete_day(results, date(2025, 11, 8))
+    assert write_game_days(store, 'kijhl', [results], date(2025, 11, 8)) == 0
+
+    whl = fixture_day('whl')
+    assert not is_complete_day(whl, date(2025, 11, 7))
+    assert write_game_days(store, 'whl', [whl], date(2025, 11, 8)) == 1
+    with open(store.game_day_path('whl', FIXTURE_DATE)) as f:
+        assert json.load(f) == json.loads(json.dumps(whl))
+
+def test_store_writes_compressed_variants_and_manifest(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    path = store.season_path('kijhl', 49, 'officials.json')
+    store.write_json(path, {'officials': [], 'season': '49'})
+    with open(path + '.gz', 'rb') as f:
+        assert json.loads(gzip.decompress(f.read())) == {'officials': [], 'season': '49'}
+
+    # Request parameters can't climb out of the snapshot directory
+    assert store.game_day_path('kijhl', '../../x').startswith(str(tmp_path / 'kijhl' / 'games'))
+    assert '..' not in store.path('kijhl', '..').split('/')
+
+    store.update_manifest('kijhl', [49, 65])
+    assert store.is_complete('kijhl', 49) and not store.is_complete('kijhl', 65)
+    store.update_manifest('kijhl', [66])
+    assert store.is_complete('kijhl', 65) and not store.is_complete('kijhl', 66)
+
+def canonical_day(payload):
+    """A /api/scrape body without its timing, games in ID order (they arrive in fetch order)."""
+    payload = {k: v for k, v in payload.items() if k != 'elapsed_time'}
+    payload['games'] = sorted(payload['games'], key=lambda g: g['game_number'])
+    return payload
+
+def test_app_serves_closed_seasons_and_finished_days(tmp_path, monkeypatch, webapp):
+    store = SnapshotStore(str(tmp_path))
+    monkeypatch.setattr(webapp, 'snapshot_store', store)
+    kijhl = [g for g in fixture_day()['games'] if g['status'].startswith('Final')]
+    for game in kijhl:
+        webapp.db_manager.save_game_results('kijhl', game, season_id=65)
+    # A game in the next season closes season 65
+    webapp.db_manager.save_game_results('kijhl', dict(kijhl[0], game_number='99019059', date='2026-03-01'), season_id=66)
+    for game in fixture_day('whl')['games']:
+        webapp.db_manager.save_game_results('whl', game, season_id=289)
+
+    client = webapp.app.test_client()
+    live = client.get('/api/officials?league=kijhl&season=65').get_json()
+    with replay_hockeytech():
+        live_days = {league: client.get(f'/api/scrape?league={league}&date={FIXTURE_DATE}').get_json()
+                     for league in ('kijhl', 'whl')}
+        for league in ('kijhl', 'whl'):
+            generate(webapp.db_manager, webapp.app, league, store=store, today=date(2026, 10, 19))
+
+    response = client.get('/api/officials?league=kijhl&season=65', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Cache-Control'] == SNAPSHOT_CACHE_CONTROL
+    snapshot = json.loads(gzip.decompress(response.data))
+    assert sorted(snapshot['officials'], key=lambda r: r['official_id']) == \
+        sorted(live['officials'], key=lambda r: r['official_id'])
+
+    page = client.get('/statistics?league=kijhl&season=65')
+    assert page.mimetype == 'text/html' and b'const embeddedOfficials = {' in page.data
+
+    # The live season and careers always come from Firestore, even with a file on disk
+    store.write_json(store.season_path('kijhl', 66, 'officials.json'), {'officials': [], 'season': '66'})
+    assert client.get('/api/officials?league=kijhl&season=66').get_json()['officials']
+    assert client.get('/api/officials?league=kijhl&season=66').headers.get('Cache-Control') != SNAPSHOT_CACHE_CONTROL
+    assert client.get('/api/official/Steve Smith?league=kijhl').headers.get('Cache-Control') != SNAPSHOT_CACHE_CONTROL
+
+    # A finished day is the payload /api/scrape returned live; one with a game in progress isn't written
+    day = client.get(f'/api/scrape?league=whl&date={FIXTURE_DATE}')
+    assert day.headers['Cache-Control'] == SNAPSHOT_CACHE_CONTROL
+    assert canonical_day(day.get_json()) == canonical_day(live_days['whl'])
+    assert not (tmp_path / 'kijhl' / 'games' / f'{FIXTURE_DATE}.json').exists()
+
+    # A day with a game still awaiting final is left to the live route
+    state = webapp.db_manager.get_ingestion_state('whl')
+    pending = dict(state, pending={'1022633': {'date': FIXTURE_DATE, 'season_id': 289, 'attempts': 1}})
+    monkeypatch.setattr(webapp.db_manager, 'get_ingestion_state', lambda league: pending)
+    with replay_hockeytech():
+        generate(webapp.db_manager, webapp.app, 'whl', store=SnapshotStore(str(tmp_path / 'pending')),
+                 today=date(2026, 10, 19))
+    assert not (tmp_path / 'pending' / 'whl' / 'games' / f'{FIXTURE_DATE}.json').exists()
+
+    # Re-running only scrapes days without a snapshot yet
+    scraped = []
+    monkeypatch.setattr(webapp.db_manager, 'get_ingestion_state', lambda league: state)
+    monkeypatch.setattr('snapshots.scrape_games', lambda date_str, league: scraped.append((league, date_str)))
+    manifest = generate(webapp.db_manager, webapp.app, 'whl', store=store, today=date(2026, 10, 19))
+    assert scraped == [] and manifest['game_days'] == 1
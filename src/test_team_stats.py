@@ -0,0 +1,49 @@
+from replay import replay_hockeytech
+from scraper import scrape_games
+from team_stats import game_team_deltas, team_rows
+
+def fixture_game(league, home):
+    with replay_hockeytech():
+        results = scrape_games('2025-11-07', league=league)
+    return next(game for game in results['games'] if game['home_abbrv'] == home)
+
+def test_game_deltas_split_home_and_away():
+    deltas = game_team_deltas(fixture_game('kijhl', 'REV'))
+    assert set(deltas) == {'REV', 'KAM'}
+    assert deltas['REV']['pims_for'] == 31 and deltas['REV']['pims_against'] == 27
+    assert deltas['REV']['home_games'] == 1 and deltas['REV']['home_pims_for'] == 31
+    assert deltas['KAM']['away_games'] == 1 and deltas['KAM']['away_pims_for'] == 27
+    assert deltas['REV']['fights'] == 1 and deltas['KAM']['fights'] == 1
+    assert deltas['REV']['majors'] == 1 and deltas['KAM']['majors'] == 0
+
+def test_team_fights_and_majors_reconcile_with_game_totals():
+    with replay_hockeytech():
+        games = scrape_games('2025-11-07', league='kijhl')['games'] + scrape_games('2025-11-07', league='whl')['games']
+    for game in games:
+        deltas = game_team_deltas(game)
+        assert sum(d['fights'] for d in deltas.values()) == 2 * game['fight_count'], game['game_number']
+        assert sum(d['majors'] for d in deltas.values()) == game['major_penalty_count'], game['game_number']
+
+    # One-man fights are majors, not fights, for the team that took them
+    nel = game_team_deltas(fixture_game('kijhl', 'CAS'))['NEL']
+    spo = game_team_deltas(fixture_game('whl', 'WEN'))['SPO']
+    assert (nel['fights'], nel['majors']) == (spo['fights'], spo['majors']) == (0, 1)
+
+def test_team_rows_accumulate_deltas():
+    teams = {}
+    for game in (fixture_game('whl', 'KEL'), fixture_game('whl', 'WEN')):
+        for abbrv, delta in game_team_deltas(game).items():
+            counters = teams.setdefault(abbrv, {'info': delta['info']})
+            for field, amount in delta.items():
+                if field != 'info':
+                    counters[field] = counters.get(field, 0) + amount
+    rows = {row['team']: row for row in team_rows(teams)}
+    assert rows['KEL']['games_played'] == 1 and rows['KEL']['majors'] == 1
+    assert rows['SPO']['pims_per_game'] == 11.0 and rows['SPO']['away_pims_per_game'] == 11.0
+    assert rows['SPO']['home_pims_per_game'] == 0
+
+def test_teams_endpoint_validates_season(webapp):
+    client = webapp.app.test_client()
+    response = client.get('/api/teams?season=abc')
+    assert response.status_code == 400 and response.get_json()['error'] == 'season must be an integer'
+    assert client.get('/api/teams?season=65').get_json()['season_id'] == 65
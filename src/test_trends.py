@@ -0,0 +1,34 @@
+from merge_officials import merge_group
+from trends import WINDOWS, append_game, new_trend, trend_points
+
+def test_rolling_averages_match_full_recompute():
+    pims = [12, 30, 4, 18, 22, 9, 41, 0, 16, 25, 8, 14, 33, 6, 19, 27, 11, 5, 38, 21, 13, 17, 29]
+    trend = new_trend()
+    for i, game_pims in enumerate(pims):
+        append_game(trend, 1000 + i, f'2025-10-{i + 1:02d}', game_pims)
+
+    for window in WINDOWS:
+        expected = [round(sum(pims[max(0, i + 1 - window):i + 1]) / min(i + 1, window), 1) for i in range(len(pims))]
+        assert trend[f'avg_{window}'] == expected
+        assert trend[f'sum_{window}'] == sum(pims[-window:])
+    assert trend['game_ids'][-1] == '1022'
+
+def test_append_ignores_repeated_game_and_starts_new_series():
+    trend = append_game(None, 19059, '2025-11-07', 58)
+    append_game(trend, 19059, '2025-11-07', 58)
+    assert trend['pims'] == [58] and trend['avg_5'] == [58.0]
+    assert set(trend_points(trend)) == {'game_ids', 'dates', 'pims', 'avg_5', 'avg_10', 'avg_20'}
+
+def test_merge_group_replays_variant_trends_by_date():
+    a = {'name': 'Dana ONeil', 'games_called': 2, 'total_pims': 30,
+         'trend': append_game(append_game(None, 1, '2025-10-01', 10), 3, '2025-10-03', 20)}
+    b = {'name': "Dana O'Neil", 'games_called': 1, 'total_pims': 40, 'trend': append_game(None, 2, '2025-10-02', 40)}
+    merged = merge_group('Dana_Oneil', 65, [('a', a), ('b', b)])
+    assert merged['trend']['game_ids'] == ['1', '2', '3']
+    assert merged['trend']['avg_5'] == [10.0, 25.0, 23.3]
+
+def test_trend_endpoint_validates_season(webapp):
+    client = webapp.app.test_client()
+    response = client.get('/api/official/Steve Smith/trend?season=abc')
+    assert response.status_code == 400 and response.get_json()['error'] == 'season must be an integer'
+    assert client.get('/api/official/Steve Smith/trend?season=65').status_code == 200
@@ -0,0 +1,57 @@
+"""Per-official rolling trend series.
+
+Each official season record carries a 'trend' map of parallel arrays, one entry per game
+in ingestion order:
+
+    {'game_ids': [...], 'dates': [...], 'pims': [...],
+     'avg_5': [...], 'avg_10': [...], 'avg_20': [...],
+     'sum_5': int, 'sum_10': int, 'sum_20': int}
+
+The sum_N fields are the running totals of the last N games, so appending a game is O(1):
+add the new PIMs and subtract the one that just left the window. Until an official has N
+games, avg_N averages over the games available.
+"""
+
+WINDOWS = (5, 10, 20)
+
+def new_trend() -> dict:
+    trend = {'game_ids': [], 'dates': [], 'pims': []}
+    for window in WINDOWS:
+        trend[f'avg_{window}'] = []
+        trend[f'sum_{window}'] = 0
+    return trend
+
+def append_game(trend, game_id, date, pims) -> dict:
+    """Append one game to a trend series in place and return it.
+
+    Args:
+        trend: Series from new_trend() or a stored official record (None starts a new one)
+        game_id: Game ID
+        date: Game date in YYYY-MM-DD format
+        pims: Total PIMs in the game
+    """
+    if trend is None:
+        trend = new_trend()
+    if trend['game_ids'] and trend['game_ids'][-1] == str(game_id):
+        return trend
+
+    pims = int(pims)
+    trend['game_ids'].append(str(game_id))
+    trend['dates'].append(date)
+    trend['pims'].append(pims)
+    count = len(trend['pims'])
+    for window in WINDOWS:
+        total = trend.get(f'sum_{window}', 0) + pims
+        if count > window:
+            total -= trend['pims'][-window - 1]
+        trend[f'sum_{window}'] = total
+        trend[f'avg_{window}'].append(round(total / min(count, window), 1))
+    return trend
+
+def trend_points(trend) -> dict:
+    """The chartable part of a stored series (drops the running sums)."""
+    trend = trend or new_trend()
+    points = {key: trend.get(key, []) for key in ('game_ids', 'dates', 'pims')}
+    for window in WINDOWS:
+        points[f'avg_{window}'] = trend.get(f'avg_{window}', [])
+    return points